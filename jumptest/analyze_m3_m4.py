@@ -7,14 +7,13 @@ M3.mp4 和 M4.mp4 跳跃分析脚本
 import sys
 import os
 import json
-import base64
-from io import BytesIO
+import string
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 import datetime
-import cv2
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'Helvetica', 'DejaVu Sans']
@@ -26,7 +25,297 @@ sys.path.append('src')
 from video_processor import VideoProcessor
 from pose_detector import PoseDetector
 from jump_analyzer import JumpAnalyzer
-from visualizer import JumpVisualizer
+from visualizer import JumpVisualizer, figure_to_jpeg, html_jpeg_img, phase_durations, write_html
+
+
+# 个人报告和对比报告的 <head>（含固定不变的CSS）在导入时只构建一次，生成报告时只替换视频名
+INDIVIDUAL_HEAD_TEMPLATE = string.Template("""
+        <!DOCTYPE html>
+        <html lang="zh-CN">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>$video_name 跳跃动作分析报告</title>
+            <style>
+                body {
+                    font-family: 'Arial', 'Microsoft YaHei', sans-serif;
+                    line-height: 1.6;
+                    margin: 0;
+                    padding: 20px;
+                    background-color: #f5f5f5;
+                }
+                .container {
+                    max-width: 1200px;
+                    margin: 0 auto;
+                    background-color: white;
+                    padding: 30px;
+                    border-radius: 10px;
+                    box-shadow: 0 0 20px rgba(0,0,0,0.1);
+                }
+                h1 {
+                    color: #2c3e50;
+                    text-align: center;
+                    border-bottom: 3px solid #3498db;
+                    padding-bottom: 10px;
+                }
+                h2 {
+                    color: #34495e;
+                    border-left: 4px solid #3498db;
+                    padding-left: 15px;
+                    margin-top: 30px;
+                }
+                .video-section {
+                    text-align: center;
+                    margin: 30px 0;
+                    background: #ecf0f1;
+                    padding: 25px;
+                    border-radius: 10px;
+                }
+                .video-player {
+                    width: 100%;
+                    max-width: 600px;
+                    height: 400px;
+                    border-radius: 8px;
+                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+                    margin: 20px 0;
+                }
+                .video-info {
+                    background: #34495e;
+                    color: white;
+                    padding: 15px;
+                    border-radius: 8px;
+                    margin: 20px auto;
+                    max-width: 600px;
+                    text-align: left;
+                }
+                .metrics-grid {
+                    display: grid;
+                    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+                    gap: 20px;
+                    margin: 20px 0;
+                }
+                .metric-card {
+                    background: #ecf0f1;
+                    padding: 20px;
+                    border-radius: 8px;
+                    border-left: 4px solid #3498db;
+                }
+                .metric-value {
+                    font-size: 24px;
+                    font-weight: bold;
+                    color: #2c3e50;
+                }
+                .metric-label {
+                    color: #7f8c8d;
+                    font-size: 14px;
+                }
+                .chart-container {
+                    text-align: center;
+                    margin: 30px 0;
+                }
+                .chart-container img {
+                    max-width: 100%;
+                    height: auto;
+                    border-radius: 8px;
+                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+                }
+                .score-bar {
+                    background-color: #ecf0f1;
+                    height: 20px;
+                    border-radius: 10px;
+                    margin: 10px 0;
+                    overflow: hidden;
+                }
+                .score-fill {
+                    height: 100%;
+                    background: linear-gradient(90deg, #e74c3c, #f39c12, #f1c40f, #2ecc71);
+                    border-radius: 10px;
+                    transition: width 0.3s ease;
+                }
+                .phase-timeline {
+                    display: flex;
+                    margin: 20px 0;
+                    height: 40px;
+                    border-radius: 20px;
+                    overflow: hidden;
+                    border: 2px solid #bdc3c7;
+                }
+                .phase {
+                    display: flex;
+                    align-items: center;
+                    justify-content: center;
+                    color: white;
+                    font-weight: bold;
+                    font-size: 12px;
+                }
+                .phase-prep {
+                    background-color: #3498db;
+                }
+                .phase-takeoff {
+                    background-color: #e74c3c;
+                }
+                .phase-landing {
+                    background-color: #27ae60;
+                }
+                .error-message {
+                    background-color: #e74c3c;
+                    color: white;
+                    padding: 15px;
+                    border-radius: 8px;
+                    margin: 10px 0;
+                }
+                .success-message {
+                    background-color: #27ae60;
+                    color: white;
+                    padding: 15px;
+                    border-radius: 8px;
+                    margin: 10px 0;
+                }
+                .highlight-box {
+                    background: #e8f5e8;
+                    border-left: 4px solid #2ecc71;
+                    padding: 20px;
+                    margin: 20px 0;
+                    border-radius: 8px;
+                }
+            </style>
+        </head>""")
+
+COMPARISON_HEAD_TEMPLATE = string.Template("""
+        <!DOCTYPE html>
+        <html lang="zh-CN">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>跳跃分析对比报告 - $video1_name vs $video2_name</title>
+            <style>
+                body {
+                    font-family: 'Arial', 'Microsoft YaHei', sans-serif;
+                    line-height: 1.6;
+                    margin: 0;
+                    padding: 20px;
+                    background-color: #f5f5f5;
+                }
+                .container {
+                    max-width: 1400px;
+                    margin: 0 auto;
+                    background-color: white;
+                    padding: 30px;
+                    border-radius: 10px;
+                    box-shadow: 0 0 20px rgba(0,0,0,0.1);
+                }
+                h1 {
+                    color: #2c3e50;
+                    text-align: center;
+                    border-bottom: 3px solid #3498db;
+                    padding-bottom: 10px;
+                }
+                h2 {
+                    color: #34495e;
+                    border-left: 4px solid #3498db;
+                    padding-left: 15px;
+                    margin-top: 30px;
+                }
+                .video-comparison {
+                    display: grid;
+                    grid-template-columns: 1fr 1fr;
+                    gap: 30px;
+                    margin: 30px 0;
+                }
+                .video-section {
+                    text-align: center;
+                    background: #ecf0f1;
+                    padding: 25px;
+                    border-radius: 10px;
+                }
+                .video-player {
+                    width: 100%;
+                    max-width: 500px;
+                    height: 300px;
+                    border-radius: 8px;
+                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+                    margin: 20px 0;
+                }
+                .video-info {
+                    background: #34495e;
+                    color: white;
+                    padding: 15px;
+                    border-radius: 8px;
+                    margin: 20px auto;
+                    max-width: 500px;
+                    text-align: left;
+                }
+                .comparison-table {
+                    width: 100%;
+                    border-collapse: collapse;
+                    margin: 20px 0;
+                }
+                .comparison-table th,
+                .comparison-table td {
+                    border: 1px solid #ddd;
+                    padding: 12px;
+                    text-align: center;
+                }
+                .comparison-table th {
+                    background-color: #3498db;
+                    color: white;
+                }
+                .comparison-table tr:nth-child(even) {
+                    background-color: #f2f2f2;
+                }
+                .winner {
+                    background-color: #2ecc71 !important;
+                    color: white;
+                    font-weight: bold;
+                }
+                .chart-container {
+                    text-align: center;
+                    margin: 30px 0;
+                }
+                .chart-container img {
+                    max-width: 100%;
+                    height: auto;
+                    border-radius: 8px;
+                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+                }
+                .summary-box {
+                    background: #e8f5e8;
+                    border-left: 4px solid #2ecc71;
+                    padding: 20px;
+                    margin: 20px 0;
+                    border-radius: 8px;
+                }
+                .highlight-box {
+                    background: #fef9e7;
+                    border-left: 4px solid #f39c12;
+                    padding: 20px;
+                    margin: 20px 0;
+                    border-radius: 8px;
+                }
+                .error-message {
+                    background-color: #e74c3c;
+                    color: white;
+                    padding: 15px;
+                    border-radius: 8px;
+                    margin: 10px 0;
+                }
+                .success-message {
+                    background-color: #27ae60;
+                    color: white;
+                    padding: 15px;
+                    border-radius: 8px;
+                    margin: 10px 0;
+                }
+                .improvement-highlight {
+                    background: #f39c12;
+                    color: white;
+                    padding: 10px;
+                    border-radius: 5px;
+                    margin: 5px 0;
+                    font-weight: bold;
+                }
+            </style>
+        </head>""")
 
 
 class JumpAnalysisSystem:
@@ -80,32 +369,25 @@ class JumpAnalysisSystem:
         selected_frames = list(range(0, total_frames, frame_step))
         print(f"   📊 提取策略: 从{total_frames}帧中选择{len(selected_frames)}帧进行分析")
         
-        # 提取帧
-        frames = []
-        for i in selected_frames:
-            processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-            ret, frame = processor.cap.read()
-            if ret:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frames.append(frame_rgb)
-        
-        print(f"   ✅ 成功提取 {len(frames)} 帧")
-        
-        # 3. 姿态检测
+        # 3. 姿态检测：后台线程顺序解码采样帧，当前线程逐帧检测并把结果交给分析器累积，不保留姿态结果列表
+        # 帧先缩小到长边640像素：关键点是归一化坐标，不受缩放影响
         print("   🔍 进行姿态检测...")
         detector = PoseDetector()
-        pose_results = detector.detect_pose_sequence(frames)
+        analyzer = JumpAnalyzer(fps=fps / frame_step)
+        for pose_result in detector.iter_pose_stream(processor.iter_sampled_frames(frame_step, target_size=processor.scaled_size())):
+            analyzer.update(pose_result)
         
-        valid_poses = sum(1 for result in pose_results if result is not None)
-        print(f"   📊 检测结果: {valid_poses}/{len(pose_results)} 帧有效")
+        print(f"   ✅ 成功提取 {analyzer.frame_count} 帧")
+        
+        valid_poses = analyzer.valid_frames
+        print(f"   📊 检测结果: {valid_poses}/{analyzer.frame_count} 帧有效")
         
         if valid_poses < 2:
             print("   ⚠️ 有效姿态数量太少，可能影响分析结果")
         
         # 4. 跳跃分析
         print("   🔬 进行跳跃分析...")
-        analyzer = JumpAnalyzer(fps=fps / frame_step)
-        analysis_result = analyzer.analyze_jump_sequence(pose_results)
+        analysis_result = analyzer.finalize()
         
         processor.release()
         
@@ -165,26 +447,21 @@ class JumpAnalysisSystem:
         
         plt.tight_layout()
         
-        # 将图表转换为base64编码
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close()
+        # 渲染为JPEG，写HTML时再base64编码
+        chart_jpeg = figure_to_jpeg(fig)
         
         # 生成HTML报告
-        html_content = self.create_individual_html(video_name, analysis_result, video_info, image_base64)
+        html_parts = self.create_individual_html(video_name, analysis_result, video_info, chart_jpeg)
         
         # 保存HTML文件
         output_path = os.path.join(self.output_dir, f'{video_name}_analysis_report.html')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        write_html(output_path, html_parts)
         
         print(f"   ✅ 个人报告已保存: {output_path}")
         return output_path
     
-    def create_individual_html(self, video_name, analysis_result, video_info, chart_base64):
-        """创建个人HTML报告内容"""
+    def create_individual_html(self, video_name, analysis_result, video_info, chart_jpeg):
+        """创建个人HTML报告内容，返回HTML片段列表（由 write_html 写出）"""
         # 准备数据
         jump_metrics = analysis_result.get('jump_metrics', {})
         strength_assessment = analysis_result.get('strength_assessment', {})
@@ -197,157 +474,8 @@ class JumpAnalysisSystem:
         # 获取当前时间
         current_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="zh-CN">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{video_name} 跳跃动作分析报告</title>
-            <style>
-                body {{
-                    font-family: 'Arial', 'Microsoft YaHei', sans-serif;
-                    line-height: 1.6;
-                    margin: 0;
-                    padding: 20px;
-                    background-color: #f5f5f5;
-                }}
-                .container {{
-                    max-width: 1200px;
-                    margin: 0 auto;
-                    background-color: white;
-                    padding: 30px;
-                    border-radius: 10px;
-                    box-shadow: 0 0 20px rgba(0,0,0,0.1);
-                }}
-                h1 {{
-                    color: #2c3e50;
-                    text-align: center;
-                    border-bottom: 3px solid #3498db;
-                    padding-bottom: 10px;
-                }}
-                h2 {{
-                    color: #34495e;
-                    border-left: 4px solid #3498db;
-                    padding-left: 15px;
-                    margin-top: 30px;
-                }}
-                .video-section {{
-                    text-align: center;
-                    margin: 30px 0;
-                    background: #ecf0f1;
-                    padding: 25px;
-                    border-radius: 10px;
-                }}
-                .video-player {{
-                    width: 100%;
-                    max-width: 600px;
-                    height: 400px;
-                    border-radius: 8px;
-                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-                    margin: 20px 0;
-                }}
-                .video-info {{
-                    background: #34495e;
-                    color: white;
-                    padding: 15px;
-                    border-radius: 8px;
-                    margin: 20px auto;
-                    max-width: 600px;
-                    text-align: left;
-                }}
-                .metrics-grid {{
-                    display: grid;
-                    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                    gap: 20px;
-                    margin: 20px 0;
-                }}
-                .metric-card {{
-                    background: #ecf0f1;
-                    padding: 20px;
-                    border-radius: 8px;
-                    border-left: 4px solid #3498db;
-                }}
-                .metric-value {{
-                    font-size: 24px;
-                    font-weight: bold;
-                    color: #2c3e50;
-                }}
-                .metric-label {{
-                    color: #7f8c8d;
-                    font-size: 14px;
-                }}
-                .chart-container {{
-                    text-align: center;
-                    margin: 30px 0;
-                }}
-                .chart-container img {{
-                    max-width: 100%;
-                    height: auto;
-                    border-radius: 8px;
-                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-                }}
-                .score-bar {{
-                    background-color: #ecf0f1;
-                    height: 20px;
-                    border-radius: 10px;
-                    margin: 10px 0;
-                    overflow: hidden;
-                }}
-                .score-fill {{
-                    height: 100%;
-                    background: linear-gradient(90deg, #e74c3c, #f39c12, #f1c40f, #2ecc71);
-                    border-radius: 10px;
-                    transition: width 0.3s ease;
-                }}
-                .phase-timeline {{
-                    display: flex;
-                    margin: 20px 0;
-                    height: 40px;
-                    border-radius: 20px;
-                    overflow: hidden;
-                    border: 2px solid #bdc3c7;
-                }}
-                .phase {{
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    color: white;
-                    font-weight: bold;
-                    font-size: 12px;
-                }}
-                .phase-prep {{
-                    background-color: #3498db;
-                }}
-                .phase-takeoff {{
-                    background-color: #e74c3c;
-                }}
-                .phase-landing {{
-                    background-color: #27ae60;
-                }}
-                .error-message {{
-                    background-color: #e74c3c;
-                    color: white;
-                    padding: 15px;
-                    border-radius: 8px;
-                    margin: 10px 0;
-                }}
-                .success-message {{
-                    background-color: #27ae60;
-                    color: white;
-                    padding: 15px;
-                    border-radius: 8px;
-                    margin: 10px 0;
-                }}
-                .highlight-box {{
-                    background: #e8f5e8;
-                    border-left: 4px solid #2ecc71;
-                    padding: 20px;
-                    margin: 20px 0;
-                    border-radius: 8px;
-                }}
-            </style>
-        </head>
+        # 按片段收集HTML，最后一次性输出，避免反复拼接越来越长的字符串
+        html_parts = [INDIVIDUAL_HEAD_TEMPLATE.substitute(video_name=video_name), f"""
         <body>
             <div class="container">
                 <h1>🏃‍♂️ {video_name} 跳跃动作分析报告</h1>
@@ -372,21 +500,19 @@ class JumpAnalysisSystem:
                         🎞️ 总帧数: {video_info.get('total_frames', 'N/A')} 帧
                     </div>
                 </div>
-        """
+        """]
         
         # 添加跳跃阶段信息
         if 'error' not in jump_phases:
-            prep_duration = jump_phases.get('preparation', {}).get('end_frame', 0) - jump_phases.get('preparation', {}).get('start_frame', 0)
-            takeoff_duration = jump_phases.get('takeoff', {}).get('end_frame', 0) - jump_phases.get('takeoff', {}).get('start_frame', 0)
-            landing_duration = jump_phases.get('landing', {}).get('end_frame', 0) - jump_phases.get('landing', {}).get('start_frame', 0)
-            total_frames = prep_duration + takeoff_duration + landing_duration
+            # 三个阶段的帧数和宽度占比一次算出
+            durations = phase_durations(jump_phases)
+            total_frames = durations.sum()
             
             if total_frames > 0:
-                prep_width = (prep_duration / total_frames) * 100
-                takeoff_width = (takeoff_duration / total_frames) * 100
-                landing_width = (landing_duration / total_frames) * 100
+                prep_duration, takeoff_duration, landing_duration = durations
+                prep_width, takeoff_width, landing_width = durations / total_frames * 100
                 
-                html_content += f"""
+                html_parts.append(f"""
                 <h2>🎯 跳跃阶段划分</h2>
                 <div class="success-message">
                     ✅ 成功识别跳跃的三个阶段
@@ -402,19 +528,19 @@ class JumpAnalysisSystem:
                         落地阶段<br>{landing_duration} 帧
                     </div>
                 </div>
-                """
+                """)
         else:
-            html_content += f"""
+            html_parts.append(f"""
                 <h2>🎯 跳跃阶段划分</h2>
                 <div class="error-message">
                     ❌ 阶段识别失败: {jump_phases.get('error', '未知错误')}<br>
                     💡 可能原因: 视频时长过短或跳跃动作不够明显
                 </div>
-            """
+            """)
         
         # 添加跳跃指标
         if 'error' not in jump_metrics:
-            html_content += f"""
+            html_parts.append(f"""
                 <h2>📊 跳跃指标</h2>
                 <div class="success-message">
                     ✅ 成功计算跳跃指标
@@ -441,15 +567,15 @@ class JumpAnalysisSystem:
                         <div class="metric-label">总时间 (秒)</div>
                     </div>
                 </div>
-            """
+            """)
         else:
-            html_content += f"""
+            html_parts.append(f"""
                 <h2>📊 跳跃指标</h2>
                 <div class="error-message">
                     ❌ 跳跃指标计算失败: {jump_metrics.get('error', '未知错误')}<br>
                     💡 建议: 确保视频包含完整的跳跃动作
                 </div>
-            """
+            """)
         
         # 添加力量评估
         if 'error' not in strength_assessment:
@@ -458,7 +584,7 @@ class JumpAnalysisSystem:
             core_strength = strength_assessment.get('core_strength', 0)
             coordination = strength_assessment.get('coordination', 0)
             
-            html_content += f"""
+            html_parts.append(f"""
                 <h2>💪 力量评估</h2>
                 <div class="success-message">
                     ✅ 成功评估各项力量指标
@@ -493,25 +619,25 @@ class JumpAnalysisSystem:
                         </div>
                     </div>
                 </div>
-            """
+            """)
         else:
-            html_content += f"""
+            html_parts.append(f"""
                 <h2>💪 力量评估</h2>
                 <div class="error-message">
                     ❌ 力量评估失败: {strength_assessment.get('error', '未知错误')}<br>
                     💡 原因: 需要有效的跳跃阶段数据才能进行力量评估
                 </div>
-            """
+            """)
         
         # 添加姿态分析
         if 'error' not in posture_analysis:
-            html_content += f"""
+            html_parts.append(f"""
                 <h2>🤸 姿态分析</h2>
                 <div class="success-message">
                     ✅ 成功分析各阶段姿态
                 </div>
                 <div class="metrics-grid">
-            """
+            """)
             
             phases = [
                 ('preparation_posture', '准备阶段'),
@@ -530,7 +656,7 @@ class JumpAnalysisSystem:
                     knee_angle_str = f"{knee_angle:.1f}°" if knee_angle is not None else "N/A"
                     hip_angle_str = f"{hip_angle:.1f}°" if hip_angle is not None else "N/A"
                     
-                    html_content += f"""
+                    html_parts.append(f"""
                     <div class="metric-card">
                         <h4>{phase_name}</h4>
                         <p><strong>稳定性:</strong> {stability:.3f}</p>
@@ -540,28 +666,30 @@ class JumpAnalysisSystem:
                         <p><strong>平均膝关节角度:</strong> {knee_angle_str}</p>
                         <p><strong>平均髋关节角度:</strong> {hip_angle_str}</p>
                     </div>
-                    """
+                    """)
             
-            html_content += "</div>"
+            html_parts.append("</div>")
         else:
-            html_content += f"""
+            html_parts.append(f"""
                 <h2>🤸 姿态分析</h2>
                 <div class="error-message">
                     ❌ 姿态分析失败: {posture_analysis.get('error', '未知错误')}<br>
                     💡 原因: 需要有效的姿态检测数据才能进行姿态分析
                 </div>
-            """
+            """)
         
         # 添加可视化图表
-        html_content += f"""
+        html_parts.append(f"""
             <h2>📈 分析图表</h2>
             <div class="chart-container">
-                <img src="data:image/png;base64,{chart_base64}" alt="跳跃分析图表">
+                """)
+        html_parts.extend(html_jpeg_img(chart_jpeg, '跳跃分析图表'))
+        html_parts.append(f"""
             </div>
             
             <h2>📝 分析建议</h2>
             <div class="metric-card">
-        """
+        """)
         
         # 添加基于分析结果的建议
         if 'error' not in strength_assessment:
@@ -592,9 +720,9 @@ class JumpAnalysisSystem:
                 suggestions.append("🔸 各项指标表现良好，继续保持当前训练强度")
             
             for suggestion in suggestions:
-                html_content += f"<p>{suggestion}</p>"
+                html_parts.append(f"<p>{suggestion}</p>")
         else:
-            html_content += """
+            html_parts.append("""
             <p>🔸 由于分析数据不足，无法提供具体建议。</p>
             <p>🔸 <strong>改进建议：</strong></p>
             <ul>
@@ -603,9 +731,9 @@ class JumpAnalysisSystem:
                 <li>确保光线充足，人体轮廓清晰</li>
                 <li>建议从侧面拍摄，能更好地观察跳跃轨迹</li>
             </ul>
-            """
+            """)
         
-        html_content += f"""
+        html_parts.append(f"""
             </div>
             
             <div style="text-align: center; margin-top: 40px; color: #7f8c8d; font-size: 14px;">
@@ -616,24 +744,23 @@ class JumpAnalysisSystem:
         </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return html_parts
     
     def generate_comparison_report(self, video1_name, video2_name, analysis1, analysis2, video_info1, video_info2):
         """生成对比报告"""
         print(f"📊 生成 {video1_name} vs {video2_name} 对比报告...")
         
         # 生成对比图表
-        chart_base64 = self.create_comparison_chart(analysis1, analysis2, video_info1, video_info2, video1_name, video2_name)
+        chart_jpeg = self.create_comparison_chart(analysis1, analysis2, video_info1, video_info2, video1_name, video2_name)
         
         # 生成HTML报告
-        html_content = self.create_comparison_html(video1_name, video2_name, analysis1, analysis2, video_info1, video_info2, chart_base64)
+        html_parts = self.create_comparison_html(video1_name, video2_name, analysis1, analysis2, video_info1, video_info2, chart_jpeg)
         
         # 保存HTML文件
         output_path = os.path.join(self.output_dir, f'{video1_name}_vs_{video2_name}_comparison.html')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        write_html(output_path, html_parts)
         
         print(f"   ✅ 对比报告已保存: {output_path}")
         return output_path
@@ -737,22 +864,19 @@ class JumpAnalysisSystem:
         
         # 4. 身体中心轨迹对比
         ax4 = axes[1, 0]
-        centers1 = analysis1.get('body_centers', [])
-        centers2 = analysis2.get('body_centers', [])
+        centers1 = np.asarray(analysis1.get('body_centers', []), dtype=float).reshape(-1, 2)
+        centers2 = np.asarray(analysis2.get('body_centers', []), dtype=float).reshape(-1, 2)
         
-        if centers1 and centers2:
-            valid_centers1 = [(i, center) for i, center in enumerate(centers1) if center is not None]
-            valid_centers2 = [(i, center) for i, center in enumerate(centers2) if center is not None]
+        if len(centers1) and len(centers2):
+            # body_centers 为 (N, 2) 数组，缺失帧为NaN
+            frame_indices1 = np.flatnonzero(~np.isnan(centers1[:, 1]))
+            frame_indices2 = np.flatnonzero(~np.isnan(centers2[:, 1]))
             
-            if valid_centers1:
-                y_coords1 = [center[1] for _, center in valid_centers1]
-                frame_indices1 = [i for i, _ in valid_centers1]
-                ax4.plot(frame_indices1, y_coords1, 'o-', label=video1_name, color='#3498db', linewidth=2)
+            if len(frame_indices1):
+                ax4.plot(frame_indices1, centers1[frame_indices1, 1], 'o-', label=video1_name, color='#3498db', linewidth=2)
             
-            if valid_centers2:
-                y_coords2 = [center[1] for _, center in valid_centers2]
-                frame_indices2 = [i for i, _ in valid_centers2]
-                ax4.plot(frame_indices2, y_coords2, 's-', label=video2_name, color='#e74c3c', linewidth=2)
+            if len(frame_indices2):
+                ax4.plot(frame_indices2, centers2[frame_indices2, 1], 's-', label=video2_name, color='#e74c3c', linewidth=2)
             
             ax4.set_xlabel('帧索引')
             ax4.set_ylabel('Y坐标 (像素)')
@@ -837,17 +961,13 @@ class JumpAnalysisSystem:
         
         plt.tight_layout()
         
-        # 转换为base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close()
+        # 渲染为JPEG，写HTML时再base64编码
+        chart_jpeg = figure_to_jpeg(fig)
         
-        return image_base64
+        return chart_jpeg
     
-    def create_comparison_html(self, video1_name, video2_name, analysis1, analysis2, video_info1, video_info2, chart_base64):
-        """创建对比HTML报告内容"""
+    def create_comparison_html(self, video1_name, video2_name, analysis1, analysis2, video_info1, video_info2, chart_jpeg):
+        """创建对比HTML报告内容，返回HTML片段列表（由 write_html 写出）"""
         # 获取分析结果
         strength1 = analysis1.get('strength_assessment', {})
         strength2 = analysis2.get('strength_assessment', {})
@@ -857,141 +977,8 @@ class JumpAnalysisSystem:
         # 获取当前时间
         current_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="zh-CN">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>跳跃分析对比报告 - {video1_name} vs {video2_name}</title>
-            <style>
-                body {{
-                    font-family: 'Arial', 'Microsoft YaHei', sans-serif;
-                    line-height: 1.6;
-                    margin: 0;
-                    padding: 20px;
-                    background-color: #f5f5f5;
-                }}
-                .container {{
-                    max-width: 1400px;
-                    margin: 0 auto;
-                    background-color: white;
-                    padding: 30px;
-                    border-radius: 10px;
-                    box-shadow: 0 0 20px rgba(0,0,0,0.1);
-                }}
-                h1 {{
-                    color: #2c3e50;
-                    text-align: center;
-                    border-bottom: 3px solid #3498db;
-                    padding-bottom: 10px;
-                }}
-                h2 {{
-                    color: #34495e;
-                    border-left: 4px solid #3498db;
-                    padding-left: 15px;
-                    margin-top: 30px;
-                }}
-                .video-comparison {{
-                    display: grid;
-                    grid-template-columns: 1fr 1fr;
-                    gap: 30px;
-                    margin: 30px 0;
-                }}
-                .video-section {{
-                    text-align: center;
-                    background: #ecf0f1;
-                    padding: 25px;
-                    border-radius: 10px;
-                }}
-                .video-player {{
-                    width: 100%;
-                    max-width: 500px;
-                    height: 300px;
-                    border-radius: 8px;
-                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-                    margin: 20px 0;
-                }}
-                .video-info {{
-                    background: #34495e;
-                    color: white;
-                    padding: 15px;
-                    border-radius: 8px;
-                    margin: 20px auto;
-                    max-width: 500px;
-                    text-align: left;
-                }}
-                .comparison-table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin: 20px 0;
-                }}
-                .comparison-table th,
-                .comparison-table td {{
-                    border: 1px solid #ddd;
-                    padding: 12px;
-                    text-align: center;
-                }}
-                .comparison-table th {{
-                    background-color: #3498db;
-                    color: white;
-                }}
-                .comparison-table tr:nth-child(even) {{
-                    background-color: #f2f2f2;
-                }}
-                .winner {{
-                    background-color: #2ecc71 !important;
-                    color: white;
-                    font-weight: bold;
-                }}
-                .chart-container {{
-                    text-align: center;
-                    margin: 30px 0;
-                }}
-                .chart-container img {{
-                    max-width: 100%;
-                    height: auto;
-                    border-radius: 8px;
-                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-                }}
-                .summary-box {{
-                    background: #e8f5e8;
-                    border-left: 4px solid #2ecc71;
-                    padding: 20px;
-                    margin: 20px 0;
-                    border-radius: 8px;
-                }}
-                .highlight-box {{
-                    background: #fef9e7;
-                    border-left: 4px solid #f39c12;
-                    padding: 20px;
-                    margin: 20px 0;
-                    border-radius: 8px;
-                }}
-                .error-message {{
-                    background-color: #e74c3c;
-                    color: white;
-                    padding: 15px;
-                    border-radius: 8px;
-                    margin: 10px 0;
-                }}
-                .success-message {{
-                    background-color: #27ae60;
-                    color: white;
-                    padding: 15px;
-                    border-radius: 8px;
-                    margin: 10px 0;
-                }}
-                .improvement-highlight {{
-                    background: #f39c12;
-                    color: white;
-                    padding: 10px;
-                    border-radius: 5px;
-                    margin: 5px 0;
-                    font-weight: bold;
-                }}
-            </style>
-        </head>
+        # 按片段收集HTML，最后一次性输出，避免反复拼接越来越长的字符串
+        html_parts = [COMPARISON_HEAD_TEMPLATE.substitute(video1_name=video1_name, video2_name=video2_name), f"""
         <body>
             <div class="container">
                 <h1>🏃‍♂️ 跳跃分析对比报告</h1>
@@ -1039,10 +1026,10 @@ class JumpAnalysisSystem:
                         </div>
                     </div>
                 </div>
-        """
+        """]
         
         # 添加对比表格
-        html_content += """
+        html_parts.append("""
                 <h2>📊 详细对比数据</h2>
                 <table class="comparison-table">
                     <thead>
@@ -1054,7 +1041,7 @@ class JumpAnalysisSystem:
                         </tr>
                     </thead>
                     <tbody>
-        """
+        """)
         
         # 跳跃指标对比
         if 'error' not in metrics1 and 'error' not in metrics2:
@@ -1065,25 +1052,25 @@ class JumpAnalysisSystem:
             
             # 跳跃高度对比
             height_winner = video1_name if height1 > height2 else video2_name if height2 > height1 else "相同"
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>跳跃高度 (像素)</td>
                             <td {"class='winner'" if height_winner == video1_name else ""}>{height1:.1f}</td>
                             <td {"class='winner'" if height_winner == video2_name else ""}>{height2:.1f}</td>
                             <td>{height_winner}</td>
                         </tr>
-            """
+            """)
             
             # 起跳时间对比（时间越短越好）
             takeoff_winner = video1_name if takeoff1 < takeoff2 else video2_name if takeoff2 < takeoff1 else "相同"
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>起跳时间 (秒)</td>
                             <td {"class='winner'" if takeoff_winner == video1_name else ""}>{takeoff1:.3f}</td>
                             <td {"class='winner'" if takeoff_winner == video2_name else ""}>{takeoff2:.3f}</td>
                             <td>{takeoff_winner}</td>
                         </tr>
-            """
+            """)
         
         # 力量评估对比
         if 'error' not in strength1 and 'error' not in strength2:
@@ -1098,64 +1085,66 @@ class JumpAnalysisSystem:
             
             # 综合得分对比
             overall_winner = video1_name if overall1 > overall2 else video2_name if overall2 > overall1 else "相同"
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>综合得分</td>
                             <td {"class='winner'" if overall_winner == video1_name else ""}>{overall1:.3f}</td>
                             <td {"class='winner'" if overall_winner == video2_name else ""}>{overall2:.3f}</td>
                             <td>{overall_winner}</td>
                         </tr>
-            """
+            """)
             
             # 爆发力对比
             explosive_winner = video1_name if explosive1 > explosive2 else video2_name if explosive2 > explosive1 else "相同"
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>爆发力</td>
                             <td {"class='winner'" if explosive_winner == video1_name else ""}>{explosive1:.3f}</td>
                             <td {"class='winner'" if explosive_winner == video2_name else ""}>{explosive2:.3f}</td>
                             <td>{explosive_winner}</td>
                         </tr>
-            """
+            """)
             
             # 核心力量对比
             core_winner = video1_name if core1 > core2 else video2_name if core2 > core1 else "相同"
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>核心力量</td>
                             <td {"class='winner'" if core_winner == video1_name else ""}>{core1:.3f}</td>
                             <td {"class='winner'" if core_winner == video2_name else ""}>{core2:.3f}</td>
                             <td>{core_winner}</td>
                         </tr>
-            """
+            """)
             
             # 协调性对比
             coord_winner = video1_name if coord1 > coord2 else video2_name if coord2 > coord1 else "相同"
-            html_content += f"""
+            html_parts.append(f"""
                         <tr>
                             <td>协调性</td>
                             <td {"class='winner'" if coord_winner == video1_name else ""}>{coord1:.3f}</td>
                             <td {"class='winner'" if coord_winner == video2_name else ""}>{coord2:.3f}</td>
                             <td>{coord_winner}</td>
                         </tr>
-            """
+            """)
         
-        html_content += """
+        html_parts.append("""
                     </tbody>
                 </table>
-        """
+        """)
         
         # 添加图表
-        html_content += f"""
+        html_parts.append(f"""
                 <h2>📈 可视化对比分析</h2>
                 <div class="chart-container">
-                    <img src="data:image/png;base64,{chart_base64}" alt="跳跃分析对比图表">
+                    """)
+        html_parts.extend(html_jpeg_img(chart_jpeg, '跳跃分析对比图表'))
+        html_parts.append(f"""
                 </div>
                 
                 <h2>🎯 分析总结</h2>
                 <div class="summary-box">
                     <h3>🔍 主要发现</h3>
-        """
+        """)
         
         # 添加分析总结
         if 'error' not in strength1 and 'error' not in strength2:
@@ -1164,42 +1153,42 @@ class JumpAnalysisSystem:
             
             if overall2 > overall1:
                 diff_percent = ((overall2 - overall1) / overall1) * 100
-                html_content += f"""
+                html_parts.append(f"""
                     <p><strong>🏆 {video2_name} 表现更优秀</strong></p>
                     <ul>
                         <li>综合得分：{overall2:.3f} vs {overall1:.3f} （高出 {diff_percent:.1f}%）</li>
                         <li>视频时长：{video_info2.get('duration', 0):.2f}秒 vs {video_info1.get('duration', 0):.2f}秒</li>
                         <li>{video2_name} 在纯跳跃动作的执行上展现出更好的技术水平</li>
                     </ul>
-                """
+                """)
             elif overall1 > overall2:
                 diff_percent = ((overall1 - overall2) / overall2) * 100
-                html_content += f"""
+                html_parts.append(f"""
                     <p><strong>🏆 {video1_name} 表现更优秀</strong></p>
                     <ul>
                         <li>综合得分：{overall1:.3f} vs {overall2:.3f} （高出 {diff_percent:.1f}%）</li>
                         <li>视频时长：{video_info1.get('duration', 0):.2f}秒 vs {video_info2.get('duration', 0):.2f}秒</li>
                         <li>{video1_name} 在纯跳跃动作的执行上展现出更好的技术水平</li>
                     </ul>
-                """
+                """)
             else:
-                html_content += f"""
+                html_parts.append(f"""
                     <p><strong>🤝 两个视频表现相当</strong></p>
                     <ul>
                         <li>综合得分：{overall1:.3f} vs {overall2:.3f}</li>
                         <li>两个视频的跳跃技术水平相近，各有优势</li>
                     </ul>
-                """
+                """)
         else:
-            html_content += """
+            html_parts.append("""
                     <p><strong>⚠️ 部分数据分析受限</strong></p>
                     <ul>
                         <li>由于视频质量或长度限制，部分指标无法完整分析</li>
                         <li>建议确保视频包含完整的跳跃动作序列</li>
                     </ul>
-            """
+            """)
         
-        html_content += f"""
+        html_parts.append(f"""
                     <h3>💡 处理后视频分析优势</h3>
                     <ul>
                         <li><strong>纯净分析：</strong> 去除了非跳跃部分，专注于跳跃动作本身</li>
@@ -1226,9 +1215,9 @@ class JumpAnalysisSystem:
             </div>
         </body>
         </html>
-        """
+        """)
         
-        return html_content
+        return html_parts
     
     def run_analysis(self, video_names):
         """运行完整的分析流程"""
@@ -1246,29 +1235,32 @@ class JumpAnalysisSystem:
         analyses = []
         video_infos = []
         
-        # 分析每个视频
-        for video_name in video_names:
-            print(f"\n{'='*50}")
-            print(f"分析视频: {video_name}")
-            print(f"{'='*50}")
+        # 各视频互不依赖，在独立进程中并行分析（每个进程各自创建检测器），报告仍按顺序生成
+        with ProcessPoolExecutor(max_workers=len(video_names)) as executor:
+            futures = [executor.submit(self.analyze_video, video_name) for video_name in video_names]
             
-            try:
-                analysis, video_info = self.analyze_video(video_name)
-                if analysis is None:
-                    print(f"❌ 视频 {video_name} 分析失败")
-                    return
-                
-                analyses.append(analysis)
-                video_infos.append(video_info)
+            for video_name, future in zip(video_names, futures):
+                print(f"\n{'='*50}")
+                print(f"分析视频: {video_name}")
+                print(f"{'='*50}")
                 
-                # 生成个人报告
-                self.generate_individual_report(video_name, analysis, video_info)
-                
-            except Exception as e:
-                print(f"❌ 分析视频 {video_name} 时发生错误: {e}")
-                import traceback
-                traceback.print_exc()
-                return
+                try:
+                    analysis, video_info = future.result()
+                    if analysis is None:
+                        print(f"❌ 视频 {video_name} 分析失败")
+                        return
+                    
+                    analyses.append(analysis)
+                    video_infos.append(video_info)
+                    
+                    # 生成个人报告
+                    self.generate_individual_report(video_name, analysis, video_info)
+                    
+                except Exception as e:
+                    print(f"❌ 分析视频 {video_name} 时发生错误: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    return
         
         # 生成对比报告
         if len(analyses) == 2:
@@ -5,7 +5,6 @@
 """
 
 import sys
-import cv2
 import numpy as np
 sys.path.append('src')
 
@@ -13,8 +12,8 @@ from video_processor import VideoProcessor
 from pose_detector import PoseDetector
 from jump_analyzer import JumpAnalyzer
 
-def debug_jump_height_calculation(video_path):
-    """详细调试跳跃高度计算过程"""
+def debug_jump_height_calculation(video_path, detector=None):
+    """详细调试跳跃高度计算过程（传入 detector 时复用该检测器）"""
     print(f"🔍 调试视频: {video_path}")
     print("="*60)
     
@@ -49,20 +48,17 @@ def debug_jump_height_calculation(video_path):
     print(f"   选择帧数: {len(selected_frames)}")
     print(f"   选择的帧索引: {selected_frames}")
     
-    frames = []
-    for i in selected_frames:
-        processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-        ret, frame = processor.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
-    
-    print(f"   成功提取: {len(frames)} 帧")
-    
-    # 3. 姿态检测
+    # 3. 姿态检测：后台线程顺序解码采样帧，当前线程逐帧检测，两者重叠执行
+    # 帧先缩小到长边640像素：关键点是归一化坐标，不受缩放影响
     print(f"\n🔍 姿态检测:")
-    detector = PoseDetector()
-    pose_results = detector.detect_pose_sequence(frames)
+    # 复用的检测器先清除上一段视频的跟踪状态
+    if detector is None:
+        detector = PoseDetector()
+    else:
+        detector.reset()
+    pose_results = detector.detect_pose_stream(processor.iter_sampled_frames(frame_step, target_size=processor.scaled_size()))
+    
+    print(f"   成功提取: {len(pose_results)} 帧")
     
     valid_poses = sum(1 for result in pose_results if result is not None)
     print(f"   有效姿态: {valid_poses}/{len(pose_results)} 帧")
@@ -183,19 +179,21 @@ def main():
     # 测试所有视频
     test_videos = ['M1.mp4', 'M2.mp4', 'M3.mp4', 'M4.mp4']
     
-    for video_name in test_videos:
-        video_path = f'test_videos/{video_name}'
-        
-        if not os.path.exists(video_path):
-            print(f"⚠️ 跳过不存在的视频: {video_path}")
-            continue
-        
-        print(f"\n{'='*60}")
-        result, centers = debug_jump_height_calculation(video_path)
-        print(f"{'='*60}")
-        
-        # 等待用户继续
-        input(f"\n按回车键继续分析下一个视频...")
+    # 所有视频共用一个检测器，只创建一次MediaPipe图
+    with PoseDetector() as detector:
+        for video_name in test_videos:
+            video_path = f'test_videos/{video_name}'
+            
+            if not os.path.exists(video_path):
+                print(f"⚠️ 跳过不存在的视频: {video_path}")
+                continue
+            
+            print(f"\n{'='*60}")
+            result, centers = debug_jump_height_calculation(video_path, detector)
+            print(f"{'='*60}")
+            
+            # 等待用户继续
+            input(f"\n按回车键继续分析下一个视频...")
 
 if __name__ == "__main__":
     import os
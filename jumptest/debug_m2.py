@@ -4,7 +4,6 @@
 """
 
 import sys
-import cv2
 sys.path.append('src')
 
 from video_processor import VideoProcessor
@@ -31,24 +30,17 @@ def debug_video_analysis(video_path):
     total_frames = info['total_frames']
     selected_frames = list(range(0, total_frames, frame_step))
     
-    frames = []
-    for i in selected_frames:
-        processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-        ret, frame = processor.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
-    
     print(f'\n帧处理:')
     print(f'  总帧数: {total_frames}')
     print(f'  采样步长: {frame_step}')
     print(f'  选择帧数: {len(selected_frames)}')
-    print(f'  成功提取: {len(frames)}')
     
-    # 姿态检测
+    # 姿态检测：后台线程顺序解码采样帧，当前线程逐帧检测，两者重叠执行
+    # 帧先缩小到长边640像素：关键点是归一化坐标，不受缩放影响
     print(f'\n姿态检测:')
     detector = PoseDetector()
-    pose_results = detector.detect_pose_sequence(frames)
+    pose_results = detector.detect_pose_stream(processor.iter_sampled_frames(frame_step, target_size=processor.scaled_size()))
+    print(f'  成功提取: {len(pose_results)}')
     
     valid_poses = sum(1 for result in pose_results if result is not None)
     print(f'  检测结果: {valid_poses}/{len(pose_results)} 帧有效')
@@ -7,14 +7,12 @@ MediaPipe返回的是归一化坐标，需要转换为像素坐标
 import sys
 import os
 import json
-import base64
 from io import BytesIO
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 import datetime
-import cv2
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'Helvetica', 'DejaVu Sans']
@@ -30,11 +28,13 @@ from pose_detector import PoseDetector
 class FixedJumpAnalyzer:
     """修复版跳跃分析器 - 正确处理像素坐标"""
     
-    def __init__(self, fps: float = 30.0, video_width: int = 720, video_height: int = 1280):
+    def __init__(self, fps: float = 30.0, video_width: int = 720, video_height: int = 1280,
+                 pose_detector: PoseDetector = None):
         self.fps = fps
         self.video_width = video_width
         self.video_height = video_height
-        self.pose_detector = PoseDetector()
+        # 只用于计算身体中心，优先复用调用方已有的检测器，避免再创建一个MediaPipe图
+        self.pose_detector = pose_detector if pose_detector is not None else PoseDetector()
     
     def convert_normalized_to_pixels(self, normalized_coords, image_width, image_height):
         """将归一化坐标转换为像素坐标"""
@@ -112,8 +112,8 @@ class FixedJumpAnalyzer:
         }
 
 
-def analyze_video_with_fixed_height(video_path):
-    """使用修复版算法分析视频"""
+def analyze_video_with_fixed_height(video_path, detector=None):
+    """使用修复版算法分析视频（传入 detector 时复用该检测器）"""
     print(f"🔧 使用修复版算法分析: {video_path}")
     
     # 1. 加载视频
@@ -137,21 +137,16 @@ def analyze_video_with_fixed_height(video_path):
     else:
         frame_step = max(1, int(fps // 2))
     
-    selected_frames = list(range(0, total_frames, frame_step))
-    
-    frames = []
-    for i in selected_frames:
-        processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-        ret, frame = processor.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
-    
-    print(f"   🎞️ 提取了 {len(frames)} 帧")
+    # 3. 姿态检测：后台线程顺序解码采样帧，当前线程逐帧检测，两者重叠执行
+    # 帧先缩小到长边640像素：关键点是归一化坐标，不受缩放影响
+    # 复用的检测器先清除上一段视频的跟踪状态
+    if detector is None:
+        detector = PoseDetector()
+    else:
+        detector.reset()
+    pose_results = detector.detect_pose_stream(processor.iter_sampled_frames(frame_step, target_size=processor.scaled_size()))
     
-    # 3. 姿态检测
-    detector = PoseDetector()
-    pose_results = detector.detect_pose_sequence(frames)
+    print(f"   🎞️ 提取了 {len(pose_results)} 帧")
     
     valid_poses = sum(1 for result in pose_results if result is not None)
     print(f"   🔍 检测到 {valid_poses}/{len(pose_results)} 个有效姿态")
@@ -160,7 +155,8 @@ def analyze_video_with_fixed_height(video_path):
     analyzer = FixedJumpAnalyzer(
         fps=fps / frame_step,
         video_width=video_info['width'],
-        video_height=video_info['height']
+        video_height=video_info['height'],
+        pose_detector=detector
     )
     
     result = analyzer.analyze_jump_with_fixed_height(
@@ -215,23 +211,25 @@ def main():
     # 测试所有视频
     test_videos = ['M1.mp4', 'M2.mp4', 'M3.mp4', 'M4.mp4']
     
-    for video_name in test_videos:
-        video_path = f'test_videos/{video_name}'
-        
-        if not os.path.exists(video_path):
-            print(f"⚠️ 跳过不存在的视频: {video_path}")
-            continue
-        
-        try:
-            result, video_info = analyze_video_with_fixed_height(video_path)
-            if result:
-                print_comparison_results(video_name, result)
-            else:
-                print(f"❌ {video_name} 分析失败")
-        except Exception as e:
-            print(f"❌ 分析 {video_name} 时出错: {e}")
-        
-        print("\n" + "="*60)
+    # 所有视频共用一个检测器，只创建一次MediaPipe图
+    with PoseDetector() as detector:
+        for video_name in test_videos:
+            video_path = f'test_videos/{video_name}'
+            
+            if not os.path.exists(video_path):
+                print(f"⚠️ 跳过不存在的视频: {video_path}")
+                continue
+            
+            try:
+                result, video_info = analyze_video_with_fixed_height(video_path, detector)
+                if result:
+                    print_comparison_results(video_name, result)
+                else:
+                    print(f"❌ {video_name} 分析失败")
+            except Exception as e:
+                print(f"❌ 分析 {video_name} 时出错: {e}")
+            
+            print("\n" + "="*60)
     
     print("\n🎯 结论:")
     print("原来显示的0.2'像素'实际上是0.2的归一化坐标差值")
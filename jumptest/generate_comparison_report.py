@@ -7,8 +7,7 @@
 import sys
 import os
 import json
-import base64
-from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
@@ -24,7 +23,201 @@ sys.path.append('src')
 from video_processor import VideoProcessor
 from pose_detector import PoseDetector
 from jump_analyzer import JumpAnalyzer
-from visualizer import JumpVisualizer
+from visualizer import JumpVisualizer, figure_to_jpeg, html_jpeg_img, write_html
+
+
+# 报告的 <head>（含固定不变的CSS）不含变量，导入时构建一次，每份报告直接复用
+REPORT_HEAD = """
+    <!DOCTYPE html>
+    <html lang="zh-CN">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>跳跃动作对比分析报告</title>
+        <style>
+            body {
+                font-family: 'Arial', 'Microsoft YaHei', sans-serif;
+                line-height: 1.6;
+                margin: 0;
+                padding: 20px;
+                background-color: #f5f5f5;
+            }
+            .container {
+                max-width: 1400px;
+                margin: 0 auto;
+                background-color: white;
+                padding: 30px;
+                border-radius: 10px;
+                box-shadow: 0 0 20px rgba(0,0,0,0.1);
+            }
+            h1 {
+                color: #2c3e50;
+                text-align: center;
+                border-bottom: 3px solid #3498db;
+                padding-bottom: 10px;
+            }
+            h2 {
+                color: #34495e;
+                border-left: 4px solid #3498db;
+                padding-left: 15px;
+                margin-top: 30px;
+            }
+            .video-container {
+                display: grid;
+                grid-template-columns: 1fr 1fr;
+                gap: 30px;
+                margin: 30px 0;
+            }
+            .video-card {
+                background: #ecf0f1;
+                padding: 20px;
+                border-radius: 10px;
+                text-align: center;
+            }
+            .video-card h3 {
+                margin-top: 0;
+                color: #2c3e50;
+            }
+            .video-player {
+                width: 100%;
+                max-width: 400px;
+                height: 300px;
+                border-radius: 8px;
+                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+            }
+            .metrics-comparison {
+                display: grid;
+                grid-template-columns: 1fr 1fr;
+                gap: 30px;
+                margin: 30px 0;
+            }
+            .person-metrics {
+                background: #ecf0f1;
+                padding: 20px;
+                border-radius: 10px;
+            }
+            .person1 {
+                border-left: 4px solid #3498db;
+            }
+            .person2 {
+                border-left: 4px solid #e74c3c;
+            }
+            .metric-item {
+                display: flex;
+                justify-content: space-between;
+                align-items: center;
+                padding: 10px 0;
+                border-bottom: 1px solid #bdc3c7;
+            }
+            .metric-label {
+                font-weight: bold;
+                color: #34495e;
+            }
+            .metric-value {
+                font-size: 18px;
+                color: #2c3e50;
+            }
+            .score-bar {
+                background-color: #ecf0f1;
+                height: 20px;
+                border-radius: 10px;
+                margin: 10px 0;
+                overflow: hidden;
+            }
+            .score-fill-person1 {
+                height: 100%;
+                background: linear-gradient(90deg, #3498db, #2ecc71);
+                border-radius: 10px;
+                transition: width 0.3s ease;
+            }
+            .score-fill-person2 {
+                height: 100%;
+                background: linear-gradient(90deg, #e74c3c, #f39c12);
+                border-radius: 10px;
+                transition: width 0.3s ease;
+            }
+            .chart-container {
+                text-align: center;
+                margin: 30px 0;
+            }
+            .chart-container img {
+                max-width: 100%;
+                height: auto;
+                border-radius: 8px;
+                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+            }
+            .winner-badge {
+                background: linear-gradient(45deg, #f39c12, #f1c40f);
+                color: white;
+                padding: 5px 15px;
+                border-radius: 20px;
+                font-size: 14px;
+                font-weight: bold;
+                display: inline-block;
+                margin-left: 10px;
+            }
+            .video-info {
+                background: #34495e;
+                color: white;
+                padding: 10px;
+                border-radius: 5px;
+                margin-top: 10px;
+                font-size: 12px;
+            }
+            .comparison-summary {
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                color: white;
+                padding: 25px;
+                border-radius: 10px;
+                margin: 30px 0;
+            }
+            .summary-grid {
+                display: grid;
+                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+                gap: 20px;
+                margin-top: 20px;
+            }
+            .summary-item {
+                text-align: center;
+                padding: 15px;
+                background: rgba(255,255,255,0.1);
+                border-radius: 8px;
+            }
+            .summary-value {
+                font-size: 24px;
+                font-weight: bold;
+                display: block;
+            }
+            .summary-label {
+                font-size: 14px;
+                opacity: 0.9;
+            }
+        </style>
+    </head>"""
+
+
+# 对比报告中力量指标的显示名称和顺序
+STRENGTH_ITEMS = (
+    ('综合得分', 'overall_score'),
+    ('爆发力', 'explosive_power'),
+    ('核心力量', 'core_strength'),
+    ('协调性', 'coordination'),
+)
+
+
+def _strength_bars_html(strength, fill_class):
+    """生成一个人的各项力量得分及得分条HTML，每项得分只取值一次"""
+    items = []
+    for label, key in STRENGTH_ITEMS:
+        score = strength.get(key, 0)
+        items.append(f"""                    <div class="metric-item">
+                        <span class="metric-label">{label}</span>
+                        <span class="metric-value">{score:.3f}</span>
+                    </div>
+                    <div class="score-bar">
+                        <div class="{fill_class}" style="width: {score * 100}%"></div>
+                    </div>""")
+    return "\n" + "\n                    \n".join(items) + "\n        "
 
 
 def analyze_video_for_comparison(video_path):
@@ -40,24 +233,16 @@ def analyze_video_for_comparison(video_path):
     # 提取帧
     fps = video_info['fps']
     frame_step = max(1, int(fps // 2))
-    total_frames = video_info['total_frames']
-    selected_frames = list(range(0, total_frames, frame_step))
-    
-    frames = []
-    for i in selected_frames:
-        processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-        ret, frame = processor.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
-    
-    # 姿态检测
+    
+    # 姿态检测：后台线程顺序解码采样帧，当前线程逐帧检测并把结果交给分析器累积，不保留姿态结果列表
+    # 帧先缩小到长边640像素：关键点是归一化坐标，不受缩放影响
     detector = PoseDetector()
-    pose_results = detector.detect_pose_sequence(frames)
+    analyzer = JumpAnalyzer(fps=fps / frame_step)
+    for pose_result in detector.iter_pose_stream(processor.iter_sampled_frames(frame_step, target_size=processor.scaled_size())):
+        analyzer.update(pose_result)
     
     # 跳跃分析
-    analyzer = JumpAnalyzer(fps=fps / frame_step)
-    analysis_result = analyzer.analyze_jump_sequence(pose_results)
+    analysis_result = analyzer.finalize()
     
     processor.release()
     
@@ -72,13 +257,12 @@ def create_comparison_charts(analysis1, analysis2, video_names):
     # 1. 身体中心轨迹对比
     ax = axes[0, 0]
     for i, (analysis, name, color) in enumerate(zip([analysis1, analysis2], video_names, ['blue', 'red'])):
-        body_centers = analysis.get('body_centers', [])
-        valid_centers = [(i, center) for i, center in enumerate(body_centers) if center is not None]
+        # body_centers 为 (N, 2) 数组，缺失帧为NaN
+        body_centers = np.asarray(analysis.get('body_centers', []), dtype=float).reshape(-1, 2)
+        frames = np.flatnonzero(~np.isnan(body_centers[:, 1]))
         
-        if valid_centers:
-            frames = [i for i, _ in valid_centers]
-            y_coords = [center[1] for _, center in valid_centers]
-            ax.plot(frames, y_coords, color=color, linewidth=2, marker='o', label=name, alpha=0.7)
+        if len(frames):
+            ax.plot(frames, body_centers[frames, 1], color=color, linewidth=2, marker='o', label=name, alpha=0.7)
     
     ax.set_xlabel('帧数')
     ax.set_ylabel('垂直位置')
@@ -282,14 +466,10 @@ def create_comparison_charts(analysis1, analysis2, video_names):
     
     plt.tight_layout()
     
-    # 转换为base64
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
+    # 渲染为JPEG，写HTML时再base64编码
+    chart_jpeg = figure_to_jpeg(fig)
     
-    return image_base64
+    return chart_jpeg
 
 
 def generate_comparison_html_report(analysis1, analysis2, video_info1, video_info2, video_names, output_path):
@@ -303,173 +483,8 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
     video_path2 = f"../test_videos/{video_names[1]}"
     
     # HTML模板
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="zh-CN">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>跳跃动作对比分析报告</title>
-        <style>
-            body {{
-                font-family: 'Arial', 'Microsoft YaHei', sans-serif;
-                line-height: 1.6;
-                margin: 0;
-                padding: 20px;
-                background-color: #f5f5f5;
-            }}
-            .container {{
-                max-width: 1400px;
-                margin: 0 auto;
-                background-color: white;
-                padding: 30px;
-                border-radius: 10px;
-                box-shadow: 0 0 20px rgba(0,0,0,0.1);
-            }}
-            h1 {{
-                color: #2c3e50;
-                text-align: center;
-                border-bottom: 3px solid #3498db;
-                padding-bottom: 10px;
-            }}
-            h2 {{
-                color: #34495e;
-                border-left: 4px solid #3498db;
-                padding-left: 15px;
-                margin-top: 30px;
-            }}
-            .video-container {{
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 30px;
-                margin: 30px 0;
-            }}
-            .video-card {{
-                background: #ecf0f1;
-                padding: 20px;
-                border-radius: 10px;
-                text-align: center;
-            }}
-            .video-card h3 {{
-                margin-top: 0;
-                color: #2c3e50;
-            }}
-            .video-player {{
-                width: 100%;
-                max-width: 400px;
-                height: 300px;
-                border-radius: 8px;
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-            }}
-            .metrics-comparison {{
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 30px;
-                margin: 30px 0;
-            }}
-            .person-metrics {{
-                background: #ecf0f1;
-                padding: 20px;
-                border-radius: 10px;
-            }}
-            .person1 {{
-                border-left: 4px solid #3498db;
-            }}
-            .person2 {{
-                border-left: 4px solid #e74c3c;
-            }}
-            .metric-item {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                padding: 10px 0;
-                border-bottom: 1px solid #bdc3c7;
-            }}
-            .metric-label {{
-                font-weight: bold;
-                color: #34495e;
-            }}
-            .metric-value {{
-                font-size: 18px;
-                color: #2c3e50;
-            }}
-            .score-bar {{
-                background-color: #ecf0f1;
-                height: 20px;
-                border-radius: 10px;
-                margin: 10px 0;
-                overflow: hidden;
-            }}
-            .score-fill-person1 {{
-                height: 100%;
-                background: linear-gradient(90deg, #3498db, #2ecc71);
-                border-radius: 10px;
-                transition: width 0.3s ease;
-            }}
-            .score-fill-person2 {{
-                height: 100%;
-                background: linear-gradient(90deg, #e74c3c, #f39c12);
-                border-radius: 10px;
-                transition: width 0.3s ease;
-            }}
-            .chart-container {{
-                text-align: center;
-                margin: 30px 0;
-            }}
-            .chart-container img {{
-                max-width: 100%;
-                height: auto;
-                border-radius: 8px;
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-            }}
-            .winner-badge {{
-                background: linear-gradient(45deg, #f39c12, #f1c40f);
-                color: white;
-                padding: 5px 15px;
-                border-radius: 20px;
-                font-size: 14px;
-                font-weight: bold;
-                display: inline-block;
-                margin-left: 10px;
-            }}
-            .video-info {{
-                background: #34495e;
-                color: white;
-                padding: 10px;
-                border-radius: 5px;
-                margin-top: 10px;
-                font-size: 12px;
-            }}
-            .comparison-summary {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 25px;
-                border-radius: 10px;
-                margin: 30px 0;
-            }}
-            .summary-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-top: 20px;
-            }}
-            .summary-item {{
-                text-align: center;
-                padding: 15px;
-                background: rgba(255,255,255,0.1);
-                border-radius: 8px;
-            }}
-            .summary-value {{
-                font-size: 24px;
-                font-weight: bold;
-                display: block;
-            }}
-            .summary-label {{
-                font-size: 14px;
-                opacity: 0.9;
-            }}
-        </style>
-    </head>
+    # 按片段收集HTML，最后一次性输出，避免反复拼接越来越长的字符串
+    html_parts = [REPORT_HEAD, f"""
     <body>
         <div class="container">
             <h1>🏃‍♂️ 跳跃动作对比分析报告</h1>
@@ -502,7 +517,7 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
                     </div>
                 </div>
             </div>
-    """
+    """]
     
     # 获取分析数据
     jump_metrics1 = analysis1.get('jump_metrics', {})
@@ -522,7 +537,7 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
         winner_text2 = '<span class="winner-badge">🏆 综合优胜</span>'
     
     # 添加对比摘要
-    html_content += f"""
+    html_parts.append(f"""
             <div class="comparison-summary">
                 <h3 style="margin-top: 0; text-align: center;">📊 对比摘要</h3>
                 <div class="summary-grid">
@@ -549,11 +564,11 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
             <div class="metrics-comparison">
                 <div class="person-metrics person1">
                     <h3>{video_names[0]} {winner_text1}</h3>
-    """
+    """)
     
     # 添加第一个人的指标
     if 'error' not in jump_metrics1:
-        html_content += f"""
+        html_parts.append(f"""
                     <div class="metric-item">
                         <span class="metric-label">跳跃高度</span>
                         <span class="metric-value">{jump_metrics1.get('jump_height_pixels', 0):.1f} 像素</span>
@@ -566,53 +581,21 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
                         <span class="metric-label">总时间</span>
                         <span class="metric-value">{jump_metrics1.get('total_duration', 0):.3f} 秒</span>
                     </div>
-        """
+        """)
     
     if 'error' not in strength1:
-        html_content += f"""
-                    <div class="metric-item">
-                        <span class="metric-label">综合得分</span>
-                        <span class="metric-value">{strength1.get('overall_score', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person1" style="width: {strength1.get('overall_score', 0) * 100}%"></div>
-                    </div>
-                    
-                    <div class="metric-item">
-                        <span class="metric-label">爆发力</span>
-                        <span class="metric-value">{strength1.get('explosive_power', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person1" style="width: {strength1.get('explosive_power', 0) * 100}%"></div>
-                    </div>
-                    
-                    <div class="metric-item">
-                        <span class="metric-label">核心力量</span>
-                        <span class="metric-value">{strength1.get('core_strength', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person1" style="width: {strength1.get('core_strength', 0) * 100}%"></div>
-                    </div>
-                    
-                    <div class="metric-item">
-                        <span class="metric-label">协调性</span>
-                        <span class="metric-value">{strength1.get('coordination', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person1" style="width: {strength1.get('coordination', 0) * 100}%"></div>
-                    </div>
-        """
+        html_parts.append(_strength_bars_html(strength1, 'score-fill-person1'))
     
-    html_content += f"""
+    html_parts.append(f"""
                 </div>
                 
                 <div class="person-metrics person2">
                     <h3>{video_names[1]} {winner_text2}</h3>
-    """
+    """)
     
     # 添加第二个人的指标
     if 'error' not in jump_metrics2:
-        html_content += f"""
+        html_parts.append(f"""
                     <div class="metric-item">
                         <span class="metric-label">跳跃高度</span>
                         <span class="metric-value">{jump_metrics2.get('jump_height_pixels', 0):.1f} 像素</span>
@@ -625,57 +608,27 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
                         <span class="metric-label">总时间</span>
                         <span class="metric-value">{jump_metrics2.get('total_duration', 0):.3f} 秒</span>
                     </div>
-        """
+        """)
     
     if 'error' not in strength2:
-        html_content += f"""
-                    <div class="metric-item">
-                        <span class="metric-label">综合得分</span>
-                        <span class="metric-value">{strength2.get('overall_score', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person2" style="width: {strength2.get('overall_score', 0) * 100}%"></div>
-                    </div>
-                    
-                    <div class="metric-item">
-                        <span class="metric-label">爆发力</span>
-                        <span class="metric-value">{strength2.get('explosive_power', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person2" style="width: {strength2.get('explosive_power', 0) * 100}%"></div>
-                    </div>
-                    
-                    <div class="metric-item">
-                        <span class="metric-label">核心力量</span>
-                        <span class="metric-value">{strength2.get('core_strength', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person2" style="width: {strength2.get('core_strength', 0) * 100}%"></div>
-                    </div>
-                    
-                    <div class="metric-item">
-                        <span class="metric-label">协调性</span>
-                        <span class="metric-value">{strength2.get('coordination', 0):.3f}</span>
-                    </div>
-                    <div class="score-bar">
-                        <div class="score-fill-person2" style="width: {strength2.get('coordination', 0) * 100}%"></div>
-                    </div>
-        """
+        html_parts.append(_strength_bars_html(strength2, 'score-fill-person2'))
     
-    html_content += f"""
+    html_parts.append(f"""
                 </div>
             </div>
             
             <h2>📈 可视化对比分析</h2>
             <div class="chart-container">
-                <img src="data:image/png;base64,{comparison_chart}" alt="跳跃对比分析图表">
+                """)
+    html_parts.extend(html_jpeg_img(comparison_chart, '跳跃对比分析图表'))
+    html_parts.append(f"""
             </div>
             
             <h2>📝 对比分析结论</h2>
             <div class="comparison-summary">
                 <h4>🔍 分析要点：</h4>
                 <ul>
-    """
+    """)
     
     # 添加分析结论
     if overall1 > overall2:
@@ -687,7 +640,7 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
         loser = video_names[0]
         score_diff = overall2 - overall1
     
-    html_content += f"""
+    html_parts.append(f"""
                     <li><strong>综合表现：</strong>{winner} 在综合评分中领先 {score_diff:.3f} 分</li>
                     <li><strong>优势分析：</strong>两位测试者各有特色，建议相互学习对方的优势技术</li>
                     <li><strong>改进方向：</strong>针对各自的薄弱环节进行专项训练</li>
@@ -696,7 +649,7 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
                 
                 <h4>🎯 个性化建议：</h4>
                 <p><strong>{video_names[0]}：</strong>
-    """
+    """)
     
     # 个性化建议
     explosive1 = strength1.get('explosive_power', 0)
@@ -714,7 +667,7 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
     if not suggestions1:
         suggestions1.append("各项指标均衡，继续保持当前训练强度")
     
-    html_content += "、".join(suggestions1)
+    html_parts.append("、".join(suggestions1))
     
     explosive2 = strength2.get('explosive_power', 0)
     core2 = strength2.get('core_strength', 0)
@@ -731,13 +684,13 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
     if not suggestions2:
         suggestions2.append("各项指标均衡，继续保持当前训练强度")
     
-    html_content += f"</p><p><strong>{video_names[1]}：</strong>" + "、".join(suggestions2)
+    html_parts.append(f"</p><p><strong>{video_names[1]}：</strong>" + "、".join(suggestions2))
     
     # 获取当前时间
     import datetime
     current_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    html_content += f"""
+    html_parts.append(f"""
                 </p>
             </div>
             
@@ -749,11 +702,10 @@ def generate_comparison_html_report(analysis1, analysis2, video_info1, video_inf
         </div>
     </body>
     </html>
-    """
+    """)
     
     # 保存HTML文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_html(output_path, html_parts)
     
     return True
 
@@ -770,16 +722,17 @@ def main():
     analyses = []
     video_infos = []
     
-    for video_file in video_files:
-        video_path = os.path.join('test_videos', video_file)
-        
+    video_paths = [os.path.join('test_videos', video_file) for video_file in video_files]
+    for video_path in video_paths:
         if not os.path.exists(video_path):
             print(f"❌ 视频文件不存在: {video_path}")
             return
-        
-        print(f"分析视频: {video_file}")
-        analysis_result, video_info = analyze_video_for_comparison(video_path)
-        
+    
+    # 两个视频互不依赖，在独立进程中并行分析（每个进程各自创建检测器）
+    with ProcessPoolExecutor(max_workers=len(video_paths)) as executor:
+        results = list(executor.map(analyze_video_for_comparison, video_paths))
+    
+    for video_file, (analysis_result, video_info) in zip(video_files, results):
         if analysis_result is None:
             print(f"❌ 视频 {video_file} 分析失败")
             return
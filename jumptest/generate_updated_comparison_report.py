@@ -7,8 +7,9 @@
 import sys
 import os
 import json
-import base64
-from io import BytesIO
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import pickle
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
@@ -23,8 +24,150 @@ sys.path.append('src')
 
 from video_processor import VideoProcessor
 from pose_detector import PoseDetector
-from jump_analyzer import JumpAnalyzer
-from visualizer import JumpVisualizer
+from jump_analyzer import JumpAnalyzer, ANALYSIS_VERSION
+from visualizer import JumpVisualizer, figure_to_jpeg, html_jpeg_img, write_html
+
+
+# 姿态检测使用的MediaPipe模型复杂度，也是分析缓存键的一部分
+MODEL_COMPLEXITY = 1
+
+# 报告的 <head>（含固定不变的CSS）不含变量，导入时构建一次，每份报告直接复用
+REPORT_HEAD = """
+    <!DOCTYPE html>
+    <html lang="zh-CN">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>跳跃分析对比报告 - M1.mp4 vs M2.mp4</title>
+        <style>
+            body {
+                font-family: 'Arial', 'Microsoft YaHei', sans-serif;
+                line-height: 1.6;
+                margin: 0;
+                padding: 20px;
+                background-color: #f5f5f5;
+            }
+            .container {
+                max-width: 1400px;
+                margin: 0 auto;
+                background-color: white;
+                padding: 30px;
+                border-radius: 10px;
+                box-shadow: 0 0 20px rgba(0,0,0,0.1);
+            }
+            h1 {
+                color: #2c3e50;
+                text-align: center;
+                border-bottom: 3px solid #3498db;
+                padding-bottom: 10px;
+            }
+            h2 {
+                color: #34495e;
+                border-left: 4px solid #3498db;
+                padding-left: 15px;
+                margin-top: 30px;
+            }
+            .video-comparison {
+                display: grid;
+                grid-template-columns: 1fr 1fr;
+                gap: 30px;
+                margin: 30px 0;
+            }
+            .video-section {
+                text-align: center;
+                background: #ecf0f1;
+                padding: 25px;
+                border-radius: 10px;
+            }
+            .video-player {
+                width: 100%;
+                max-width: 500px;
+                height: 300px;
+                border-radius: 8px;
+                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+                margin: 20px 0;
+            }
+            .video-info {
+                background: #34495e;
+                color: white;
+                padding: 15px;
+                border-radius: 8px;
+                margin: 20px auto;
+                max-width: 500px;
+                text-align: left;
+            }
+            .comparison-table {
+                width: 100%;
+                border-collapse: collapse;
+                margin: 20px 0;
+            }
+            .comparison-table th,
+            .comparison-table td {
+                border: 1px solid #ddd;
+                padding: 12px;
+                text-align: center;
+            }
+            .comparison-table th {
+                background-color: #3498db;
+                color: white;
+            }
+            .comparison-table tr:nth-child(even) {
+                background-color: #f2f2f2;
+            }
+            .winner {
+                background-color: #2ecc71 !important;
+                color: white;
+                font-weight: bold;
+            }
+            .chart-container {
+                text-align: center;
+                margin: 30px 0;
+            }
+            .chart-container img {
+                max-width: 100%;
+                height: auto;
+                border-radius: 8px;
+                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+            }
+            .summary-box {
+                background: #e8f5e8;
+                border-left: 4px solid #2ecc71;
+                padding: 20px;
+                margin: 20px 0;
+                border-radius: 8px;
+            }
+            .error-message {
+                background-color: #e74c3c;
+                color: white;
+                padding: 15px;
+                border-radius: 8px;
+                margin: 10px 0;
+            }
+            .success-message {
+                background-color: #27ae60;
+                color: white;
+                padding: 15px;
+                border-radius: 8px;
+                margin: 10px 0;
+            }
+            .improvement-highlight {
+                background: #f39c12;
+                color: white;
+                padding: 10px;
+                border-radius: 5px;
+                margin: 5px 0;
+                font-weight: bold;
+            }
+        </style>
+    </head>"""
+
+
+def _frame_step(video_info):
+    """根据视频长度选择采样步长：短视频（小于4秒）每秒采样4帧，其余每秒采样2帧"""
+    fps = video_info['fps']
+    if video_info['duration'] < 4:
+        return max(1, int(fps // 4))
+    return max(1, int(fps // 2))
 
 
 def analyze_video_improved(video_path):
@@ -47,44 +190,80 @@ def analyze_video_improved(video_path):
     duration = video_info['duration']
     
     # 根据视频长度调整采样策略
-    if duration < 4:  # 短视频（小于4秒）
-        frame_step = max(1, int(fps // 4))  # 每秒采样4帧
+    frame_step = _frame_step(video_info)
+    if duration < 4:
         print(f"   检测到短视频，使用密集采样：每秒4帧")
-    else:  # 长视频
-        frame_step = max(1, int(fps // 2))  # 每秒采样2帧
+    else:
         print(f"   使用标准采样：每秒2帧")
     
-    selected_frames = list(range(0, total_frames, frame_step))
+    selected_frames = range(0, total_frames, frame_step)
     print(f"   提取帧: 从{total_frames}帧中选择{len(selected_frames)}帧进行分析")
     
-    frames = []
-    for i in selected_frames:
-        processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-        ret, frame = processor.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
+    # 顺序解码并直接写入预分配的帧数组，只对采样帧做颜色转换
+    frames = processor.extract_sampled_frames(frame_step)
     
     print(f"   成功提取 {len(frames)} 帧")
     
     # 3. 姿态检测
     print("   进行姿态检测...")
-    detector = PoseDetector()
-    pose_results = detector.detect_pose_sequence(frames)
+    with PoseDetector(model_complexity=MODEL_COMPLEXITY) as detector:
+        # 报告只需要数值结果，不需要绘制用的 pose_landmarks
+        landmarks, valid, _ = detector.detect_pose_sequence_array(frames)
     
-    valid_poses = sum(1 for result in pose_results if result is not None)
-    print(f"   检测到有效姿态: {valid_poses}/{len(pose_results)} 帧")
+    valid_poses = int(valid.sum())
+    print(f"   检测到有效姿态: {valid_poses}/{len(valid)} 帧")
     
     # 4. 跳跃分析
     print("   进行跳跃分析...")
-    analyzer = JumpAnalyzer(fps=fps / frame_step)
-    analysis_result = analyzer.analyze_jump_sequence(pose_results)
+    with JumpAnalyzer(fps=fps / frame_step) as analyzer:
+        analysis_result = analyzer.analyze_landmark_array(landmarks, valid)
     
     processor.release()
     
     return analysis_result, video_info
 
 
+def analyze_video_cached(video_path, cache_dir='outputs/.cache'):
+    """
+    带缓存的视频分析，视频文件和分析参数都未变化时直接复用上次结果
+    
+    缓存键包含视频路径、大小、修改时间、采样步长、模型复杂度和分析算法版本号，任何一项变化都会重新分析。
+    """
+    with VideoProcessor(video_path) as processor:
+        if processor.cap is None:
+            return analyze_video_improved(video_path)
+        frame_step = _frame_step(processor.get_video_info())
+        
+    stat = os.stat(video_path)
+    params = (os.path.abspath(video_path), stat.st_size, int(stat.st_mtime),
+              frame_step, MODEL_COMPLEXITY, ANALYSIS_VERSION)
+    key = hashlib.sha1(repr(params).encode()).hexdigest()[:16]
+    cache_path = os.path.join(cache_dir, f"{os.path.basename(video_path)}.{key}.pkl")
+    
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                analysis_result, video_info = pickle.load(f)
+            print(f"使用缓存的分析结果: {video_path}")
+            return analysis_result, video_info
+        except Exception as e:
+            print(f"读取缓存失败，重新分析: {e}")
+    
+    analysis_result, video_info = analyze_video_improved(video_path)
+    
+    if analysis_result is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, 'wb') as f:
+            pickle.dump((analysis_result, video_info), f)
+    
+    return analysis_result, video_info
+
+
+def _paired_values(data1, data2, keys):
+    """一次性读取两组结果中的指定字段，返回形状为 (2, len(keys)) 的数组"""
+    return np.array([[data.get(key, 0) for key in keys] for data in (data1, data2)], dtype=float)
+
+
 def generate_comparison_chart(analysis1, analysis2, video_info1, video_info2):
     """生成对比图表"""
     fig, axes = plt.subplots(2, 3, figsize=(18, 12))
@@ -97,24 +276,14 @@ def generate_comparison_chart(analysis1, analysis2, video_info1, video_info2):
     
     if 'error' not in strength1 and 'error' not in strength2:
         categories = ['爆发力', '核心力量', '协调性', '综合得分']
-        values1 = [
-            strength1.get('explosive_power', 0),
-            strength1.get('core_strength', 0),
-            strength1.get('coordination', 0),
-            strength1.get('overall_score', 0)
-        ]
-        values2 = [
-            strength2.get('explosive_power', 0),
-            strength2.get('core_strength', 0),
-            strength2.get('coordination', 0),
-            strength2.get('overall_score', 0)
-        ]
+        values = _paired_values(strength1, strength2,
+                                ('explosive_power', 'core_strength', 'coordination', 'overall_score'))
         
         x = np.arange(len(categories))
         width = 0.35
         
-        ax1.bar(x - width/2, values1, width, label='M1.mp4', color='#3498db', alpha=0.8)
-        ax1.bar(x + width/2, values2, width, label='M2.mp4', color='#e74c3c', alpha=0.8)
+        ax1.bar(x - width/2, values[0], width, label='M1.mp4', color='#3498db', alpha=0.8)
+        ax1.bar(x + width/2, values[1], width, label='M2.mp4', color='#e74c3c', alpha=0.8)
         
         ax1.set_ylabel('得分')
         ax1.set_title('力量评估对比')
@@ -133,24 +302,15 @@ def generate_comparison_chart(analysis1, analysis2, video_info1, video_info2):
     
     if 'error' not in metrics1 and 'error' not in metrics2:
         categories = ['跳跃高度\n(像素)', '起跳时间\n(秒)', '准备时间\n(秒)', '落地时间\n(秒)']
-        values1 = [
-            metrics1.get('jump_height_pixels', 0),
-            abs(metrics1.get('takeoff_duration', 0)),
-            metrics1.get('preparation_duration', 0),
-            metrics1.get('landing_duration', 0)
-        ]
-        values2 = [
-            metrics2.get('jump_height_pixels', 0),
-            abs(metrics2.get('takeoff_duration', 0)),
-            metrics2.get('preparation_duration', 0),
-            metrics2.get('landing_duration', 0)
-        ]
+        values = _paired_values(metrics1, metrics2,
+                                ('jump_height_pixels', 'takeoff_duration', 'preparation_duration', 'landing_duration'))
+        values[:, 1] = np.abs(values[:, 1])
         
         x = np.arange(len(categories))
         width = 0.35
         
-        ax2.bar(x - width/2, values1, width, label='M1.mp4', color='#3498db', alpha=0.8)
-        ax2.bar(x + width/2, values2, width, label='M2.mp4', color='#e74c3c', alpha=0.8)
+        ax2.bar(x - width/2, values[0], width, label='M1.mp4', color='#3498db', alpha=0.8)
+        ax2.bar(x + width/2, values[1], width, label='M2.mp4', color='#e74c3c', alpha=0.8)
         
         ax2.set_ylabel('数值')
         ax2.set_title('跳跃指标对比')
@@ -184,22 +344,19 @@ M2.mp4:
     
     # 4. 身体中心轨迹对比
     ax4 = axes[1, 0]
-    centers1 = analysis1.get('body_centers', [])
-    centers2 = analysis2.get('body_centers', [])
+    centers1 = np.asarray(analysis1.get('body_centers', []), dtype=float).reshape(-1, 2)
+    centers2 = np.asarray(analysis2.get('body_centers', []), dtype=float).reshape(-1, 2)
     
-    if centers1 and centers2:
-        valid_centers1 = [(i, center) for i, center in enumerate(centers1) if center is not None]
-        valid_centers2 = [(i, center) for i, center in enumerate(centers2) if center is not None]
+    if len(centers1) and len(centers2):
+        # body_centers 为 (N, 2) 数组，缺失帧为NaN
+        frame_indices1 = np.flatnonzero(~np.isnan(centers1[:, 1]))
+        frame_indices2 = np.flatnonzero(~np.isnan(centers2[:, 1]))
         
-        if valid_centers1:
-            y_coords1 = [center[1] for _, center in valid_centers1]
-            frame_indices1 = [i for i, _ in valid_centers1]
-            ax4.plot(frame_indices1, y_coords1, 'o-', label='M1.mp4', color='#3498db', linewidth=2)
+        if len(frame_indices1):
+            ax4.plot(frame_indices1, centers1[frame_indices1, 1], 'o-', label='M1.mp4', color='#3498db', linewidth=2)
         
-        if valid_centers2:
-            y_coords2 = [center[1] for _, center in valid_centers2]
-            frame_indices2 = [i for i, _ in valid_centers2]
-            ax4.plot(frame_indices2, y_coords2, 's-', label='M2.mp4', color='#e74c3c', linewidth=2)
+        if len(frame_indices2):
+            ax4.plot(frame_indices2, centers2[frame_indices2, 1], 's-', label='M2.mp4', color='#e74c3c', linewidth=2)
         
         ax4.set_xlabel('帧索引')
         ax4.set_ylabel('Y坐标 (像素)')
@@ -219,20 +376,16 @@ M2.mp4:
         phases = ['准备阶段', '起跳阶段', '落地阶段']
         phase_keys = ['preparation_posture', 'takeoff_posture', 'landing_posture']
         
-        stability1 = []
-        stability2 = []
-        
-        for key in phase_keys:
-            s1 = posture1.get(key, {}).get('stability_score', 0) or 0
-            s2 = posture2.get(key, {}).get('stability_score', 0) or 0
-            stability1.append(s1)
-            stability2.append(s2)
+        stability = np.array([
+            [posture.get(key, {}).get('stability_score', 0) or 0 for key in phase_keys]
+            for posture in (posture1, posture2)
+        ], dtype=float)
         
         x = np.arange(len(phases))
         width = 0.35
         
-        ax5.bar(x - width/2, stability1, width, label='M1.mp4', color='#3498db', alpha=0.8)
-        ax5.bar(x + width/2, stability2, width, label='M2.mp4', color='#e74c3c', alpha=0.8)
+        ax5.bar(x - width/2, stability[0], width, label='M1.mp4', color='#3498db', alpha=0.8)
+        ax5.bar(x + width/2, stability[1], width, label='M2.mp4', color='#e74c3c', alpha=0.8)
         
         ax5.set_ylabel('稳定性得分')
         ax5.set_title('各阶段稳定性对比')
@@ -284,18 +437,14 @@ M2.mp4:
     
     plt.tight_layout()
     
-    # 转换为base64
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
+    # 渲染为JPEG，写HTML时再base64编码
+    chart_jpeg = figure_to_jpeg(fig)
     
-    return image_base64
+    return chart_jpeg
 
 
-def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_info2, chart_base64):
-    """生成更新的对比HTML报告"""
+def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_info2, chart_jpeg):
+    """生成更新的对比HTML报告，返回HTML片段列表（由 write_html 写出）"""
     
     # 获取分析结果
     strength1 = analysis1.get('strength_assessment', {})
@@ -319,134 +468,8 @@ def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_in
     import datetime
     current_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="zh-CN">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>跳跃分析对比报告 - M1.mp4 vs M2.mp4</title>
-        <style>
-            body {{
-                font-family: 'Arial', 'Microsoft YaHei', sans-serif;
-                line-height: 1.6;
-                margin: 0;
-                padding: 20px;
-                background-color: #f5f5f5;
-            }}
-            .container {{
-                max-width: 1400px;
-                margin: 0 auto;
-                background-color: white;
-                padding: 30px;
-                border-radius: 10px;
-                box-shadow: 0 0 20px rgba(0,0,0,0.1);
-            }}
-            h1 {{
-                color: #2c3e50;
-                text-align: center;
-                border-bottom: 3px solid #3498db;
-                padding-bottom: 10px;
-            }}
-            h2 {{
-                color: #34495e;
-                border-left: 4px solid #3498db;
-                padding-left: 15px;
-                margin-top: 30px;
-            }}
-            .video-comparison {{
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 30px;
-                margin: 30px 0;
-            }}
-            .video-section {{
-                text-align: center;
-                background: #ecf0f1;
-                padding: 25px;
-                border-radius: 10px;
-            }}
-            .video-player {{
-                width: 100%;
-                max-width: 500px;
-                height: 300px;
-                border-radius: 8px;
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-                margin: 20px 0;
-            }}
-            .video-info {{
-                background: #34495e;
-                color: white;
-                padding: 15px;
-                border-radius: 8px;
-                margin: 20px auto;
-                max-width: 500px;
-                text-align: left;
-            }}
-            .comparison-table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin: 20px 0;
-            }}
-            .comparison-table th,
-            .comparison-table td {{
-                border: 1px solid #ddd;
-                padding: 12px;
-                text-align: center;
-            }}
-            .comparison-table th {{
-                background-color: #3498db;
-                color: white;
-            }}
-            .comparison-table tr:nth-child(even) {{
-                background-color: #f2f2f2;
-            }}
-            .winner {{
-                background-color: #2ecc71 !important;
-                color: white;
-                font-weight: bold;
-            }}
-            .chart-container {{
-                text-align: center;
-                margin: 30px 0;
-            }}
-            .chart-container img {{
-                max-width: 100%;
-                height: auto;
-                border-radius: 8px;
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-            }}
-            .summary-box {{
-                background: #e8f5e8;
-                border-left: 4px solid #2ecc71;
-                padding: 20px;
-                margin: 20px 0;
-                border-radius: 8px;
-            }}
-            .error-message {{
-                background-color: #e74c3c;
-                color: white;
-                padding: 15px;
-                border-radius: 8px;
-                margin: 10px 0;
-            }}
-            .success-message {{
-                background-color: #27ae60;
-                color: white;
-                padding: 15px;
-                border-radius: 8px;
-                margin: 10px 0;
-            }}
-            .improvement-highlight {{
-                background: #f39c12;
-                color: white;
-                padding: 10px;
-                border-radius: 5px;
-                margin: 5px 0;
-                font-weight: bold;
-            }}
-        </style>
-    </head>
+    # 按片段收集HTML，最后一次性输出，避免反复拼接越来越长的字符串
+    html_parts = [REPORT_HEAD, f"""
     <body>
         <div class="container">
             <h1>🏃‍♂️ 跳跃分析对比报告</h1>
@@ -493,10 +516,10 @@ def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_in
                     </div>
                 </div>
             </div>
-    """
+    """]
     
     # 添加对比表格
-    html_content += """
+    html_parts.append("""
             <h2>📊 详细对比数据</h2>
             <table class="comparison-table">
                 <thead>
@@ -508,7 +531,7 @@ def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_in
                     </tr>
                 </thead>
                 <tbody>
-    """
+    """)
     
     # 跳跃指标对比
     if 'error' not in metrics1 and 'error' not in metrics2:
@@ -519,25 +542,25 @@ def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_in
         
         # 跳跃高度对比
         height_winner = "M1.mp4" if height1 > height2 else "M2.mp4" if height2 > height1 else "相同"
-        html_content += f"""
+        html_parts.append(f"""
                     <tr>
                         <td>跳跃高度 (像素)</td>
                         <td {"class='winner'" if height_winner == "M1.mp4" else ""}>{height1:.1f}</td>
                         <td {"class='winner'" if height_winner == "M2.mp4" else ""}>{height2:.1f}</td>
                         <td>{height_winner}</td>
                     </tr>
-        """
+        """)
         
         # 起跳时间对比（时间越短越好）
         takeoff_winner = "M1.mp4" if takeoff1 < takeoff2 else "M2.mp4" if takeoff2 < takeoff1 else "相同"
-        html_content += f"""
+        html_parts.append(f"""
                     <tr>
                         <td>起跳时间 (秒)</td>
                         <td {"class='winner'" if takeoff_winner == "M1.mp4" else ""}>{takeoff1:.3f}</td>
                         <td {"class='winner'" if takeoff_winner == "M2.mp4" else ""}>{takeoff2:.3f}</td>
                         <td>{takeoff_winner}</td>
                     </tr>
-        """
+        """)
     
     # 力量评估对比
     if 'error' not in strength1 and 'error' not in strength2:
@@ -552,72 +575,74 @@ def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_in
         
         # 综合得分对比
         overall_winner = "M1.mp4" if overall1 > overall2 else "M2.mp4" if overall2 > overall1 else "相同"
-        html_content += f"""
+        html_parts.append(f"""
                     <tr>
                         <td>综合得分</td>
                         <td {"class='winner'" if overall_winner == "M1.mp4" else ""}>{overall1:.3f}</td>
                         <td {"class='winner'" if overall_winner == "M2.mp4" else ""}>{overall2:.3f}</td>
                         <td>{overall_winner}</td>
                     </tr>
-        """
+        """)
         
         # 爆发力对比
         explosive_winner = "M1.mp4" if explosive1 > explosive2 else "M2.mp4" if explosive2 > explosive1 else "相同"
-        html_content += f"""
+        html_parts.append(f"""
                     <tr>
                         <td>爆发力</td>
                         <td {"class='winner'" if explosive_winner == "M1.mp4" else ""}>{explosive1:.3f}</td>
                         <td {"class='winner'" if explosive_winner == "M2.mp4" else ""}>{explosive2:.3f}</td>
                         <td>{explosive_winner}</td>
                     </tr>
-        """
+        """)
         
         # 核心力量对比
         core_winner = "M1.mp4" if core1 > core2 else "M2.mp4" if core2 > core1 else "相同"
-        html_content += f"""
+        html_parts.append(f"""
                     <tr>
                         <td>核心力量</td>
                         <td {"class='winner'" if core_winner == "M1.mp4" else ""}>{core1:.3f}</td>
                         <td {"class='winner'" if core_winner == "M2.mp4" else ""}>{core2:.3f}</td>
                         <td>{core_winner}</td>
                     </tr>
-        """
+        """)
         
         # 协调性对比
         coord_winner = "M1.mp4" if coord1 > coord2 else "M2.mp4" if coord2 > coord1 else "相同"
-        html_content += f"""
+        html_parts.append(f"""
                     <tr>
                         <td>协调性</td>
                         <td {"class='winner'" if coord_winner == "M1.mp4" else ""}>{coord1:.3f}</td>
                         <td {"class='winner'" if coord_winner == "M2.mp4" else ""}>{coord2:.3f}</td>
                         <td>{coord_winner}</td>
                     </tr>
-        """
+        """)
     
-    html_content += """
+    html_parts.append("""
                 </tbody>
             </table>
-    """
+    """)
     
     # 添加改进亮点
     if improvements:
-        html_content += """
+        html_parts.append("""
             <h2>🔥 性能对比亮点</h2>
-        """
+        """)
         for improvement in improvements:
-            html_content += f'<div class="improvement-highlight">{improvement}</div>'
+            html_parts.append(f'<div class="improvement-highlight">{improvement}</div>')
     
     # 添加图表
-    html_content += f"""
+    html_parts.append(f"""
             <h2>📈 可视化对比分析</h2>
             <div class="chart-container">
-                <img src="data:image/png;base64,{chart_base64}" alt="跳跃分析对比图表">
+                """)
+    html_parts.extend(html_jpeg_img(chart_jpeg, '跳跃分析对比图表'))
+    html_parts.append(f"""
             </div>
             
             <h2>🎯 分析总结</h2>
             <div class="summary-box">
                 <h3>🔍 主要发现</h3>
-    """
+    """)
     
     # 添加分析总结
     if 'error' not in strength1 and 'error' not in strength2:
@@ -625,41 +650,41 @@ def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_in
         overall2 = strength2.get('overall_score', 0)
         
         if overall2 > overall1:
-            html_content += f"""
+            html_parts.append(f"""
                 <p><strong>🏆 M2.mp4 表现更优秀</strong></p>
                 <ul>
                     <li>综合得分：{overall2:.3f} vs {overall1:.3f}</li>
                     <li>尽管M2.mp4视频时长较短（{video_info2.get('duration', 0):.2f}秒），但通过改进的分析算法成功获得了完整的分析结果</li>
                     <li>M2.mp4在多项指标上表现更好，展现出更优的跳跃技术</li>
                 </ul>
-            """
+            """)
         elif overall1 > overall2:
-            html_content += f"""
+            html_parts.append(f"""
                 <p><strong>🏆 M1.mp4 表现更优秀</strong></p>
                 <ul>
                     <li>综合得分：{overall1:.3f} vs {overall2:.3f}</li>
                     <li>M1.mp4视频时长较长（{video_info1.get('duration', 0):.2f}秒），提供了更多的分析数据</li>
                     <li>M1.mp4在多项指标上表现更好，展现出更稳定的跳跃技术</li>
                 </ul>
-            """
+            """)
         else:
-            html_content += f"""
+            html_parts.append(f"""
                 <p><strong>🤝 两个视频表现相当</strong></p>
                 <ul>
                     <li>综合得分：{overall1:.3f} vs {overall2:.3f}</li>
                     <li>两个视频各有优势，整体技术水平相近</li>
                 </ul>
-            """
+            """)
     else:
-        html_content += """
+        html_parts.append("""
                 <p><strong>⚠️ 部分数据分析受限</strong></p>
                 <ul>
                     <li>由于视频质量或长度限制，部分指标无法完整分析</li>
                     <li>建议使用更长、更清晰的视频进行分析</li>
                 </ul>
-        """
+        """)
     
-    html_content += f"""
+    html_parts.append(f"""
                 <h3>💡 技术改进亮点</h3>
                 <ul>
                     <li><strong>解决短视频分析问题：</strong> 成功将M2.mp4的最小数据点要求从10帧降低到3帧</li>
@@ -686,9 +711,9 @@ def generate_updated_comparison_html(analysis1, analysis2, video_info1, video_in
         </div>
     </body>
     </html>
-    """
+    """)
     
-    return html_content
+    return html_parts
 
 
 def main():
@@ -707,8 +732,12 @@ def main():
         if not os.path.exists(video_path):
             print(f"❌ 视频文件不存在: {video_path}")
             return
-        
-        analysis, video_info = analyze_video_improved(video_path)
+    
+    # 两个视频互不依赖，在独立进程中并行分析（每个进程各自创建检测器）
+    with ProcessPoolExecutor(max_workers=len(video_paths)) as executor:
+        results = list(executor.map(analyze_video_cached, video_paths))
+    
+    for video_path, (analysis, video_info) in zip(video_paths, results):
         if analysis is None:
             print(f"❌ 视频分析失败: {video_path}")
             return
@@ -718,16 +747,15 @@ def main():
     
     # 生成对比图表
     print("\n生成对比图表...")
-    chart_base64 = generate_comparison_chart(analyses[0], analyses[1], video_infos[0], video_infos[1])
+    chart_jpeg = generate_comparison_chart(analyses[0], analyses[1], video_infos[0], video_infos[1])
     
     # 生成HTML报告
     print("生成HTML报告...")
-    html_content = generate_updated_comparison_html(analyses[0], analyses[1], video_infos[0], video_infos[1], chart_base64)
+    html_parts = generate_updated_comparison_html(analyses[0], analyses[1], video_infos[0], video_infos[1], chart_jpeg)
     
     # 保存HTML文件
     output_path = 'outputs/updated_comparison_report.html'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_html(output_path, html_parts)
     
     print(f"\n✅ 更新的对比报告已保存: {output_path}")
     
@@ -32,22 +32,39 @@ def analyze_m3_jump_height():
     # 2. 提取关键帧进行分析
     fps = video_info['fps']
     frame_step = max(1, int(fps // 4))  # 每秒4帧
+    # 只需要身体中心Y坐标（归一化坐标），缩小到256像素宽度即可，不影响结果比例
+    target_width = 256
+    target_height = max(1, int(round(target_width * video_info['height'] / video_info['width'])))
     selected_frames = list(range(0, video_info['total_frames'], frame_step))
     
     print(f"\n🎞️ 提取 {len(selected_frames)} 帧进行分析")
     
-    frames = []
-    for i in selected_frames:
-        processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
+    # 有OpenCL设备时缩放和颜色转换走OpenCV的T-API（UMat），由GPU完成
+    use_opencl = cv2.ocl.haveOpenCL()
+    cv2.ocl.setUseOpenCL(use_opencl)
+    
+    # 顺序解码并按步长保留帧，避免每帧随机定位带来的关键帧重复解码；结果直接写入预分配的帧数组
+    frames = np.empty((len(selected_frames), target_height, target_width, 3), dtype=np.uint8)
+    count = 0
+    for i in range(video_info['total_frames']):
         ret, frame = processor.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
+        if not ret:
+            break
+        if i % frame_step == 0:
+            if use_opencl:
+                frame = cv2.UMat(frame)
+            frame = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_AREA)
+            if use_opencl:
+                frames[count] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).get()
+            else:
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frames[count])
+            count += 1
+    frames = frames[:count]
     
     # 3. 姿态检测
     print(f"\n🔍 进行姿态检测...")
-    detector = PoseDetector()
-    pose_results = detector.detect_pose_sequence(frames)
+    with PoseDetector(model_complexity=0) as detector:  # 使用轻量模型
+        pose_results = detector.detect_pose_sequence(frames)
     
     # 4. 分析身体中心点
     print(f"\n📊 身体中心点Y坐标分析:")
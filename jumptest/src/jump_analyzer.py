@@ -1,8 +1,11 @@
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-import math
 from scipy.signal import find_peaks, savgol_filter
 from pose_detector import PoseDetector
+from jump_numerics import stability_score, symmetry_score, angle_smoothness
+
+# 分析算法版本号：修改阶段识别、指标计算等会改变分析结果的逻辑时递增，使缓存的旧结果失效
+ANALYSIS_VERSION = 3
 
 class JumpAnalyzer:
     """跳跃分析类，分析跳跃动作的各项指标"""
@@ -17,6 +20,21 @@ class JumpAnalyzer:
         self.fps = fps
         self.pose_detector = PoseDetector()
         
+        # update 逐帧累积的关键点坐标，由 finalize 一次分析
+        self._frame_coords = []
+        self.valid_frames = 0
+        
+    def close(self):
+        """释放内部姿态检测器的资源"""
+        self.pose_detector.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+        
     def analyze_jump_sequence(self, pose_results: List[Optional[Dict]]) -> Dict:
         """
         分析完整的跳跃序列
@@ -27,10 +45,69 @@ class JumpAnalyzer:
         Returns:
             Dict: 跳跃分析结果
         """
-        # 提取关键指标
-        body_centers = self._extract_body_centers(pose_results)
-        knee_angles = self._extract_knee_angles(pose_results)
-        hip_angles = self._extract_hip_angles(pose_results)
+        # 只遍历一次姿态结果，身体中心和关节角度都从同一个坐标数组切片计算
+        coords = self._extract_all(pose_results)
+        return self._analyze_coords(coords)
+        
+    def analyze_landmark_array(self, landmarks: np.ndarray, valid: np.ndarray) -> Dict:
+        """
+        分析 detect_pose_sequence_array 输出的关键点数组
+        
+        Args:
+            landmarks: 关键点数组 (N, 33, 4)
+            valid: 检测到姿态的帧掩码 (N,)
+            
+        Returns:
+            Dict: 跳跃分析结果，格式与 analyze_jump_sequence 相同
+        """
+        coords = landmarks[:, :, :2].astype(np.float64)
+        coords[~valid] = np.nan
+        return self._analyze_coords(coords)
+        
+    def update(self, pose_result: Optional[Dict]):
+        """
+        累积一帧姿态检测结果，可与逐帧姿态检测放在同一遍循环中调用
+        
+        每帧只保留关键点坐标 (33, 2)，不保存完整的姿态结果（含绘制用的 pose_landmarks）。
+        平滑、找峰和阶段划分需要完整序列，留到 finalize 时一次完成。
+        
+        Args:
+            pose_result: 单帧姿态检测结果，未检测到姿态时为None
+        """
+        coords, _ = self.pose_detector.landmarks_to_array((pose_result,))
+        self._frame_coords.append(coords[0])
+        if pose_result is not None:
+            self.valid_frames += 1
+            
+    @property
+    def frame_count(self) -> int:
+        """update 已累积的帧数"""
+        return len(self._frame_coords)
+        
+    def finalize(self) -> Dict:
+        """
+        分析 update 累积的全部帧
+        
+        Returns:
+            Dict: 跳跃分析结果，与对同一序列调用 analyze_jump_sequence 相同
+        """
+        if self._frame_coords:
+            coords = np.stack(self._frame_coords)
+        else:
+            coords = self._extract_all([])
+        return self._analyze_coords(coords)
+        
+    def reset(self):
+        """清空 update 累积的帧，开始分析新的序列"""
+        self._frame_coords = []
+        self.valid_frames = 0
+        
+    def _analyze_coords(self, coords: np.ndarray) -> Dict:
+        """根据坐标数组 (N, 33, 2) 完成跳跃分析，未检测到姿态的帧为NaN"""
+        # 提取关键指标，均为 (N, 2) 数组，缺失值为NaN
+        body_centers = self.pose_detector.get_body_centers(coords)
+        knee_angles = self._extract_knee_angles(coords)
+        hip_angles = self._extract_hip_angles(coords)
         
         # 识别跳跃阶段
         jump_phases = self._identify_jump_phases(body_centers)
@@ -39,117 +116,80 @@ class JumpAnalyzer:
         jump_metrics = self._calculate_jump_metrics(body_centers, jump_phases)
         
         # 分析身体姿态
-        posture_analysis = self._analyze_posture(pose_results, jump_phases)
+        posture_analysis = self._analyze_posture(coords, body_centers, knee_angles,
+                                                 hip_angles, jump_phases)
         
         # 评估弹跳力和核心力量
         strength_assessment = self._assess_strength(knee_angles, hip_angles, jump_metrics)
         
+        # 序列数据以 (N, 2) float32 数组输出，缺失值为NaN
         return {
             'jump_phases': jump_phases,
             'jump_metrics': jump_metrics,
             'posture_analysis': posture_analysis,
             'strength_assessment': strength_assessment,
-            'body_centers': body_centers,
-            'knee_angles': knee_angles,
-            'hip_angles': hip_angles
+            'body_centers': body_centers.astype(np.float32),
+            'knee_angles': knee_angles.astype(np.float32),
+            'hip_angles': hip_angles.astype(np.float32)
         }
         
-    def _extract_body_centers(self, pose_results: List[Optional[Dict]]) -> List[Optional[Tuple[float, float]]]:
-        """提取身体中心点序列"""
-        body_centers = []
-        
-        for pose_result in pose_results:
-            if pose_result:
-                center = self.pose_detector.get_body_center(pose_result)
-                body_centers.append(center)
-            else:
-                body_centers.append(None)
-                
-        return body_centers
-        
-    def _extract_knee_angles(self, pose_results: List[Optional[Dict]]) -> List[Optional[Tuple[float, float]]]:
-        """提取膝关节角度序列"""
-        knee_angles = []
-        
-        for pose_result in pose_results:
-            if pose_result:
-                # 左膝角度
-                left_hip = self.pose_detector.get_keypoint_coordinates(pose_result, 'left_hip')
-                left_knee = self.pose_detector.get_keypoint_coordinates(pose_result, 'left_knee')
-                left_ankle = self.pose_detector.get_keypoint_coordinates(pose_result, 'left_ankle')
-                
-                # 右膝角度
-                right_hip = self.pose_detector.get_keypoint_coordinates(pose_result, 'right_hip')
-                right_knee = self.pose_detector.get_keypoint_coordinates(pose_result, 'right_knee')
-                right_ankle = self.pose_detector.get_keypoint_coordinates(pose_result, 'right_ankle')
-                
-                left_angle = None
-                right_angle = None
-                
-                if left_hip and left_knee and left_ankle:
-                    left_angle = self.pose_detector.calculate_angle(left_hip, left_knee, left_ankle)
-                    
-                if right_hip and right_knee and right_ankle:
-                    right_angle = self.pose_detector.calculate_angle(right_hip, right_knee, right_ankle)
-                    
-                knee_angles.append((left_angle, right_angle))
-            else:
-                knee_angles.append(None)
-                
-        return knee_angles
-        
-    def _extract_hip_angles(self, pose_results: List[Optional[Dict]]) -> List[Optional[Tuple[float, float]]]:
-        """提取髋关节角度序列"""
-        hip_angles = []
-        
-        for pose_result in pose_results:
-            if pose_result:
-                # 左髋角度
-                left_shoulder = self.pose_detector.get_keypoint_coordinates(pose_result, 'left_shoulder')
-                left_hip = self.pose_detector.get_keypoint_coordinates(pose_result, 'left_hip')
-                left_knee = self.pose_detector.get_keypoint_coordinates(pose_result, 'left_knee')
-                
-                # 右髋角度
-                right_shoulder = self.pose_detector.get_keypoint_coordinates(pose_result, 'right_shoulder')
-                right_hip = self.pose_detector.get_keypoint_coordinates(pose_result, 'right_hip')
-                right_knee = self.pose_detector.get_keypoint_coordinates(pose_result, 'right_knee')
-                
-                left_angle = None
-                right_angle = None
-                
-                if left_shoulder and left_hip and left_knee:
-                    left_angle = self.pose_detector.calculate_angle(left_shoulder, left_hip, left_knee)
-                    
-                if right_shoulder and right_hip and right_knee:
-                    right_angle = self.pose_detector.calculate_angle(right_shoulder, right_hip, right_knee)
-                    
-                hip_angles.append((left_angle, right_angle))
-            else:
-                hip_angles.append(None)
-                
-        return hip_angles
-        
-    def _identify_jump_phases(self, body_centers: List[Optional[Tuple[float, float]]]) -> Dict:
-        """识别跳跃的各个阶段"""
+    def _extract_all(self, pose_results: List[Optional[Dict]]) -> np.ndarray:
+        """一次遍历姿态结果，返回坐标数组 (N, 33, 2)，未检测到姿态的帧为NaN"""
+        coords, _ = self.pose_detector.landmarks_to_array(pose_results)
+        return coords
+        
+    def _extract_knee_angles(self, coords: np.ndarray) -> np.ndarray:
+        """提取膝关节角度序列 (N, 2)，列依次为左、右膝"""
+        return np.column_stack([
+            self._batch_joint_angles(coords, ('left_hip', 'left_knee', 'left_ankle')),
+            self._batch_joint_angles(coords, ('right_hip', 'right_knee', 'right_ankle'))
+        ])
+        
+    def _extract_hip_angles(self, coords: np.ndarray) -> np.ndarray:
+        """提取髋关节角度序列 (N, 2)，列依次为左、右髋"""
+        return np.column_stack([
+            self._batch_joint_angles(coords, ('left_shoulder', 'left_hip', 'left_knee')),
+            self._batch_joint_angles(coords, ('right_shoulder', 'right_hip', 'right_knee'))
+        ])
+        
+    def _batch_joint_angles(self, coords: np.ndarray, joint_names: Tuple[str, str, str]) -> np.ndarray:
+        """批量计算所有帧中三个关键点组成的关节角度，关键点缺失的帧为NaN"""
+        # 按整数下标取列得到的是视图，不会复制坐标数据
+        p1, p2, p3 = (coords[:, self.pose_detector.pose_landmarks_dict[name]] for name in joint_names)
+        return self.pose_detector.calculate_angles_batch(p1, p2, p3)
+        
+    def _identify_jump_phases(self, body_centers: np.ndarray) -> Dict:
+        """识别跳跃的各个阶段（body_centers 为 (N, 2) 数组，缺失帧为NaN）"""
         # 过滤无效数据
-        valid_centers = [(i, center) for i, center in enumerate(body_centers) if center is not None]
+        valid_mask = ~np.isnan(body_centers).any(axis=1)
         
-        if len(valid_centers) < 3:  # 降低最小要求从10到3
+        if np.count_nonzero(valid_mask) < 3:  # 降低最小要求从10到3
             return {'error': '有效数据点不足，至少需要3个有效帧'}
             
         # 提取Y坐标（垂直位置）
-        y_coords = [center[1] for _, center in valid_centers]
-        frame_indices = [i for i, _ in valid_centers]
+        y_coords = body_centers[valid_mask, 1]
+        frame_indices = np.flatnonzero(valid_mask).tolist()
         
-        # 平滑处理
+        # 平滑处理：窗口约0.25秒（奇数，至少5帧），不超过数据长度；采样率只有几Hz时腾空只占1~3帧，
+        # 窗口过宽会把腾空阶段平滑掉
         if len(y_coords) > 5:
-            y_coords_smooth = savgol_filter(y_coords, 5, 2)
+            window_length = max(5, int(round(self.fps * 0.25)) | 1)
+            window_length = min(window_length, len(y_coords) if len(y_coords) % 2 else len(y_coords) - 1)
+            y_coords_smooth = savgol_filter(y_coords, window_length, 2)
         else:
+            window_length = 1
             y_coords_smooth = y_coords
             
         # 寻找最低点（准备阶段结束）和最高点（腾空最高点）
-        min_idx = np.argmin(y_coords_smooth)
-        max_idx = np.argmax(y_coords_smooth)
+        # 取最显著的局部极值而不是全局极值，避免孤立的噪声尖峰干扰阶段划分
+        min_distance = max(1, int(self.fps * 0.2))
+        min_idx = self._most_prominent_peak(-y_coords_smooth, min_distance)
+        max_idx = self._most_prominent_peak(y_coords_smooth, min_distance)
+        
+        # 平滑信号只用来定位极值所在的区域，再在半个窗口内取原始数据的极值，
+        # 避免平滑削平尖锐的转折点后极值偏移1~2帧
+        min_idx = self._local_peak(-y_coords, min_idx, window_length // 2)
+        max_idx = self._local_peak(y_coords, max_idx, window_length // 2)
         
         # 确定各阶段
         phases = {
@@ -174,30 +214,41 @@ class JumpAnalyzer:
         
         return phases
         
-    def _calculate_jump_metrics(self, body_centers: List[Optional[Tuple[float, float]]], 
-                               jump_phases: Dict) -> Dict:
-        """计算跳跃指标"""
+    def _most_prominent_peak(self, signal: np.ndarray, distance: int) -> int:
+        """
+        返回信号中显著性最高的峰值下标，没有足够显著的峰值时返回全局最大值下标
+        
+        find_peaks 不会把首尾样本当作峰值，因此两端各补一个信号最小值，使序列开头或结尾的极值
+        （如最后一帧的落地下蹲）也能参与比较；显著性低于信号幅度10%的小起伏不算峰值。
+        """
+        padded = np.pad(signal, 1, mode='constant', constant_values=signal.min())
+        peaks, properties = find_peaks(padded, distance=distance, prominence=0.1 * np.ptp(signal))
+        
+        if len(peaks) == 0:
+            return int(np.argmax(signal))
+            
+        return int(peaks[np.argmax(properties['prominences'])]) - 1
+        
+    def _local_peak(self, signal: np.ndarray, index: int, radius: int) -> int:
+        """返回 index 前后 radius 个样本范围内信号最大值的下标"""
+        start = max(0, index - radius)
+        return start + int(np.argmax(signal[start:index + radius + 1]))
+        
+    def _calculate_jump_metrics(self, body_centers: np.ndarray, jump_phases: Dict) -> Dict:
+        """计算跳跃指标（body_centers 为 (N, 2) 数组，缺失帧为NaN）"""
         if 'error' in jump_phases:
             return {'error': jump_phases['error']}
             
         # 获取有效的身体中心点
-        valid_centers = [(i, center) for i, center in enumerate(body_centers) if center is not None]
-        
-        if len(valid_centers) < 2:  # 降低要求到最低2个点
+        if np.count_nonzero(~np.isnan(body_centers).any(axis=1)) < 2:  # 降低要求到最低2个点
             return {'error': '有效数据点不足，至少需要2个有效帧'}
             
-        # 计算跳跃高度（像素差）
-        lowest_y = None
-        highest_y = None
-        
-        for i, center in valid_centers:
-            if i == jump_phases['lowest_frame']:
-                lowest_y = center[1]
-            elif i == jump_phases['peak_frame']:
-                highest_y = center[1]
-                
-        if lowest_y is not None and highest_y is not None:
-            jump_height_pixels = abs(lowest_y - highest_y)
+        # 计算跳跃高度（像素差），最低点和最高点为同一帧时视为没有跳跃
+        lowest_frame = jump_phases['lowest_frame']
+        peak_frame = jump_phases['peak_frame']
+        
+        if lowest_frame != peak_frame:
+            jump_height_pixels = abs(float(body_centers[lowest_frame, 1]) - float(body_centers[peak_frame, 1]))
         else:
             jump_height_pixels = 0
             
@@ -221,93 +272,53 @@ class JumpAnalyzer:
             'total_duration': preparation_duration + takeoff_duration + landing_duration
         }
         
-    def _analyze_posture(self, pose_results: List[Optional[Dict]], jump_phases: Dict) -> Dict:
-        """分析身体姿态"""
+    def _analyze_posture(self, coords: np.ndarray, body_centers: np.ndarray, knee_angles: np.ndarray,
+                         hip_angles: np.ndarray, jump_phases: Dict) -> Dict:
+        """分析身体姿态（使用预先计算的坐标、身体中心和关节角度数组）"""
         if 'error' in jump_phases:
             return {'error': jump_phases['error']}
             
         analysis = {
-            'preparation_posture': self._analyze_phase_posture(pose_results, jump_phases['preparation']),
-            'takeoff_posture': self._analyze_phase_posture(pose_results, jump_phases['takeoff']),
-            'landing_posture': self._analyze_phase_posture(pose_results, jump_phases['landing'])
+            phase_name + '_posture': self._analyze_phase_posture(coords, body_centers, knee_angles,
+                                                                 hip_angles, jump_phases[phase_name])
+            for phase_name in ('preparation', 'takeoff', 'landing')
         }
         
         return analysis
         
-    def _analyze_phase_posture(self, pose_results: List[Optional[Dict]], phase: Dict) -> Dict:
+    def _analyze_phase_posture(self, coords: np.ndarray, body_centers: np.ndarray, knee_angles: np.ndarray,
+                               hip_angles: np.ndarray, phase: Dict) -> Dict:
         """分析特定阶段的姿态"""
-        start_frame = phase['start_frame']
-        end_frame = phase['end_frame']
-        
-        # 收集该阶段的姿态数据
-        phase_poses = pose_results[start_frame:end_frame + 1]
-        
-        # 计算平均关节角度
-        knee_angles = []
-        hip_angles = []
-        shoulder_alignment = []
-        
-        for pose in phase_poses:
-            if pose:
-                # 膝关节角度
-                left_hip = self.pose_detector.get_keypoint_coordinates(pose, 'left_hip')
-                left_knee = self.pose_detector.get_keypoint_coordinates(pose, 'left_knee')
-                left_ankle = self.pose_detector.get_keypoint_coordinates(pose, 'left_ankle')
-                
-                if left_hip and left_knee and left_ankle:
-                    knee_angle = self.pose_detector.calculate_angle(left_hip, left_knee, left_ankle)
-                    knee_angles.append(knee_angle)
-                
-                # 髋关节角度
-                left_shoulder = self.pose_detector.get_keypoint_coordinates(pose, 'left_shoulder')
-                if left_shoulder and left_hip and left_knee:
-                    hip_angle = self.pose_detector.calculate_angle(left_shoulder, left_hip, left_knee)
-                    hip_angles.append(hip_angle)
-                
-                # 肩膀对齐
-                left_shoulder = self.pose_detector.get_keypoint_coordinates(pose, 'left_shoulder')
-                right_shoulder = self.pose_detector.get_keypoint_coordinates(pose, 'right_shoulder')
-                if left_shoulder and right_shoulder:
-                    shoulder_diff = abs(left_shoulder[1] - right_shoulder[1])
-                    shoulder_alignment.append(shoulder_diff)
+        phase_slice = slice(phase['start_frame'], phase['end_frame'] + 1)
+        
+        # 左侧膝、髋关节角度直接取自已计算的角度数组
+        phase_knee = knee_angles[phase_slice, 0]
+        phase_hip = hip_angles[phase_slice, 0]
+        
+        # 肩膀对齐
+        shoulders = self.pose_detector.gather(coords[phase_slice], ['left_shoulder', 'right_shoulder'])
+        shoulder_alignment = np.abs(shoulders[:, 0, 1] - shoulders[:, 1, 1])
         
         return {
-            'avg_knee_angle': np.mean(knee_angles) if knee_angles else None,
-            'avg_hip_angle': np.mean(hip_angles) if hip_angles else None,
-            'shoulder_alignment': np.mean(shoulder_alignment) if shoulder_alignment else None,
-            'stability_score': self._calculate_stability_score(phase_poses)
+            'avg_knee_angle': self._nanmean_or_none(phase_knee),
+            'avg_hip_angle': self._nanmean_or_none(phase_hip),
+            'shoulder_alignment': self._nanmean_or_none(shoulder_alignment),
+            'stability_score': self._calculate_stability_score(body_centers[phase_slice])
         }
         
-    def _calculate_stability_score(self, poses: List[Optional[Dict]]) -> float:
-        """计算稳定性得分"""
-        if not poses:
-            return 0.0
-            
-        # 计算身体中心点的变化
-        centers = []
-        for pose in poses:
-            if pose:
-                center = self.pose_detector.get_body_center(pose)
-                if center:
-                    centers.append(center)
-        
-        if len(centers) < 2:
-            return 0.0
-            
-        # 计算中心点变化的标准差
-        x_coords = [center[0] for center in centers]
-        y_coords = [center[1] for center in centers]
-        
-        x_std = np.std(x_coords)
-        y_std = np.std(y_coords)
+    def _nanmean_or_none(self, values: np.ndarray) -> Optional[float]:
+        """忽略NaN求均值，没有有效值时返回None"""
+        valid = values[~np.isnan(values)]
+        return np.mean(valid) if len(valid) else None
         
-        # 稳定性得分（变化越小越稳定）
-        stability = 1.0 / (1.0 + math.sqrt(x_std**2 + y_std**2))
+    def _calculate_stability_score(self, centers: np.ndarray) -> float:
+        """计算稳定性得分（centers 为该阶段的身体中心点数组 (M, 2)，无效帧为NaN）"""
+        centers = centers[~np.isnan(centers).any(axis=1)]
         
-        return stability
+        # 稳定性得分（中心点变化的标准差越小越稳定）
+        return stability_score(centers)
         
-    def _assess_strength(self, knee_angles: List[Optional[Tuple[float, float]]], 
-                        hip_angles: List[Optional[Tuple[float, float]]], 
+    def _assess_strength(self, knee_angles: np.ndarray, hip_angles: np.ndarray,
                         jump_metrics: Dict) -> Dict:
         """评估弹跳力和核心力量"""
         if 'error' in jump_metrics:
@@ -343,14 +354,13 @@ class JumpAnalyzer:
         
         return 0.0
         
-    def _assess_core_strength(self, knee_angles: List[Optional[Tuple[float, float]]], 
-                            hip_angles: List[Optional[Tuple[float, float]]]) -> float:
+    def _assess_core_strength(self, knee_angles: np.ndarray, hip_angles: np.ndarray) -> float:
         """评估核心力量"""
         # 基于关节角度的稳定性
-        valid_knee_angles = [angles for angles in knee_angles if angles and angles[0] and angles[1]]
-        valid_hip_angles = [angles for angles in hip_angles if angles and angles[0] and angles[1]]
+        valid_knee_angles = self._valid_angle_pairs(knee_angles)
+        valid_hip_angles = self._valid_angle_pairs(hip_angles)
         
-        if not valid_knee_angles or not valid_hip_angles:
+        if not len(valid_knee_angles) or not len(valid_hip_angles):
             return 0.0
             
         # 计算左右对称性
@@ -362,12 +372,11 @@ class JumpAnalyzer:
         
         return core_score
         
-    def _assess_coordination(self, knee_angles: List[Optional[Tuple[float, float]]], 
-                           hip_angles: List[Optional[Tuple[float, float]]]) -> float:
+    def _assess_coordination(self, knee_angles: np.ndarray, hip_angles: np.ndarray) -> float:
         """评估协调性"""
         # 基于关节角度的变化平滑性
-        valid_knee_angles = [angles for angles in knee_angles if angles and angles[0] and angles[1]]
-        valid_hip_angles = [angles for angles in hip_angles if angles and angles[0] and angles[1]]
+        valid_knee_angles = self._valid_angle_pairs(knee_angles)
+        valid_hip_angles = self._valid_angle_pairs(hip_angles)
         
         if len(valid_knee_angles) < 3 or len(valid_hip_angles) < 3:
             return 0.0
@@ -381,47 +390,31 @@ class JumpAnalyzer:
         
         return coordination_score
         
-    def _calculate_symmetry(self, angle_pairs: List[Tuple[float, float]]) -> float:
-        """计算左右对称性"""
-        asymmetries = []
-        
-        for left, right in angle_pairs:
-            if left and right:
-                asymmetry = abs(left - right) / max(left, right)
-                asymmetries.append(asymmetry)
+    def _valid_angle_pairs(self, angle_pairs: np.ndarray) -> np.ndarray:
+        """从 (N, 2) 左右角度数组中只保留左右角度都有效（非零、非NaN）的帧"""
+        valid = ~np.isnan(angle_pairs).any(axis=1) & (angle_pairs != 0).all(axis=1)
+        return angle_pairs[valid]
         
-        if not asymmetries:
+    def _calculate_symmetry(self, angle_pairs: np.ndarray) -> float:
+        """计算左右对称性（angle_pairs 为 (M, 2) 的左右角度数组）"""
+        if not len(angle_pairs):
             return 0.0
             
         # 对称性得分（不对称性越小越好）
-        avg_asymmetry = np.mean(asymmetries)
-        symmetry_score = 1.0 / (1.0 + avg_asymmetry)
+        return symmetry_score(angle_pairs)
         
-        return symmetry_score
-        
-    def _calculate_smoothness(self, angle_pairs: List[Tuple[float, float]]) -> float:
-        """计算角度变化的平滑性"""
-        left_angles = [pair[0] for pair in angle_pairs if pair[0]]
-        right_angles = [pair[1] for pair in angle_pairs if pair[1]]
-        
-        if len(left_angles) < 3 or len(right_angles) < 3:
+    def _calculate_smoothness(self, angle_pairs: np.ndarray) -> float:
+        """计算角度变化的平滑性（angle_pairs 为 (M, 2) 的左右角度数组）"""
+        if len(angle_pairs) < 3:
             return 0.0
             
         # 计算角度变化的二阶导数（加速度）
-        left_smoothness = self._calculate_angle_smoothness(left_angles)
-        right_smoothness = self._calculate_angle_smoothness(right_angles)
+        left_smoothness = self._calculate_angle_smoothness(angle_pairs[:, 0])
+        right_smoothness = self._calculate_angle_smoothness(angle_pairs[:, 1])
         
         return (left_smoothness + right_smoothness) / 2
         
-    def _calculate_angle_smoothness(self, angles: List[float]) -> float:
+    def _calculate_angle_smoothness(self, angles: np.ndarray) -> float:
         """计算单个角度序列的平滑性"""
-        if len(angles) < 3:
-            return 0.0
-            
-        # 计算二阶差分
-        second_diff = np.diff(angles, 2)
-        
-        # 平滑性得分（二阶差分越小越平滑）
-        smoothness = 1.0 / (1.0 + np.mean(np.abs(second_diff)))
-        
-        return smoothness
\ No newline at end of file
+        # 二阶差分越小越平滑
+        return angle_smoothness(angles)
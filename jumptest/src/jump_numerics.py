@@ -0,0 +1,117 @@
+"""
+跳跃分析中的小型数值计算函数
+
+安装了Numba时使用JIT编译为本地代码，否则作为普通Python函数运行。
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba 为可选依赖，缺失时退回普通Python函数
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Numba不可用时的占位装饰器，原样返回函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# 输入中可能含NaN（缺失关键点），因此不启用 nnan/ninf 假设，只允许重排和近似计算
+FASTMATH_FLAGS = {'reassoc', 'contract', 'arcp'}
+
+
+@njit(cache=True, fastmath=FASTMATH_FLAGS)
+def angle_between(x1: float, y1: float, x2: float, y2: float, x3: float, y3: float) -> float:
+    """计算三点组成的角度（度），(x2, y2) 为顶点，向量长度为0时返回NaN"""
+    v1x = x1 - x2
+    v1y = y1 - y2
+    v2x = x3 - x2
+    v2y = y3 - y2
+
+    norm = math.sqrt((v1x * v1x + v1y * v1y) * (v2x * v2x + v2y * v2y))
+    if norm == 0.0:
+        return np.nan
+
+    cos_angle = min(1.0, max(-1.0, (v1x * v2x + v1y * v2y) / norm))
+    return math.degrees(math.acos(cos_angle))
+
+
+@njit(cache=True, fastmath=FASTMATH_FLAGS)
+def stability_score(centers: np.ndarray) -> float:
+    """根据身体中心点 (M, 2) 的标准差计算稳定性得分，少于2个点时为0"""
+    count = centers.shape[0]
+    if count < 2:
+        return 0.0
+
+    mean_x = 0.0
+    mean_y = 0.0
+    for i in range(count):
+        mean_x += centers[i, 0]
+        mean_y += centers[i, 1]
+    mean_x /= count
+    mean_y /= count
+
+    var_x = 0.0
+    var_y = 0.0
+    for i in range(count):
+        dx = centers[i, 0] - mean_x
+        dy = centers[i, 1] - mean_y
+        var_x += dx * dx
+        var_y += dy * dy
+
+    return 1.0 / (1.0 + math.sqrt(var_x / count + var_y / count))
+
+
+@njit(cache=True, fastmath=FASTMATH_FLAGS)
+def symmetry_score(angle_pairs: np.ndarray) -> float:
+    """根据左右角度 (M, 2) 的平均不对称性计算对称性得分，忽略NaN"""
+    total = 0.0
+    count = 0
+    for i in range(angle_pairs.shape[0]):
+        left = angle_pairs[i, 0]
+        right = angle_pairs[i, 1]
+        asymmetry = abs(left - right) / max(left, right)
+        if not math.isnan(asymmetry):
+            total += asymmetry
+            count += 1
+
+    if count == 0:
+        return np.nan
+
+    return 1.0 / (1.0 + total / count)
+
+
+@njit(cache=True, fastmath=FASTMATH_FLAGS)
+def angle_smoothness(angles: np.ndarray) -> float:
+    """根据角度序列二阶差分的平均绝对值计算平滑性得分，忽略NaN，少于3个点时为0"""
+    if angles.shape[0] < 3:
+        return 0.0
+
+    total = 0.0
+    count = 0
+    for i in range(angles.shape[0] - 2):
+        second_diff = angles[i + 2] - 2.0 * angles[i + 1] + angles[i]
+        if not math.isnan(second_diff):
+            total += abs(second_diff)
+            count += 1
+
+    if count == 0:
+        return np.nan
+
+    return 1.0 / (1.0 + total / count)
+
+
+def _warm_up():
+    """用小数组调用一次各函数，提前触发JIT编译（或加载磁盘缓存）"""
+    pairs = np.array([[90.0, 100.0], [95.0, 105.0], [100.0, 110.0]])
+    angle_between(0.0, 1.0, 0.0, 0.0, 1.0, 0.0)
+    stability_score(pairs)
+    symmetry_score(pairs)
+    angle_smoothness(pairs[:, 0].copy())
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
@@ -1,8 +1,29 @@
 import cv2
 import numpy as np
 import mediapipe as mp
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import itertools
 import json
+from jump_numerics import angle_between
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时退回标准库 json
+    orjson = None
+
+# 与 mp_drawing.draw_landmarks 默认姿态样式一致的绘制参数，批量绘制时直接使用
+_POSE_CONNECTIONS = tuple(sorted(mp.solutions.pose.POSE_CONNECTIONS))
+_CONNECTION_COLOR = mp.solutions.drawing_utils.WHITE_COLOR
+_CONNECTION_THICKNESS = mp.solutions.drawing_utils.DrawingSpec().thickness
+# 按关键点序号排列的 (颜色, 线宽, 半径, 白色外圈半径)
+_LANDMARK_STYLES = tuple(
+    (spec.color, spec.thickness, spec.circle_radius,
+     max(spec.circle_radius + 1, int(spec.circle_radius * 1.2)))
+    for _, spec in sorted(mp.solutions.drawing_styles.get_default_pose_landmarks_style().items())
+)
+_VISIBILITY_THRESHOLD = 0.5
 
 class PoseDetector:
     """姿态检测类，使用MediaPipe进行人体姿态估计"""
@@ -10,7 +31,10 @@ class PoseDetector:
     def __init__(self, 
                  model_complexity: int = 1,
                  min_detection_confidence: float = 0.5,
-                 min_tracking_confidence: float = 0.5):
+                 min_tracking_confidence: float = 0.5,
+                 num_workers: int = 1,
+                 min_mean_visibility: float = 0.3,
+                 static_image_mode: bool = False):
         """
         初始化姿态检测器
         
@@ -18,16 +42,27 @@ class PoseDetector:
             model_complexity: 模型复杂度 (0, 1, 2)
             min_detection_confidence: 最小检测置信度
             min_tracking_confidence: 最小跟踪置信度
+            num_workers: detect_pose_sequence 使用的并行检测线程数（1表示顺序处理）
+            min_mean_visibility: 关键点平均可见度低于该值的检测结果视为无效
+            static_image_mode: 每帧独立检测、不跨帧跟踪；帧之间互不依赖，多线程并行检测时结果与分配顺序无关
         """
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
-        self.pose = self.mp_pose.Pose(
-            model_complexity=model_complexity,
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
-        )
+        self._pose_options = {
+            'static_image_mode': static_image_mode,
+            'model_complexity': model_complexity,
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence
+        }
+        self.pose = self.mp_pose.Pose(**self._pose_options)
+        self.min_mean_visibility = min_mean_visibility
+        
+        # 并行检测时每个线程独占一个Pose实例（MediaPipe图不可多线程共享）
+        self.num_workers = max(1, num_workers)
+        self._worker_poses = []
+        self._idle_poses = queue.SimpleQueue()
         
         # 关键点索引映射
         self.pose_landmarks_dict = {
@@ -48,6 +83,9 @@ class PoseDetector:
             'left_foot_index': 31, 'right_foot_index': 32
         }
         
+        # 关键点名称到数组下标的映射，用于批量索引坐标数组
+        self._joint_idx = {name: np.int32(index) for name, index in self.pose_landmarks_dict.items()}
+        
     def detect_pose(self, frame: np.ndarray) -> Optional[Dict]:
         """
         检测单帧中的人体姿态
@@ -58,18 +96,26 @@ class PoseDetector:
         Returns:
             Optional[Dict]: 姿态检测结果或None
         """
+        return self._detect_with(self.pose, frame)
+        
+    def _detect_with(self, pose, frame: np.ndarray) -> Optional[Dict]:
+        """使用指定的Pose实例检测单帧"""
         # 转换为MediaPipe所需的格式
-        results = self.pose.process(frame)
+        results = pose.process(frame)
         
         if results.pose_landmarks:
-            landmarks = []
-            for landmark in results.pose_landmarks.landmark:
-                landmarks.append({
-                    'x': landmark.x,
-                    'y': landmark.y,
-                    'z': landmark.z,
-                    'visibility': landmark.visibility
-                })
+            landmark_list = results.pose_landmarks.landmark
+            
+            # 先只读取可见度，整体可见度过低的帧直接丢弃，不再构建完整关键点数组
+            visibility = np.fromiter((landmark.visibility for landmark in landmark_list),
+                                     dtype=np.float32, count=len(landmark_list))
+            if visibility.mean() < self.min_mean_visibility:
+                return None
+            
+            # 关键点以 (33, 4) 连续数组存储，列依次为 x, y, z, visibility
+            landmarks = np.empty((len(landmark_list), 4), dtype=np.float32)
+            landmarks[:, :3] = [[landmark.x, landmark.y, landmark.z] for landmark in landmark_list]
+            landmarks[:, 3] = visibility
             
             return {
                 'landmarks': landmarks,
@@ -89,17 +135,117 @@ class PoseDetector:
         Returns:
             List[Optional[Dict]]: 姿态检测结果列表
         """
-        pose_results = []
+        pose_results = [None] * len(frames)
         
-        for i, frame in enumerate(frames):
-            result = self.detect_pose(frame)
-            pose_results.append(result)
+        for i, result in enumerate(self._iter_detections(frames)):
+            pose_results[i] = result
             
             if (i + 1) % 10 == 0:
                 print(f"已处理 {i + 1}/{len(frames)} 帧")
                 
         return pose_results
         
+    def detect_pose_stream(self, frames: Iterable[np.ndarray], batch_size: int = 32) -> List[Optional[Dict]]:
+        """
+        按批检测可迭代对象产出的帧（如 VideoProcessor.iter_sampled_frames）
+        
+        每次只取 batch_size 帧交给 _iter_detections：num_workers > 1 时整批由线程池中各自独占的
+        Pose实例并行检测，否则在当前线程顺序检测。同一时刻只缓存一批帧，适合与后台解码线程组成流水线。
+        
+        Args:
+            frames: 帧的可迭代对象
+            batch_size: 每批帧数
+            
+        Returns:
+            List[Optional[Dict]]: 姿态检测结果列表
+        """
+        return list(self.iter_pose_stream(frames, batch_size))
+        
+    def iter_pose_stream(self, frames: Iterable[np.ndarray], batch_size: int = 32) -> Iterator[Optional[Dict]]:
+        """
+        与 detect_pose_stream 相同的按批检测，但按帧顺序逐个产出结果，不保存结果列表
+        
+        调用方可以边检测边处理（如 JumpAnalyzer.update），每帧结果用完即可释放。
+        
+        Args:
+            frames: 帧的可迭代对象
+            batch_size: 每批帧数
+            
+        Yields:
+            Optional[Dict]: 姿态检测结果，未检测到姿态时为None
+        """
+        count = 0
+        frames = iter(frames)
+        
+        # 顺序检测时不必先攒满一批：逐帧取帧，解码线程从第一帧起就与检测重叠，也不额外缓存帧
+        if self.num_workers == 1:
+            batch_size = 1
+            
+        while True:
+            batch = list(itertools.islice(frames, batch_size))
+            if not batch:
+                break
+                
+            for result in self._iter_detections(batch):
+                count += 1
+                if count % 10 == 0:
+                    print(f"已处理 {count} 帧")
+                    
+                yield result
+                
+    def detect_pose_sequence_array(self, frames: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        检测视频序列中的姿态，直接写入预分配的数组
+        
+        只需要数值数据（不需要绘制用的 pose_landmarks）时使用，避免逐帧构建结果列表。
+        
+        Args:
+            frames: 帧序列
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: 关键点数组 (N, 33, 4)（x, y, z, visibility），
+                未检测到姿态的帧为NaN；检测到姿态的帧掩码 (N,)；帧尺寸 (N, 3)
+        """
+        num_frames = len(frames)
+        landmarks = np.full((num_frames, len(self.pose_landmarks_dict), 4), np.nan, dtype=np.float32)
+        valid = np.zeros(num_frames, dtype=bool)
+        shapes = np.zeros((num_frames, 3), dtype=np.int32)
+        
+        for i, result in enumerate(self._iter_detections(frames)):
+            frame_shape = frames[i].shape
+            shapes[i, :len(frame_shape)] = frame_shape
+            
+            if result is not None:
+                landmarks[i] = result['landmarks']
+                valid[i] = True
+                
+            if (i + 1) % 10 == 0:
+                print(f"已处理 {i + 1}/{num_frames} 帧")
+                
+        return landmarks, valid, shapes
+        
+    def _iter_detections(self, frames: List[np.ndarray]):
+        """按帧顺序逐个产出姿态检测结果，num_workers > 1 时使用线程池并行检测"""
+        if self.num_workers > 1 and len(frames) > 1:
+            with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+                yield from executor.map(self._detect_pose_in_worker, frames)
+        else:
+            for frame in frames:
+                yield self.detect_pose(frame)
+        
+    def _detect_pose_in_worker(self, frame: np.ndarray) -> Optional[Dict]:
+        """在工作线程中检测单帧，从实例池中借用一个Pose实例"""
+        try:
+            pose = self._idle_poses.get_nowait()
+        except queue.Empty:
+            pose = self.mp_pose.Pose(**self._pose_options)
+            self._worker_poses.append(pose)
+            
+        try:
+            return self._detect_with(pose, frame)
+        finally:
+            self._idle_poses.put(pose)
+        
     def get_keypoint_coordinates(self, pose_result: Dict, keypoint_name: str) -> Optional[Tuple[float, float]]:
         """
         获取指定关键点的坐标
@@ -117,10 +263,19 @@ class PoseDetector:
         keypoint_index = self.pose_landmarks_dict[keypoint_name]
         
         if pose_result and 'landmarks' in pose_result:
-            landmarks = pose_result['landmarks']
+            # 结果缓存在pose_result上，同一帧的关键点只需解析一次
+            keypoint_cache = pose_result.setdefault('_kp_cache', {})
+            if keypoint_index in keypoint_cache:
+                return keypoint_cache[keypoint_index]
+                
+            landmarks = self._landmark_array(pose_result)
+            coordinates = None
             if keypoint_index < len(landmarks):
                 landmark = landmarks[keypoint_index]
-                return (landmark['x'], landmark['y'])
+                coordinates = (float(landmark[0]), float(landmark[1]))
+                
+            keypoint_cache[keypoint_index] = coordinates
+            return coordinates
                 
         return None
         
@@ -152,16 +307,31 @@ class PoseDetector:
         Returns:
             float: 角度（度）
         """
-        # 向量计算
-        v1 = np.array([p1[0] - p2[0], p1[1] - p2[1]])
-        v2 = np.array([p3[0] - p2[0], p3[1] - p2[1]])
+        return angle_between(p1[0], p1[1], p2[0], p2[1], p3[0], p3[1])
         
-        # 计算角度
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)
-        angle = np.arccos(cos_angle)
+    @staticmethod
+    def calculate_angles_batch(p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> np.ndarray:
+        """
+        批量计算三点组成的角度
+        
+        Args:
+            p1: 第一个点 (N, 2)
+            p2: 中间点（角度顶点） (N, 2)
+            p3: 第三个点 (N, 2)
+            
+        Returns:
+            np.ndarray: 角度（度） (N,)，输入含NaN或向量长度为0时为NaN
+        """
+        v1 = p1 - p2
+        v2 = p3 - p2
+        
+        dot = (v1 * v2).sum(axis=-1)
+        norm = np.sqrt((v1 * v1).sum(axis=-1) * (v2 * v2).sum(axis=-1))
         
-        return np.degrees(angle)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos_angle = np.clip(dot / norm, -1.0, 1.0)
+            
+        return np.degrees(np.arccos(cos_angle))
         
     def get_body_center(self, pose_result: Dict) -> Optional[Tuple[float, float]]:
         """
@@ -173,6 +343,18 @@ class PoseDetector:
         Returns:
             Optional[Tuple[float, float]]: 身体中心坐标
         """
+        if not pose_result:
+            return None
+            
+        # 同一帧的身体中心只计算一次，结果缓存在pose_result上
+        if '_body_center' in pose_result:
+            return pose_result['_body_center']
+            
+        pose_result['_body_center'] = self._compute_body_center(pose_result)
+        return pose_result['_body_center']
+        
+    def _compute_body_center(self, pose_result: Dict) -> Optional[Tuple[float, float]]:
+        """计算身体中心点（不使用缓存）"""
         shoulders = self.get_multiple_keypoints(pose_result, ['left_shoulder', 'right_shoulder'])
         hips = self.get_multiple_keypoints(pose_result, ['left_hip', 'right_hip'])
         
@@ -200,19 +382,101 @@ class PoseDetector:
         
         return body_center
         
-    def draw_pose_landmarks(self, frame: np.ndarray, pose_result: Dict) -> np.ndarray:
+    def landmarks_to_array(self, pose_results: List[Optional[Dict]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将姿态检测结果序列打包为连续数组
+        
+        Args:
+            pose_results: 姿态检测结果列表
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 坐标数组 (N, 33, 2) 和可见度数组 (N, 33)，
+            未检测到姿态的帧填充为NaN
+        """
+        num_landmarks = len(self.pose_landmarks_dict)
+        coords = np.full((len(pose_results), num_landmarks, 2), np.nan)
+        visibility = np.full((len(pose_results), num_landmarks), np.nan)
+        
+        for i, pose_result in enumerate(pose_results):
+            if pose_result and 'landmarks' in pose_result:
+                landmarks = self._landmark_array(pose_result)[:num_landmarks]
+                count = len(landmarks)
+                coords[i, :count] = landmarks[:, :2]
+                visibility[i, :count] = landmarks[:, 3]
+                
+        return coords, visibility
+        
+    def gather(self, coords: np.ndarray, keypoint_names: List[str]) -> np.ndarray:
+        """
+        按关键点名称从坐标数组中批量取出对应关键点
+        
+        Args:
+            coords: 坐标数组 (N, 33, 2)
+            keypoint_names: 关键点名称列表
+            
+        Returns:
+            np.ndarray: 关键点坐标 (N, len(keypoint_names), 2)
+        """
+        return coords[:, [self._joint_idx[name] for name in keypoint_names]]
+        
+    def get_body_centers(self, coords: np.ndarray, visibility: Optional[np.ndarray] = None,
+                         min_visibility: float = 0.0) -> np.ndarray:
+        """
+        批量计算身体中心点（肩部和髋部四个关键点的均值）
+        
+        Args:
+            coords: 坐标数组 (N, 33, 2)
+            visibility: 可见度数组 (N, 33)，为None时不做可见度过滤
+            min_visibility: 最小可见度，任一关键点低于该值的帧记为NaN
+            
+        Returns:
+            np.ndarray: 身体中心坐标 (N, 2)，无效帧为NaN
+        """
+        torso_indices = [self.pose_landmarks_dict[name] for name in
+                         ('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip')]
+        centers = coords[:, torso_indices].mean(axis=1)
+        
+        if visibility is not None and min_visibility > 0:
+            low_visibility = (visibility[:, torso_indices] < min_visibility).any(axis=1)
+            centers[low_visibility] = np.nan
+            
+        return centers
+        
+    def _landmark_array(self, pose_result: Dict) -> np.ndarray:
+        """返回姿态结果的关键点数组，旧版字典列表格式会被就地转换"""
+        landmarks = pose_result['landmarks']
+        if not isinstance(landmarks, np.ndarray):
+            landmarks = pose_result['landmarks'] = self._as_landmark_array(landmarks)
+        return landmarks
+        
+    @staticmethod
+    def _as_landmark_array(landmarks) -> np.ndarray:
+        """将关键点数据统一为 (33, 4) 数组 [x, y, z, visibility]，兼容字典列表格式"""
+        if isinstance(landmarks, np.ndarray):
+            return landmarks
+            
+        if landmarks and isinstance(landmarks[0], dict):
+            return np.array([
+                [landmark['x'], landmark['y'], landmark.get('z', 0.0), landmark.get('visibility', 1.0)]
+                for landmark in landmarks
+            ])
+            
+        return np.asarray(landmarks, dtype=float).reshape(-1, 4)
+        
+    def draw_pose_landmarks(self, frame: np.ndarray, pose_result: Dict, inplace: bool = False) -> np.ndarray:
         """
         在帧上绘制姿态关键点
         
         Args:
             frame: 输入帧
             pose_result: 姿态检测结果
+            inplace: 是否直接在输入帧上绘制（调用方不再需要原始帧时可避免整帧复制）
             
         Returns:
             np.ndarray: 绘制后的帧
         """
         if pose_result and 'pose_landmarks' in pose_result:
-            annotated_frame = frame.copy()
+            annotated_frame = frame if inplace else frame.copy()
             
             # 绘制姿态关键点
             self.mp_drawing.draw_landmarks(
@@ -226,9 +490,66 @@ class PoseDetector:
         
         return frame
         
+    @staticmethod
+    def landmarks_to_pixels(pose_results: List[Optional[Dict]], width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将整段姿态检测结果一次性转换为整数像素坐标，供 draw_landmark_pixels 逐帧绘制
+        
+        Args:
+            pose_results: 姿态检测结果列表
+            width: 帧宽度
+            height: 帧高度
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 像素坐标 (N, 33, 2) int32 和可绘制掩码 (N, 33)，
+            可见度不足或坐标超出画面的关键点（与MediaPipe绘制规则一致）及未检测到姿态的帧为False
+        """
+        num_landmarks = len(_LANDMARK_STYLES)
+        landmarks = np.full((len(pose_results), num_landmarks, 4), np.nan)
+        
+        for i, pose_result in enumerate(pose_results):
+            if pose_result and 'landmarks' in pose_result:
+                frame_landmarks = PoseDetector._as_landmark_array(pose_result['landmarks'])[:num_landmarks]
+                landmarks[i, :len(frame_landmarks)] = frame_landmarks
+                
+        xy = landmarks[..., :2]
+        with np.errstate(invalid='ignore'):
+            drawable = (landmarks[..., 3] >= _VISIBILITY_THRESHOLD) & ((xy >= 0) & (xy <= 1)).all(axis=-1)
+            
+        pixels = np.floor(np.nan_to_num(xy) * (width, height))
+        pixels = np.minimum(pixels, (width - 1, height - 1)).astype(np.int32)
+        return pixels, drawable
+        
+    @staticmethod
+    def draw_landmark_pixels(frame: np.ndarray, pixels: np.ndarray, drawable: np.ndarray) -> np.ndarray:
+        """
+        按MediaPipe默认姿态样式直接在帧上绘制连线和关键点（原地修改），无需MediaPipe检测结果对象
+        
+        Args:
+            frame: 输入帧
+            pixels: 单帧像素坐标 (33, 2)，由 landmarks_to_pixels 得到
+            drawable: 单帧可绘制掩码 (33,)
+            
+        Returns:
+            np.ndarray: 绘制后的帧
+        """
+        points = [tuple(point) for point in pixels.tolist()]
+        visible = drawable.tolist()
+        
+        for start, end in _POSE_CONNECTIONS:
+            if visible[start] and visible[end]:
+                cv2.line(frame, points[start], points[end], _CONNECTION_COLOR, _CONNECTION_THICKNESS)
+                
+        for idx, (color, thickness, radius, border_radius) in enumerate(_LANDMARK_STYLES):
+            if visible[idx]:
+                cv2.circle(frame, points[idx], border_radius, _CONNECTION_COLOR, thickness)
+                cv2.circle(frame, points[idx], radius, color, thickness)
+                
+        return frame
+        
     def save_pose_data(self, pose_results: List[Optional[Dict]], output_path: str) -> bool:
         """
-        保存姿态数据到JSON文件
+        保存姿态数据到JSON文件（路径以 .npz 结尾时保存为压缩的NumPy格式）
         
         Args:
             pose_results: 姿态检测结果列表
@@ -237,20 +558,31 @@ class PoseDetector:
         Returns:
             bool: 是否成功保存
         """
+        if output_path.endswith('.npz'):
+            return self.save_pose_data_npz(pose_results, output_path)
+            
         try:
             # 转换为可序列化的格式
             serializable_data = []
             for result in pose_results:
                 if result:
                     serializable_data.append({
-                        'landmarks': result['landmarks'],
+                        'landmarks': self._as_landmark_array(result['landmarks']),
                         'frame_shape': result['frame_shape']
                     })
                 else:
                     serializable_data.append(None)
             
-            with open(output_path, 'w') as f:
-                json.dump(serializable_data, f, indent=2)
+            if orjson is not None:
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(serializable_data,
+                                         option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+            else:
+                for item in serializable_data:
+                    if item:
+                        item['landmarks'] = item['landmarks'].tolist()
+                with open(output_path, 'w') as f:
+                    json.dump(serializable_data, f, indent=2)
             
             return True
         except Exception as e:
@@ -259,7 +591,7 @@ class PoseDetector:
             
     def load_pose_data(self, input_path: str) -> List[Optional[Dict]]:
         """
-        从JSON文件加载姿态数据
+        从JSON文件加载姿态数据（路径以 .npz 结尾时按压缩的NumPy格式读取）
         
         Args:
             input_path: 输入文件路径
@@ -267,15 +599,111 @@ class PoseDetector:
         Returns:
             List[Optional[Dict]]: 姿态检测结果列表
         """
+        if input_path.endswith('.npz'):
+            return self.load_pose_data_npz(input_path)
+            
         try:
-            with open(input_path, 'r') as f:
-                data = json.load(f)
+            if orjson is not None:
+                with open(input_path, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(input_path, 'r') as f:
+                    data = json.load(f)
+                
+            # 兼容旧版字典列表格式，统一转换为关键点数组
+            for result in data:
+                if result and 'landmarks' in result:
+                    result['landmarks'] = self._as_landmark_array(result['landmarks'])
+                    
             return data
         except Exception as e:
             print(f"加载姿态数据失败: {e}")
             return []
             
+    def save_pose_data_npz(self, pose_results: List[Optional[Dict]], output_path: str) -> bool:
+        """
+        以压缩的NumPy格式保存姿态数据
+        
+        Args:
+            pose_results: 姿态检测结果列表
+            output_path: 输出文件路径（.npz）
+            
+        Returns:
+            bool: 是否成功保存
+        """
+        try:
+            num_landmarks = len(self.pose_landmarks_dict)
+            landmarks = np.zeros((len(pose_results), num_landmarks, 4), dtype=np.float32)
+            frame_shapes = np.zeros((len(pose_results), 3), dtype=np.int32)
+            valid_mask = np.zeros(len(pose_results), dtype=bool)
+            
+            for i, result in enumerate(pose_results):
+                if result:
+                    frame_landmarks = self._as_landmark_array(result['landmarks'])[:num_landmarks]
+                    landmarks[i, :len(frame_landmarks)] = frame_landmarks
+                    frame_shapes[i, :len(result['frame_shape'])] = result['frame_shape']
+                    valid_mask[i] = True
+            
+            np.savez_compressed(output_path, landmarks=landmarks,
+                                frame_shapes=frame_shapes, valid_mask=valid_mask)
+            return True
+        except Exception as e:
+            print(f"保存姿态数据失败: {e}")
+            return False
+            
+    def load_pose_data_npz(self, input_path: str) -> List[Optional[Dict]]:
+        """
+        从压缩的NumPy文件加载姿态数据
+        
+        Args:
+            input_path: 输入文件路径（.npz）
+            
+        Returns:
+            List[Optional[Dict]]: 姿态检测结果列表
+        """
+        try:
+            with np.load(input_path) as data:
+                landmarks = data['landmarks']
+                frame_shapes = data['frame_shapes']
+                valid_mask = data['valid_mask']
+                
+            return [
+                {'landmarks': landmarks[i], 'frame_shape': tuple(frame_shapes[i].tolist())} if valid else None
+                for i, valid in enumerate(valid_mask.tolist())
+            ]
+        except Exception as e:
+            print(f"加载姿态数据失败: {e}")
+            return []
+            
+    def reset(self):
+        """清除上一段视频的跟踪状态，使同一个检测器可以继续检测下一段视频，不必重新创建MediaPipe图"""
+        if self.pose is not None:
+            self.pose.reset()
+        for worker_pose in self._worker_poses:
+            worker_pose.reset()
+            
+    def close(self):
+        """释放MediaPipe模型占用的资源，可重复调用"""
+        pose = getattr(self, 'pose', None)
+        if pose is not None:
+            pose.close()
+            self.pose = None
+            
+        for worker_pose in getattr(self, '_worker_poses', []):
+            worker_pose.close()
+        self._worker_poses = []
+        self._idle_poses = queue.SimpleQueue()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+        
     def __del__(self):
-        """析构函数，释放资源"""
-        if hasattr(self, 'pose'):
-            self.pose.close()
\ No newline at end of file
+        """析构函数，未显式调用 close() 时尽量释放资源"""
+        try:
+            self.close()
+        except Exception:
+            pass
\ No newline at end of file
@@ -1,10 +1,155 @@
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Iterator
 import os
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import av
+except ImportError:  # PyAV 为可选依赖，缺失时使用 OpenCV 解码
+    av = None
+
+# PyAV解码不会按容器的显示矩阵旋转画面，需要读取 VideoFrame.rotation 自行旋转；
+# 旧版PyAV没有该属性，无法处理手机竖屏拍摄的视频，只用于读取关键帧信息，解码改用OpenCV
+_AV_DECODE = av is not None and hasattr(av.VideoFrame, 'rotation')
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+except ImportError:  # PyTurboJPEG 为可选依赖，缺失时用 cv2.imwrite 编码JPEG
+    TurboJPEG = None
+
+# 共享的TurboJPEG编码器：None表示尚未初始化，False表示libjpeg-turbo不可用
+_turbo_jpeg = None
+
+
+def _get_turbo_jpeg():
+    """返回共享的TurboJPEG编码器，不可用时返回None"""
+    global _turbo_jpeg
+    if _turbo_jpeg is None:
+        try:
+            _turbo_jpeg = TurboJPEG() if TurboJPEG is not None else False
+        except (RuntimeError, OSError):  # 找不到libturbojpeg动态库
+            _turbo_jpeg = False
+    return _turbo_jpeg or None
+
+
+def _swap_red_blue(frame: np.ndarray) -> np.ndarray:
+    """交换BGR/RGB通道顺序，返回反向步长的视图而不复制像素"""
+    return frame[..., ::-1]
+
+
+def _resize_interpolation(src_shape: Tuple[int, int], dst_shape: Tuple[int, int]) -> int:
+    """根据缩放方向选择插值方式：缩小用 INTER_AREA，放大用 INTER_LINEAR"""
+    if dst_shape[0] <= src_shape[0] and dst_shape[1] <= src_shape[1]:
+        return cv2.INTER_AREA
+    return cv2.INTER_LINEAR
+
+
+# 显示矩阵的顺时针旋转角度对应的 cv2.rotate 参数
+_ROTATE_CODES = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+
+def _av_frame_to_rgb(frame, width: int, height: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    把PyAV解码帧按显示方向旋转、缩放到 (width, height) 并转换为RGB
+    
+    OpenCV读取视频时会按容器的显示矩阵旋转画面，并据此报告旋转后的宽高；PyAV不会旋转，
+    因此按旋转前的尺寸解码、转换颜色后再用 cv2.rotate 写入输出，与OpenCV解码的画面方向一致。
+    
+    Args:
+        frame: av.VideoFrame
+        width: 输出宽度（旋转后）
+        height: 输出高度（旋转后）
+        dst: 预分配的输出数组 (height, width, 3)，为None时新建
+        
+    Returns:
+        np.ndarray: RGB帧 (height, width, 3)
+    """
+    # frame.rotation 是逆时针角度
+    rotate_code = _ROTATE_CODES.get(int(round(-frame.rotation)) % 360)
+    if rotate_code is None:
+        return _av_frame_to_upright_rgb(frame, width, height, dst)
+        
+    # 旋转90/270度时解码尺寸的宽高互换
+    if rotate_code == cv2.ROTATE_180:
+        rgb = _av_frame_to_upright_rgb(frame, width, height)
+    else:
+        rgb = _av_frame_to_upright_rgb(frame, height, width)
+    return cv2.rotate(rgb, rotate_code, dst=dst)
+
+
+# cvtColor 的I420转换固定按BT.601有限范围计算，只有这些色彩空间（未标注时libav也按BT.601处理）
+# 且不是全范围（JPEG range）的帧才能走这条快速路径
+_BT601_COLORSPACES = {2, 5, 6}  # UNSPECIFIED, BT470BG, SMPTE170M
+_JPEG_COLOR_RANGE = 2
+
+
+def _av_frame_to_upright_rgb(frame, width: int, height: int, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    把PyAV解码帧（不旋转）缩放到 (width, height) 并转换为RGB
+    
+    libav只负责缩放并输出YUV420（每像素1.5字节，而RGB24为3字节），颜色转换交给OpenCV的
+    向量化 cvtColor 完成。I420要求宽高为偶数，cvtColor 也只支持BT.601有限范围，奇数尺寸或
+    BT.709（多数高清视频）、全范围等其他色彩空间的帧仍由libav按帧标注的色彩空间直接输出RGB24。
+    """
+    if (width % 2 or height % 2 or frame.colorspace not in _BT601_COLORSPACES
+            or frame.color_range == _JPEG_COLOR_RANGE):
+        rgb = frame.to_ndarray(format='rgb24', width=width, height=height)
+        if dst is None:
+            return rgb
+        dst[...] = rgb
+        return dst
+        
+    yuv = frame.to_ndarray(format='yuv420p', width=width, height=height)
+    return cv2.cvtColor(yuv, cv2.COLOR_YUV2RGB_I420, dst=dst)
+
+
+def _cuda_available() -> bool:
+    """OpenCV是否带CUDA模块且存在可用的GPU"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+def _opencl_available() -> bool:
+    """OpenCV的T-API是否可以通过OpenCL在GPU上执行（UMat运算）"""
+    try:
+        return cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+    except (AttributeError, cv2.error):
+        return False
+
+
+def _open_capture(video_path: str) -> cv2.VideoCapture:
+    """优先用FFmpeg后端并请求硬件解码打开视频，不支持或打开失败时退回默认方式"""
+    try:
+        # VIDEO_ACCELERATION_ANY 由OpenCV自动选择可用的加速方式（VAAPI/NVDEC/VideoToolbox等），
+        # 没有可用硬件时仍以软件解码打开；与之同时指定 CAP_PROP_HW_DEVICE 会被OpenCV拒绝
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.isOpened():
+            return cap
+        cap.release()
+    except (AttributeError, cv2.error):  # 旧版OpenCV不支持打开参数
+        pass
+    return cv2.VideoCapture(video_path)
+
 
 class VideoProcessor:
-    """视频处理类，负责视频的加载、预处理和帧提取"""
+    """
+    视频处理类，负责视频的加载、预处理和帧提取
+    
+    推荐用 with 语句使用，退出时自动释放视频文件：
+        with VideoProcessor(path) as processor:
+            frames = processor.extract_frames()
+    """
     
     def __init__(self, video_path: str):
         """
@@ -32,7 +177,7 @@ class VideoProcessor:
             print(f"视频文件不存在: {self.video_path}")
             return False
             
-        self.cap = cv2.VideoCapture(self.video_path)
+        self.cap = _open_capture(self.video_path)
         
         if not self.cap.isOpened():
             print(f"无法打开视频文件: {self.video_path}")
@@ -47,43 +192,469 @@ class VideoProcessor:
         print(f"视频信息: {self.width}x{self.height}, {self.fps} FPS, {self.total_frames} 帧")
         return True
         
-    def extract_frames(self, start_frame: int = 0, end_frame: Optional[int] = None) -> List[np.ndarray]:
+    def scaled_size(self, max_side: int = 640) -> Tuple[int, int]:
+        """
+        计算长边不超过 max_side 的输出尺寸（保持宽高比，不放大），可作为 target_size 使用
+        
+        姿态检测输出的是归一化坐标，按比例缩小帧不会改变关键点坐标，却能大幅减少颜色转换、
+        内存占用和检测前的缩放开销。
+        
+        Args:
+            max_side: 长边的最大像素数
+            
+        Returns:
+            Tuple[int, int]: 输出尺寸 (width, height)
+        """
+        scale = min(1.0, max_side / max(self.width, self.height, 1))
+        return max(1, int(round(self.width * scale))), max(1, int(round(self.height * scale)))
+        
+    def extract_frames(self, start_frame: int = 0, end_frame: Optional[int] = None,
+                       target_size: Optional[Tuple[int, int]] = None, num_workers: int = 1) -> np.ndarray:
         """
         提取视频帧
         
         Args:
             start_frame: 开始帧
             end_frame: 结束帧（None表示到视频结尾）
+            target_size: 输出尺寸 (width, height)，None表示保持原始尺寸
+            num_workers: OpenCV解码时用于颜色转换和缩放的线程数，1表示在当前线程中处理
+            
+        Returns:
+            np.ndarray: 帧数组 (N, H, W, 3)，RGB格式
+        """
+        width, height = target_size if target_size is not None else (self.width, self.height)
+        
+        if self.cap is None:
+            print("视频未加载，请先调用load_video()")
+            return np.empty((0, height, width, 3), dtype=np.uint8)
+            
+        if end_frame is None or (self.total_frames > 0 and end_frame > self.total_frames):
+            end_frame = self.total_frames
+            
+        # 一次性分配全部帧的连续内存，解码结果直接写入对应位置
+        frames = np.empty((max(0, end_frame - start_frame), height, width, 3), dtype=np.uint8)
+        count = None
+        
+        if _AV_DECODE:
+            try:
+                count = self._extract_frames_av(start_frame, end_frame, frames)
+            except av.FFmpegError as e:
+                print(f"PyAV解码失败，改用OpenCV: {e}")
+                
+        if count is None:
+            if num_workers > 1:
+                count = self._extract_frames_cv2_parallel(start_frame, frames, num_workers)
+            else:
+                count = self._extract_frames_cv2(start_frame, frames)
+            
+        # 实际帧数少于元数据时只保留已解码的部分
+        frames = frames[:count]
+        
+        self.frames = frames
+        print(f"提取了 {len(frames)} 帧")
+        return frames
+        
+    def extract_sampled_frames(self, frame_step: int,
+                               target_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        从视频开头顺序解码，每 frame_step 帧保留一帧
+        
+        安装了PyAV时按帧时间戳取样，解码帧经YUV420直接转换为RGB；否则用OpenCV，跳过的帧只调用 grab()
+        推进解码位置，不做 retrieve() 的像素格式转换。两种方式都只顺序解码一遍，不再逐帧
+        设置 CAP_PROP_POS_FRAMES，避免每次定位都回退到关键帧重新解码。
+        
+        Args:
+            frame_step: 采样步长
+            target_size: 输出尺寸 (width, height)，None表示保持原始尺寸
             
         Returns:
-            List[np.ndarray]: 帧列表
+            np.ndarray: 帧数组 (M, H, W, 3)，RGB格式，对应第 0, frame_step, 2*frame_step, ... 帧
         """
+        width, height = target_size if target_size is not None else (self.width, self.height)
+        
         if self.cap is None:
             print("视频未加载，请先调用load_video()")
+            return np.empty((0, height, width, 3), dtype=np.uint8)
+            
+        frames = np.empty((len(range(0, self.total_frames, frame_step)), height, width, 3), dtype=np.uint8)
+        count = sum(1 for _ in self._iter_sampled_rgb(frame_step, width, height, out=frames))
+        
+        frames = frames[:count]
+        self.frames = frames
+        return frames
+        
+    def keyframe_times(self) -> List[float]:
+        """
+        列出视频流中所有关键帧的时间
+        
+        只用PyAV解封装读取数据包上的关键帧标记，不解码任何帧；未安装PyAV时返回空列表。
+        
+        Returns:
+            List[float]: 按时间排序的关键帧时间（秒，相对视频开头）
+        """
+        if av is None:
+            print("未安装PyAV，无法读取关键帧信息")
             return []
             
-        frames = []
+        times = []
+        with av.open(self.video_path) as container:
+            stream = container.streams.video[0]
+            stream_start = stream.start_time or 0
+            
+            for packet in container.demux(stream):
+                if packet.is_keyframe and packet.pts is not None:
+                    times.append(float((packet.pts - stream_start) * stream.time_base))
+                    
+        return sorted(times)
         
-        if end_frame is None:
-            end_frame = self.total_frames
+    def extract_keyframe_samples(self, frame_step: int,
+                                 target_size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        近似采样：每个采样时刻对齐到最近的关键帧，每个关键帧只定位并解码一帧
+        
+        解码量只与用到的关键帧数量有关，长视频低频采样时远少于 extract_sampled_frames 的顺序解码。
+        但采样时刻会偏移到关键帧上，相邻的采样可能合并为同一帧，帧间隔不再均匀，只适合能容忍时间
+        抖动的场合（如预览、粗筛），不能代替按固定帧率分析的 extract_sampled_frames。
+        未安装PyAV、读不到关键帧或帧率未知时退回 extract_sampled_frames。
+        
+        OpenCV读不到帧率时改用视频流的平均帧率换算时间；两者都没有时无法换算为秒，
+        返回的时间为各帧的帧序号。
+        
+        Args:
+            frame_step: 采样步长
+            target_size: 输出尺寸 (width, height)，None表示保持原始尺寸
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (帧数组 (M, H, W, 3) RGB格式, 各帧时间（秒，帧率未知时为帧序号）(M,))
+        """
+        width, height = target_size if target_size is not None else (self.width, self.height)
+        
+        if self.cap is None:
+            print("视频未加载，请先调用load_video()")
+            return np.empty((0, height, width, 3), dtype=np.uint8), np.empty(0)
+            
+        fps = self.fps
+        if fps <= 0 and av is not None:
+            with av.open(self.video_path) as container:
+                fps = float(container.streams.video[0].average_rate or 0)
+                
+        keyframes = np.asarray(self.keyframe_times()) if _AV_DECODE else np.empty(0)
+        if len(keyframes) == 0 or fps <= 0:
+            frames = self.extract_sampled_frames(frame_step, target_size)
+            positions = np.arange(len(frames)) * frame_step
+            return frames, positions / fps if fps > 0 else positions.astype(np.float64)
             
+        # 每个采样时刻取前后两个关键帧中较近的一个，去重后按时间排序
+        sample_times = np.arange(0, self.total_frames, frame_step) / fps
+        right = np.minimum(np.searchsorted(keyframes, sample_times), len(keyframes) - 1)
+        left = np.maximum(right - 1, 0)
+        nearest = np.where(sample_times - keyframes[left] <= keyframes[right] - sample_times, left, right)
+        targets = keyframes[np.unique(nearest)]
+        
+        frames = np.empty((len(targets), height, width, 3), dtype=np.uint8)
+        times = np.empty(len(targets))
+        count = 0
+        
+        with av.open(self.video_path) as container:
+            stream = container.streams.video[0]
+            time_base = stream.time_base
+            stream_start = stream.start_time or 0
+            
+            for target in targets:
+                container.seek(stream_start + int(round(target / time_base)),
+                               stream=stream, any_frame=False, backward=True)
+                frame = next(container.decode(stream), None)
+                if frame is None:
+                    continue
+                    
+                _av_frame_to_rgb(frame, width, height, dst=frames[count])
+                times[count] = float((frame.pts - stream_start) * time_base) if frame.pts is not None else target
+                count += 1
+                
+        return frames[:count], times[:count]
+        
+    def iter_sampled_frames(self, frame_step: int, target_size: Optional[Tuple[int, int]] = None,
+                            prefetch: int = 16) -> Iterator[np.ndarray]:
+        """
+        与 extract_sampled_frames 采样相同的帧，由后台线程解码后逐帧产出
+        
+        解码线程和调用方（如逐帧姿态检测）通过容量为 prefetch 的有界队列衔接，两者重叠执行，
+        内存中最多只驻留 prefetch 帧左右，不需要保存整段视频的帧数组。
+        
+        Args:
+            frame_step: 采样步长
+            target_size: 输出尺寸 (width, height)，None表示保持原始尺寸
+            prefetch: 解码线程最多领先调用方的帧数
+            
+        Yields:
+            np.ndarray: RGB帧 (H, W, 3)
+        """
+        if self.cap is None:
+            print("视频未加载，请先调用load_video()")
+            return
+            
+        width, height = target_size if target_size is not None else (self.width, self.height)
+        frame_queue = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        errors = []
+        
+        def put(item) -> bool:
+            # 调用方提前停止迭代时不再阻塞在满队列上
+            while not stop.is_set():
+                try:
+                    frame_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+            
+        def read_worker():
+            try:
+                for rgb in self._iter_sampled_rgb(frame_step, width, height):
+                    if not put(rgb):
+                        return
+            except Exception as e:
+                errors.append(e)
+            put(None)
+            
+        reader = threading.Thread(target=read_worker, daemon=True)
+        reader.start()
+        try:
+            while True:
+                frame = frame_queue.get()
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            stop.set()
+            reader.join()
+            
+        if errors:
+            raise errors[0]
+            
+    def _iter_sampled_rgb(self, frame_step: int, width: int, height: int,
+                          out: Optional[np.ndarray] = None) -> Iterator[np.ndarray]:
+        """
+        按步长依次产出RGB帧，优先用PyAV解码，PyAV不可用或无法解码该视频时退回OpenCV
+        
+        Args:
+            frame_step: 采样步长
+            width: 输出宽度
+            height: 输出高度
+            out: 预分配的帧数组 (M, H, W, 3)，不为None时帧直接写入其中（最多 len(out) 帧）
+            
+        Yields:
+            np.ndarray: RGB帧 (H, W, 3)
+        """
+        limit = len(out) if out is not None else None
+        
+        if _AV_DECODE:
+            count = 0
+            try:
+                for rgb in self._decode_sampled_av(frame_step, width, height, out):
+                    count += 1
+                    yield rgb
+                return
+            except av.FFmpegError as e:
+                # 已经产出的帧无法撤回，只有在第一帧之前失败时才能整体改用OpenCV
+                if count:
+                    raise
+                print(f"PyAV解码失败，改用OpenCV: {e}")
+                
+        for count, frame in enumerate(itertools.islice(self._grab_sampled(frame_step), limit)):
+            rgb = out[count] if out is not None else np.empty((height, width, 3), dtype=np.uint8)
+            self._convert_frame(frame, rgb)
+            yield rgb
+            
+    def _decode_sampled_av(self, frame_step: int, width: int, height: int,
+                           out: Optional[np.ndarray] = None) -> Iterator[np.ndarray]:
+        """
+        用PyAV从头顺序解码，按时间戳换算帧序号，只对每 frame_step 帧中的第一帧转换为RGB
+        
+        out 不为None时转换结果直接写入 out 的下一行（不产生临时帧），写满 len(out) 帧后停止。
+        """
+        count = 0
+        with av.open(self.video_path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = 'AUTO'  # 由libav在后台线程中解码
+            
+            time_base = stream.time_base
+            stream_start = stream.start_time or 0
+            fps = self.fps or float(stream.average_rate or 0)
+            
+            frame_index = 0
+            for frame in container.decode(stream):
+                if frame.pts is not None and fps > 0:
+                    frame_index = int(round(float((frame.pts - stream_start) * time_base) * fps))
+                    
+                if frame_index % frame_step == 0:
+                    if out is None:
+                        yield _av_frame_to_rgb(frame, width, height)
+                    elif count < len(out):
+                        yield _av_frame_to_rgb(frame, width, height, dst=out[count])
+                    else:
+                        return
+                    count += 1
+                frame_index += 1
+                
+    def _grab_sampled(self, frame_step: int) -> Iterator[np.ndarray]:
+        """从视频开头顺序 grab()，只对每 frame_step 帧中的第一帧 retrieve()，产出BGR帧"""
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        
+        frame_index = 0
+        while self.cap.grab():
+            if frame_index % frame_step == 0:
+                ret, frame = self.cap.retrieve()
+                if ret:
+                    yield frame
+            frame_index += 1
+            
+    def _extract_frames_cv2(self, start_frame: int, out: np.ndarray) -> int:
+        """
+        使用OpenCV解码视频帧，转换为RGB后写入 out
+        
+        Args:
+            start_frame: 开始帧
+            out: 预分配的帧数组 (N, H, W, 3)
+            
+        Returns:
+            int: 实际写入的帧数
+        """
         # 设置起始帧
         self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
         
-        current_frame = start_frame
-        while current_frame < end_frame:
+        count = 0
+        while count < len(out):
             ret, frame = self.cap.read()
             if not ret:
                 break
                 
-            # 转换为RGB格式（OpenCV默认是BGR）
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
-            current_frame += 1
+            self._convert_frame(frame, out[count])
+            count += 1
             
-        self.frames = frames
-        print(f"提取了 {len(frames)} 帧")
-        return frames
+        return count
+        
+    def _extract_frames_cv2_parallel(self, start_frame: int, out: np.ndarray, num_workers: int) -> int:
+        """
+        使用OpenCV解码视频帧，当前线程负责解码，线程池负责颜色转换和缩放
+        
+        cvtColor 和 resize 执行时会释放GIL，多个工作线程可以真正并行。
+        
+        Args:
+            start_frame: 开始帧
+            out: 预分配的帧数组 (N, H, W, 3)
+            num_workers: 工作线程数
+            
+        Returns:
+            int: 实际写入的帧数
+        """
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        
+        # 有界队列限制解码领先的帧数，避免原始帧堆积占用内存
+        frame_queue = queue.Queue(maxsize=8)
+        errors = []
+        
+        def convert_worker():
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    break
+                    
+                index, frame = item
+                try:
+                    self._convert_frame(frame, out[index])
+                except Exception as e:  # 出错后继续取队列，保证解码线程不会阻塞
+                    errors.append(e)
+                    
+        # setNumThreads 是全局设置：关闭OpenCV内部并行，避免与工作线程争抢CPU，结束后恢复
+        previous_threads = cv2.getNumThreads()
+        cv2.setNumThreads(1)
+        
+        count = 0
+        try:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                for _ in range(num_workers):
+                    executor.submit(convert_worker)
+                    
+                try:
+                    while count < len(out):
+                        ret, frame = self.cap.read()
+                        if not ret:
+                            break
+                        frame_queue.put((count, frame))
+                        count += 1
+                finally:
+                    for _ in range(num_workers):
+                        frame_queue.put(None)
+        finally:
+            cv2.setNumThreads(previous_threads)
+            
+        if errors:
+            raise errors[0]
+            
+        return count
+        
+    def _convert_frame(self, frame: np.ndarray, dst: np.ndarray):
+        """将BGR帧转换为RGB并缩放到 dst 的尺寸，结果直接写入 dst"""
+        height, width = dst.shape[:2]
+        if _opencl_available():
+            # 缩放和颜色转换都在OpenCL设备上完成，只把缩放后的小帧下载回内存
+            umat = cv2.UMat(frame)
+            if frame.shape[:2] != (height, width):
+                umat = cv2.resize(umat, (width, height),
+                                  interpolation=_resize_interpolation(frame.shape[:2], (height, width)))
+            np.copyto(dst, cv2.cvtColor(umat, cv2.COLOR_BGR2RGB).get())
+            return
+            
+        if frame.shape[:2] != (height, width):
+            # 先缩放再转换颜色，颜色转换只需处理缩放后的像素
+            frame = cv2.resize(frame, (width, height),
+                               interpolation=_resize_interpolation(frame.shape[:2], (height, width)))
+            
+        # 转换为RGB格式（OpenCV默认是BGR），直接写入预分配数组
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
+        
+    def _extract_frames_av(self, start_frame: int, end_frame: int, out: np.ndarray) -> int:
+        """
+        使用PyAV解码视频帧，经 _av_frame_to_rgb 直接写入RGB数组，不再经过BGR中间帧
+        
+        Args:
+            start_frame: 开始帧
+            end_frame: 结束帧（不包含）
+            out: 预分配的帧数组 (N, H, W, 3)
+            
+        Returns:
+            int: 实际写入的帧数
+        """
+        count = 0
+        height, width = out.shape[1:3]
+        
+        with av.open(self.video_path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = 'AUTO'  # 由libav在后台线程中解码
+            
+            time_base = stream.time_base
+            stream_start = stream.start_time or 0
+            fps = self.fps or float(stream.average_rate or 0)
+            
+            # 跳到起始帧之前最近的关键帧，之后按时间戳跳过多余的帧
+            if start_frame > 0 and fps > 0:
+                container.seek(stream_start + int(start_frame / fps / time_base),
+                               stream=stream, any_frame=False, backward=True)
+                
+            frame_index = start_frame
+            for frame in container.decode(stream):
+                if frame.pts is not None and fps > 0:
+                    frame_index = int(round(float((frame.pts - stream_start) * time_base) * fps))
+                    
+                if frame_index >= end_frame or count >= len(out):
+                    break
+                if frame_index >= start_frame:
+                    _av_frame_to_rgb(frame, width, height, dst=out[count])
+                    count += 1
+                frame_index += 1
+                
+        return count
         
     def preprocess_frame(self, frame: np.ndarray, target_size: Tuple[int, int] = (640, 480)) -> np.ndarray:
         """
@@ -104,6 +675,67 @@ class VideoProcessor:
         
         return resized
         
+    def preprocess_frames(self, frames: np.ndarray, target_size: Tuple[int, int] = (640, 480)) -> np.ndarray:
+        """
+        批量预处理帧
+        
+        缩小时使用 INTER_AREA 区域插值（OpenCV对其有SIMD优化，缩小时也不产生混叠），放大时使用双线性插值。
+        逐帧写入预分配数组，而不是把整个序列拼成一张高图一次缩放：那样相邻帧的边界行会互相混合。
+        
+        Args:
+            frames: 帧数组 (N, H, W, C)
+            target_size: 目标尺寸 (width, height)
+            
+        Returns:
+            np.ndarray: 处理后的帧数组 (N, height, width, C)
+        """
+        width, height = target_size
+        resized = np.empty((len(frames), height, width) + frames.shape[3:], dtype=frames.dtype)
+        if len(frames) == 0:
+            return resized
+            
+        interpolation = _resize_interpolation(frames.shape[1:3], (height, width))
+        resize = cv2.resize
+        
+        for i in range(len(frames)):
+            resize(frames[i], target_size, dst=resized[i], interpolation=interpolation)
+            
+        return resized
+        
+    def preprocess_frames_gpu(self, frames: np.ndarray, target_size: Tuple[int, int] = (640, 480)) -> np.ndarray:
+        """
+        使用OpenCV CUDA模块批量缩放帧
+        
+        上传、缩放和下载都排在同一个CUDA流上，上传复用同一块显存；
+        OpenCV未编译CUDA或没有可用GPU时退回 preprocess_frames。
+        
+        Args:
+            frames: 帧数组 (N, H, W, C)
+            target_size: 目标尺寸 (width, height)
+            
+        Returns:
+            np.ndarray: 处理后的帧数组 (N, height, width, C)
+        """
+        if len(frames) == 0 or not _cuda_available():
+            return self.preprocess_frames(frames, target_size)
+            
+        width, height = target_size
+        resized = np.empty((len(frames), height, width) + frames.shape[3:], dtype=frames.dtype)
+        interpolation = _resize_interpolation(frames.shape[1:3], (height, width))
+        
+        stream = cv2.cuda_Stream()
+        gpu_frame = cv2.cuda_GpuMat()
+        gpu_resized = cv2.cuda_GpuMat()
+        
+        for i in range(len(frames)):
+            gpu_frame.upload(frames[i], stream)
+            cv2.cuda.resize(gpu_frame, target_size, dst=gpu_resized,
+                            interpolation=interpolation, stream=stream)
+            gpu_resized.download(stream, resized[i])
+            
+        stream.waitForCompletion()
+        return resized
+        
     def get_frame_at_time(self, time_seconds: float) -> Optional[np.ndarray]:
         """
         获取指定时间点的帧
@@ -125,24 +757,45 @@ class VideoProcessor:
         ret, frame = self.cap.read()
         
         if ret:
-            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # 解码出的帧只在这里使用，直接返回RGB视图，省去一次整帧复制
+            return _swap_red_blue(frame)
         return None
         
-    def save_frame(self, frame: np.ndarray, output_path: str) -> bool:
+    def save_frame(self, frame: np.ndarray, output_path: str, file_format: str = 'auto',
+                   jpeg_quality: int = 85) -> bool:
         """
         保存帧到文件
         
         Args:
-            frame: 帧数据
+            frame: 帧数据（RGB格式）
             output_path: 输出路径
+            file_format: 'npy'（原始数组，不做编码）、'jpg' 或 'png'，'auto' 表示根据扩展名判断
+            jpeg_quality: JPEG质量
             
         Returns:
             bool: 是否成功保存
         """
+        if file_format == 'auto':
+            file_format = os.path.splitext(output_path)[1].lower().lstrip('.')
+            
         try:
-            # 转换为BGR格式以便保存
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            cv2.imwrite(output_path, frame_bgr)
+            if file_format == 'npy':
+                # 中间结果直接保存原始数组，之后可用 np.load(mmap_mode='r') 读取
+                with open(output_path, 'wb') as f:
+                    np.save(f, frame)
+                return True
+                
+            turbo_jpeg = _get_turbo_jpeg() if file_format in ('jpg', 'jpeg') else None
+            if turbo_jpeg is not None:
+                # libjpeg-turbo 直接编码RGB数据
+                with open(output_path, 'wb') as f:
+                    f.write(turbo_jpeg.encode(np.ascontiguousarray(frame), quality=jpeg_quality,
+                                              pixel_format=TJPF_RGB))
+                return True
+                
+            # 以BGR视图传给imwrite，不单独生成转换后的帧
+            params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality] if file_format in ('jpg', 'jpeg') else []
+            cv2.imwrite(output_path, _swap_red_blue(frame), params)
             return True
         except Exception as e:
             print(f"保存帧失败: {e}")
@@ -169,6 +822,12 @@ class VideoProcessor:
             self.cap.release()
             self.cap = None
             
-    def __del__(self):
-        """析构函数，确保资源释放"""
-        self.release()
\ No newline at end of file
+    def __enter__(self):
+        """进入上下文时加载视频（已加载则不重复加载）"""
+        if self.cap is None:
+            self.load_video()
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
\ No newline at end of file
@@ -1,13 +1,112 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import numpy as np
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
 import cv2
 import os
+from io import BytesIO
+from pose_detector import PoseDetector
+
+try:
+    import pybase64 as base64
+except ImportError:  # pybase64 为可选依赖，缺失时使用标准库 base64
+    import base64
+
+try:
+    import av
+except ImportError:  # PyAV 为可选依赖，缺失时使用 OpenCV 的 mp4v 编码
+    av = None
+
+# PyAV 编码器按优先级尝试：NVENC硬件编码、libx264软件编码、MPEG-4
+AV_ENCODERS = ('h264_nvenc', 'libx264', 'mpeg4')
+
+# 写HTML时内嵌图像每次base64编码的字节数（3的倍数）
+_BASE64_CHUNK = 3 * 64 * 1024
+
+# 报告中跳跃阶段的顺序：准备、起跳、落地
+JUMP_PHASE_KEYS = ('preparation', 'takeoff', 'landing')
+
+
+def figure_to_jpeg(fig, dpi: int = 80, quality: int = 80, close: bool = True) -> bytes:
+    """
+    将图表渲染为JPEG字节（用于嵌入HTML报告）
+    
+    报告中的图表只供浏览器查看，有损JPEG比无损PNG小数倍，base64后的HTML也相应变小；
+    JPEG不支持透明，matplotlib 保存时会把图像合成到白色的图表背景上。
+    调用方已用 tight_layout 排版，因此不使用 bbox_inches='tight'，它会为计算边界额外完整渲染一次。
+    
+    Args:
+        fig: matplotlib图表
+        dpi: 输出分辨率
+        quality: JPEG质量（1-95）
+        close: 渲染后是否关闭图表（图表还要复用时传False）
+        
+    Returns:
+        bytes: JPEG图像数据
+    """
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format='jpg', dpi=dpi,
+                    pil_kwargs={'quality': quality, 'optimize': True, 'progressive': True})
+    finally:
+        if close:
+            plt.close(fig)
+    return buffer.getvalue()
+
+
+def phase_durations(jump_phases: Dict) -> np.ndarray:
+    """
+    一次计算各跳跃阶段的帧数
+    
+    Args:
+        jump_phases: 跳跃阶段划分结果，缺失的阶段或字段按0计
+        
+    Returns:
+        np.ndarray: 按 JUMP_PHASE_KEYS 顺序的各阶段帧数 (3,)
+    """
+    phases = [jump_phases.get(key) or {} for key in JUMP_PHASE_KEYS]
+    bounds = np.array([[phase.get('start_frame', 0), phase.get('end_frame', 0)] for phase in phases])
+    return bounds[:, 1] - bounds[:, 0]
+
+
+def html_jpeg_img(jpeg: bytes, alt: str) -> List:
+    """返回内嵌JPEG的 <img> 标签片段，图像保持为bytes，由 write_html 写文件时再编码"""
+    return ['<img src="data:image/jpeg;base64,', jpeg, f'" alt="{alt}">']
+
+
+def write_html(output_path: str, html_parts: List) -> None:
+    """
+    将HTML片段依次写入文件
+    
+    str 片段按UTF-8编码写入；bytes 片段（内嵌图像）按块base64编码后直接写入，
+    不生成完整的base64字符串，也不把整份HTML拼成一个大字符串。
+    
+    Args:
+        output_path: 输出路径
+        html_parts: HTML片段列表
+    """
+    with open(output_path, 'wb') as f:
+        for part in html_parts:
+            if isinstance(part, str):
+                f.write(part.encode('utf-8'))
+                continue
+                
+            # 块大小取3的倍数，各块单独编码后直接相连，结果与整体编码相同
+            data = memoryview(part)
+            for start in range(0, len(data), _BASE64_CHUNK):
+                f.write(base64.b64encode(data[start:start + _BASE64_CHUNK]))
+
 
 class JumpVisualizer:
     """跳跃分析可视化类"""
     
+    # 力量评估雷达图的类别和对应角度（末尾重复第一个角度以闭合图形），各次绘图共用
+    RADAR_CATEGORIES = ('爆发力', '核心力量', '协调性')
+    RADAR_KEYS = ('explosive_power', 'core_strength', 'coordination')
+    _RADAR_ANGLES = np.append(np.linspace(0, 2 * np.pi, len(RADAR_CATEGORIES), endpoint=False), 0.0)
+    
     def __init__(self, output_dir: str = "outputs"):
         """
         初始化可视化器
@@ -22,136 +121,187 @@ class JumpVisualizer:
         plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
         plt.rcParams['axes.unicode_minus'] = False
         
-    def visualize_jump_analysis(self, analysis_result: Dict, save_path: str = None) -> None:
+    def visualize_jump_analysis(self, analysis_result: Dict, save_path: str = None,
+                                dpi: int = 100, show: Optional[bool] = None) -> None:
         """
         可视化完整的跳跃分析结果
         
         Args:
             analysis_result: 跳跃分析结果
             save_path: 保存路径
+            dpi: 保存图片的分辨率
+            show: 是否弹出窗口显示，None表示只在未指定保存路径时显示
         """
         if 'error' in analysis_result.get('jump_metrics', {}):
             print(f"分析结果包含错误: {analysis_result['jump_metrics']['error']}")
             return
             
-        # 创建子图
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-        fig.suptitle('跳跃动作分析报告', fontsize=16, fontweight='bold')
-        
-        # 1. 身体中心轨迹
-        self._plot_body_center_trajectory(axes[0, 0], analysis_result)
-        
-        # 2. 关节角度变化
-        self._plot_joint_angles(axes[0, 1], analysis_result)
-        
-        # 3. 跳跃阶段划分
-        self._plot_jump_phases(axes[0, 2], analysis_result)
+        if show is None:
+            show = save_path is None
+            
+        # 关闭交互模式，图形只在保存时渲染一次
+        with plt.ioff():
+            fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+            
+        self._draw_jump_analysis(fig, axes, analysis_result)
         
-        # 4. 力量评估雷达图
-        self._plot_strength_radar(axes[1, 0], analysis_result)
+        # _draw_jump_analysis 已用 tight_layout 排版，不再用 bbox_inches='tight' 额外渲染一遍求边界
+        fig.savefig(save_path or os.path.join(self.output_dir, 'jump_analysis.png'), dpi=dpi)
         
-        # 5. 姿态评估
-        self._plot_posture_analysis(axes[1, 1], analysis_result)
+        if show:
+            plt.show()
+            
+        # 及时释放图形占用的内存
+        plt.close(fig)
         
-        # 6. 综合指标
-        self._plot_summary_metrics(axes[1, 2], analysis_result)
+    def _draw_jump_analysis(self, fig, axes, analysis_result: Dict) -> None:
+        """在 2x3 子图上绘制完整的跳跃分析结果"""
+        fig.suptitle('跳跃动作分析报告', fontsize=16, fontweight='bold')
         
-        plt.tight_layout()
+        # 序列数据只转换一次数组，多个子图共用
+        analysis_result = dict(
+            analysis_result,
+            **{key: self._pairs_to_array(analysis_result.get(key, []))
+               for key in ('body_centers', 'knee_angles', 'hip_angles')}
+        )
+        
+        plots = [
+            (self._plot_body_center_trajectory, axes[0, 0]),  # 1. 身体中心轨迹
+            (self._plot_joint_angles, axes[0, 1]),            # 2. 关节角度变化
+            (self._plot_jump_phases, axes[0, 2]),             # 3. 跳跃阶段划分
+            (self._plot_strength_radar, axes[1, 0]),          # 4. 力量评估雷达图
+            (self._plot_posture_analysis, axes[1, 1]),        # 5. 姿态评估
+            (self._plot_summary_metrics, axes[1, 2]),         # 6. 综合指标
+        ]
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        else:
-            plt.savefig(os.path.join(self.output_dir, 'jump_analysis.png'), 
-                       dpi=300, bbox_inches='tight')
+        # matplotlib 的图元不是线程安全的，同一个 Figure 上的子图按顺序构建
+        for plot, ax in plots:
+            plot(ax, analysis_result)
         
-        plt.show()
+        fig.tight_layout()
         
     def _plot_body_center_trajectory(self, ax, analysis_result: Dict) -> None:
         """绘制身体中心轨迹"""
-        body_centers = analysis_result.get('body_centers', [])
+        body_centers = self._pairs_to_array(analysis_result.get('body_centers', []))
         jump_phases = analysis_result.get('jump_phases', {})
         
         # 提取有效的身体中心点
-        valid_centers = [(i, center) for i, center in enumerate(body_centers) if center is not None]
+        frames, valid_centers = self._valid_rows(body_centers)
         
-        if not valid_centers:
+        if len(frames) == 0:
             ax.text(0.5, 0.5, '无有效数据', ha='center', va='center', transform=ax.transAxes)
             ax.set_title('身体中心轨迹')
             return
             
-        frames = [i for i, _ in valid_centers]
-        x_coords = [center[0] for _, center in valid_centers]
-        y_coords = [center[1] for _, center in valid_centers]
+        x_coords = valid_centers[:, 0]
+        y_coords = valid_centers[:, 1]
         
         # 绘制轨迹
-        ax.plot(frames, y_coords, 'b-', linewidth=2, label='垂直位置')
-        ax.plot(frames, x_coords, 'r--', linewidth=1, label='水平位置')
+        line_handles = self._add_line_series(ax, [
+            (frames, y_coords, 'b', '-', 2, '垂直位置'),
+            (frames, x_coords, 'r', '--', 1, '水平位置')
+        ])
         
-        # 标记关键点
+        # 标记关键点（body_centers 按帧号索引，直接取对应帧，无需在有效帧列表中线性查找）
         if 'peak_frame' in jump_phases:
             peak_frame = jump_phases['peak_frame']
-            if peak_frame in frames:
-                peak_idx = frames.index(peak_frame)
-                ax.scatter(peak_frame, y_coords[peak_idx], color='red', s=100, 
+            peak_center = self._center_at(body_centers, peak_frame)
+            if peak_center is not None:
+                ax.scatter(peak_frame, peak_center[1], color='red', s=100, 
                           marker='o', label='最高点', zorder=5)
         
         if 'lowest_frame' in jump_phases:
             lowest_frame = jump_phases['lowest_frame']
-            if lowest_frame in frames:
-                lowest_idx = frames.index(lowest_frame)
-                ax.scatter(lowest_frame, y_coords[lowest_idx], color='green', s=100, 
+            lowest_center = self._center_at(body_centers, lowest_frame)
+            if lowest_center is not None:
+                ax.scatter(lowest_frame, lowest_center[1], color='green', s=100, 
                           marker='s', label='最低点', zorder=5)
         
         ax.set_xlabel('帧数')
         ax.set_ylabel('位置')
         ax.set_title('身体中心轨迹')
-        ax.legend()
+        ax.legend(handles=line_handles + ax.get_legend_handles_labels()[0])
         ax.grid(True, alpha=0.3)
         
+    def _add_line_series(self, ax, series: List[Tuple]) -> List[Line2D]:
+        """
+        用一个 LineCollection 绘制多条折线，由渲染器一次绘制完成
+        
+        Args:
+            ax: 子图
+            series: (x, y, color, linestyle, linewidth, label) 列表
+            
+        Returns:
+            List[Line2D]: 图例用的代理图元
+        """
+        collection = LineCollection([np.column_stack([x, y]) for x, y, *_ in series],
+                                    colors=[s[2] for s in series],
+                                    linestyles=[s[3] for s in series],
+                                    linewidths=[s[4] for s in series])
+        ax.add_collection(collection)
+        ax.autoscale_view()
+        
+        return [Line2D([], [], color=color, linestyle=linestyle, linewidth=linewidth, label=label)
+                for _, _, color, linestyle, linewidth, label in series]
+        
+    def _center_at(self, body_centers: np.ndarray, frame: int) -> Optional[np.ndarray]:
+        """返回指定帧的身体中心点，帧号越界或该帧无数据时返回None"""
+        if 0 <= frame < len(body_centers) and not np.isnan(body_centers[frame]).any():
+            return body_centers[frame]
+        return None
+        
+    def _pairs_to_array(self, pairs) -> np.ndarray:
+        """将 List[Optional[Tuple]] 转换为 (N, 2) 浮点数组，None（整帧或单个值）转换为NaN"""
+        if isinstance(pairs, np.ndarray):
+            return pairs.astype(float, copy=False)
+        return np.array([(np.nan, np.nan) if pair is None else pair for pair in pairs],
+                        dtype=float).reshape(-1, 2)
+        
+    def _valid_rows(self, values: np.ndarray, nonzero: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """返回两列都有效（非NaN，nonzero时还要求非0）的帧号和对应行"""
+        mask = ~np.isnan(values).any(axis=1)
+        if nonzero:
+            mask &= (values != 0).all(axis=1)
+        return np.flatnonzero(mask), values[mask]
+        
     def _plot_joint_angles(self, ax, analysis_result: Dict) -> None:
         """绘制关节角度变化"""
-        knee_angles = analysis_result.get('knee_angles', [])
-        hip_angles = analysis_result.get('hip_angles', [])
+        knee_angles = self._pairs_to_array(analysis_result.get('knee_angles', []))
+        hip_angles = self._pairs_to_array(analysis_result.get('hip_angles', []))
         
-        # 提取有效的角度数据
-        valid_knee = [(i, angles) for i, angles in enumerate(knee_angles) 
-                     if angles and angles[0] and angles[1]]
-        valid_hip = [(i, angles) for i, angles in enumerate(hip_angles) 
-                    if angles and angles[0] and angles[1]]
+        # 提取有效的角度数据（左右角度都存在且非0）
+        knee_frames, valid_knee = self._valid_rows(knee_angles, nonzero=True)
+        hip_frames, valid_hip = self._valid_rows(hip_angles, nonzero=True)
         
-        if not valid_knee and not valid_hip:
+        if len(knee_frames) == 0 and len(hip_frames) == 0:
             ax.text(0.5, 0.5, '无有效角度数据', ha='center', va='center', transform=ax.transAxes)
             ax.set_title('关节角度变化')
             return
         
+        series = []
+        
         # 绘制膝关节角度
-        if valid_knee:
-            knee_frames = [i for i, _ in valid_knee]
-            left_knee = [angles[0] for _, angles in valid_knee]
-            right_knee = [angles[1] for _, angles in valid_knee]
-            
-            ax.plot(knee_frames, left_knee, 'b-', label='左膝', linewidth=2)
-            ax.plot(knee_frames, right_knee, 'b--', label='右膝', linewidth=2)
+        if len(knee_frames) > 0:
+            series.append((knee_frames, valid_knee[:, 0], 'b', '-', 2, '左膝'))
+            series.append((knee_frames, valid_knee[:, 1], 'b', '--', 2, '右膝'))
         
         # 绘制髋关节角度
-        if valid_hip:
-            hip_frames = [i for i, _ in valid_hip]
-            left_hip = [angles[0] for _, angles in valid_hip]
-            right_hip = [angles[1] for _, angles in valid_hip]
+        if len(hip_frames) > 0:
+            series.append((hip_frames, valid_hip[:, 0], 'r', '-', 2, '左髋'))
+            series.append((hip_frames, valid_hip[:, 1], 'r', '--', 2, '右髋'))
             
-            ax.plot(hip_frames, left_hip, 'r-', label='左髋', linewidth=2)
-            ax.plot(hip_frames, right_hip, 'r--', label='右髋', linewidth=2)
+        line_handles = self._add_line_series(ax, series)
         
         ax.set_xlabel('帧数')
         ax.set_ylabel('角度 (度)')
         ax.set_title('关节角度变化')
-        ax.legend()
+        ax.legend(handles=line_handles)
         ax.grid(True, alpha=0.3)
         
     def _plot_jump_phases(self, ax, analysis_result: Dict) -> None:
         """绘制跳跃阶段划分"""
         jump_phases = analysis_result.get('jump_phases', {})
-        body_centers = analysis_result.get('body_centers', [])
+        body_centers = self._pairs_to_array(analysis_result.get('body_centers', []))
         
         if 'error' in jump_phases:
             ax.text(0.5, 0.5, f'阶段识别失败: {jump_phases["error"]}', 
@@ -160,15 +310,14 @@ class JumpVisualizer:
             return
         
         # 提取有效的身体中心点
-        valid_centers = [(i, center) for i, center in enumerate(body_centers) if center is not None]
+        frames, valid_centers = self._valid_rows(body_centers)
         
-        if not valid_centers:
+        if len(frames) == 0:
             ax.text(0.5, 0.5, '无有效数据', ha='center', va='center', transform=ax.transAxes)
             ax.set_title('跳跃阶段划分')
             return
         
-        frames = [i for i, _ in valid_centers]
-        y_coords = [center[1] for _, center in valid_centers]
+        y_coords = valid_centers[:, 1]
         
         # 绘制身体中心轨迹
         ax.plot(frames, y_coords, 'k-', linewidth=2, alpha=0.7)
@@ -201,18 +350,12 @@ class JumpVisualizer:
             ax.set_title('力量评估')
             return
         
-        # 准备数据
-        categories = ['爆发力', '核心力量', '协调性']
-        values = [
-            strength_assessment.get('explosive_power', 0),
-            strength_assessment.get('core_strength', 0),
-            strength_assessment.get('coordination', 0)
-        ]
-        
-        # 雷达图角度
-        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-        values += values[:1]  # 闭合图形
-        angles += angles[:1]
+        # 准备数据，最后一个值重复第一个值以闭合图形
+        angles = self._RADAR_ANGLES
+        values = np.empty(len(angles))
+        for i, key in enumerate(self.RADAR_KEYS):
+            values[i] = strength_assessment.get(key, 0)
+        values[-1] = values[0]
         
         # 绘制雷达图
         ax.plot(angles, values, 'o-', linewidth=2, color='red')
@@ -220,13 +363,13 @@ class JumpVisualizer:
         
         # 设置标签
         ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(categories)
+        ax.set_xticklabels(self.RADAR_CATEGORIES)
         ax.set_ylim(0, 1)
         ax.set_title('力量评估雷达图')
         ax.grid(True)
         
         # 添加数值标签
-        for angle, value, category in zip(angles[:-1], values[:-1], categories):
+        for angle, value in zip(angles[:-1].tolist(), values[:-1].tolist()):
             ax.text(angle, value + 0.1, f'{value:.2f}', ha='center', va='center')
         
     def _plot_posture_analysis(self, ax, analysis_result: Dict) -> None:
@@ -305,51 +448,113 @@ class JumpVisualizer:
         ax.set_title('综合指标')
         ax.axis('off')
         
-    def create_pose_animation(self, frames: List[np.ndarray], 
+    def create_pose_animation(self, frames: Union[np.ndarray, List[np.ndarray]], 
                             pose_results: List[Optional[Dict]], 
                             output_path: str) -> bool:
         """
         创建姿态检测动画
         
         Args:
-            frames: 视频帧列表
+            frames: 视频帧数组 (N, H, W, 3) 或帧列表
             pose_results: 姿态检测结果列表
             output_path: 输出视频路径
             
         Returns:
             bool: 是否成功创建
         """
-        if not frames or not pose_results:
+        if len(frames) == 0 or not pose_results:
             return False
         
         # 获取视频参数
         height, width = frames[0].shape[:2]
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(output_path, fourcc, 30.0, (width, height))
+        fps = 30.0
         
         try:
-            from pose_detector import PoseDetector
-            pose_detector = PoseDetector()
+            annotated_frames = self._annotated_frames(frames, pose_results)
             
-            for frame, pose_result in zip(frames, pose_results):
-                if pose_result:
-                    # 绘制姿态关键点
-                    annotated_frame = pose_detector.draw_pose_landmarks(frame, pose_result)
-                    # 转换为BGR格式
-                    frame_bgr = cv2.cvtColor(annotated_frame, cv2.COLOR_RGB2BGR)
-                else:
-                    frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                
-                out.write(frame_bgr)
+            writer = self._open_av_writer(output_path, width, height, fps) if av is not None else None
+            if writer is not None:
+                self._write_video_av(writer, annotated_frames)
+            else:
+                self._write_video_cv2(output_path, annotated_frames, width, height, fps)
                 
         except Exception as e:
             print(f"创建动画失败: {e}")
             return False
-        finally:
-            out.release()
         
         return True
         
+    def _annotated_frames(self, frames: Union[np.ndarray, List[np.ndarray]],
+                          pose_results: List[Optional[Dict]]):
+        """逐帧产出绘制了姿态关键点的RGB帧（有关键点的帧共用同一块画布，产出后即被覆盖）"""
+        # 整段关键点一次性换算为像素坐标，逐帧只做 cv2 绘制，不再经过MediaPipe的绘制函数
+        height, width = frames[0].shape[:2]
+        pixels, drawable = PoseDetector.landmarks_to_pixels(pose_results[:len(frames)], width, height)
+        
+        # 复用同一块画布绘制关键点，避免每帧分配新数组，也不修改调用方传入的帧
+        canvas = np.empty_like(frames[0])
+        
+        for i in range(len(pixels)):
+            frame = frames[i]
+            if drawable[i].any():
+                # 绘制姿态关键点
+                np.copyto(canvas, frame)
+                frame = PoseDetector.draw_landmark_pixels(canvas, pixels[i], drawable[i])
+            yield frame
+            
+    def _open_av_writer(self, output_path: str, width: int, height: int, fps: float):
+        """
+        按 AV_ENCODERS 的顺序打开第一个可用的PyAV编码器
+        
+        Returns:
+            Optional[Tuple]: (container, stream)，没有可用编码器时返回None
+        """
+        # yuv420p 要求宽高为偶数
+        if width % 2 or height % 2:
+            return None
+            
+        for codec_name in AV_ENCODERS:
+            container = av.open(output_path, 'w')
+            try:
+                stream = container.add_stream(codec_name, rate=int(round(fps)))
+                stream.width = width
+                stream.height = height
+                stream.pix_fmt = 'yuv420p'
+                stream.codec_context.open()
+                return container, stream
+            except (av.FFmpegError, ValueError):
+                container.close()
+                
+        return None
+        
+    def _write_video_av(self, writer, frames) -> None:
+        """用PyAV编码RGB帧，RGB到YUV的转换由编码器一侧完成，无需逐帧转换为BGR"""
+        container, stream = writer
+        try:
+            for frame in frames:
+                for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format='rgb24')):
+                    container.mux(packet)
+                    
+            # 刷出编码器中缓存的帧
+            for packet in stream.encode():
+                container.mux(packet)
+        finally:
+            container.close()
+            
+    def _write_video_cv2(self, output_path: str, frames, width: int, height: int, fps: float) -> None:
+        """用OpenCV的mp4v编码写出RGB帧"""
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        frame_bgr = None
+        
+        try:
+            for frame in frames:
+                # 转换为BGR格式，写入复用的输出缓冲区
+                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR, dst=frame_bgr)
+                out.write(frame_bgr)
+        finally:
+            out.release()
+        
     def save_analysis_report(self, analysis_result: Dict, output_path: str) -> bool:
         """
         保存分析报告到文本文件
@@ -362,46 +567,51 @@ class JumpVisualizer:
             bool: 是否成功保存
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write("跳跃动作分析报告\n")
-                f.write("=" * 30 + "\n\n")
-                
-                # 跳跃指标
-                jump_metrics = analysis_result.get('jump_metrics', {})
-                if 'error' not in jump_metrics:
-                    f.write("跳跃指标:\n")
-                    f.write(f"  跳跃高度: {jump_metrics.get('jump_height_pixels', 0):.1f} 像素\n")
-                    f.write(f"  起跳时间: {jump_metrics.get('takeoff_duration', 0):.2f} 秒\n")
-                    f.write(f"  准备时间: {jump_metrics.get('preparation_duration', 0):.2f} 秒\n")
-                    f.write(f"  落地时间: {jump_metrics.get('landing_duration', 0):.2f} 秒\n")
-                    f.write(f"  总时间: {jump_metrics.get('total_duration', 0):.2f} 秒\n\n")
-                
-                # 力量评估
-                strength_assessment = analysis_result.get('strength_assessment', {})
-                if 'error' not in strength_assessment:
-                    f.write("力量评估:\n")
-                    f.write(f"  综合得分: {strength_assessment.get('overall_score', 0):.2f}\n")
-                    f.write(f"  爆发力: {strength_assessment.get('explosive_power', 0):.2f}\n")
-                    f.write(f"  核心力量: {strength_assessment.get('core_strength', 0):.2f}\n")
-                    f.write(f"  协调性: {strength_assessment.get('coordination', 0):.2f}\n\n")
+            # 先在内存中拼好整份报告，再一次性写入文件
+            lines = ["跳跃动作分析报告\n", "=" * 30 + "\n\n"]
+            add = lines.append
+            
+            # 跳跃指标
+            jump_metrics = analysis_result.get('jump_metrics', {})
+            if 'error' not in jump_metrics:
+                get = jump_metrics.get
+                add("跳跃指标:\n"
+                    f"  跳跃高度: {get('jump_height_pixels', 0):.1f} 像素\n"
+                    f"  起跳时间: {get('takeoff_duration', 0):.2f} 秒\n"
+                    f"  准备时间: {get('preparation_duration', 0):.2f} 秒\n"
+                    f"  落地时间: {get('landing_duration', 0):.2f} 秒\n"
+                    f"  总时间: {get('total_duration', 0):.2f} 秒\n\n")
+            
+            # 力量评估
+            strength_assessment = analysis_result.get('strength_assessment', {})
+            if 'error' not in strength_assessment:
+                get = strength_assessment.get
+                add("力量评估:\n"
+                    f"  综合得分: {get('overall_score', 0):.2f}\n"
+                    f"  爆发力: {get('explosive_power', 0):.2f}\n"
+                    f"  核心力量: {get('core_strength', 0):.2f}\n"
+                    f"  协调性: {get('coordination', 0):.2f}\n\n")
+            
+            # 姿态分析
+            posture_analysis = analysis_result.get('posture_analysis', {})
+            if 'error' not in posture_analysis:
+                add("姿态分析:\n")
+                phases = [
+                    ('preparation_posture', '准备阶段'),
+                    ('takeoff_posture', '起跳阶段'),
+                    ('landing_posture', '落地阶段')
+                ]
                 
-                # 姿态分析
-                posture_analysis = analysis_result.get('posture_analysis', {})
-                if 'error' not in posture_analysis:
-                    f.write("姿态分析:\n")
-                    phases = [
-                        ('preparation_posture', '准备阶段'),
-                        ('takeoff_posture', '起跳阶段'),
-                        ('landing_posture', '落地阶段')
-                    ]
-                    
-                    for phase_key, phase_name in phases:
-                        if phase_key in posture_analysis:
-                            phase_data = posture_analysis[phase_key]
-                            f.write(f"  {phase_name}:\n")
-                            f.write(f"    稳定性得分: {phase_data.get('stability_score', 0):.3f}\n")
-                            f.write(f"    平均膝关节角度: {phase_data.get('avg_knee_angle', 0):.1f}°\n")
-                            f.write(f"    平均髋关节角度: {phase_data.get('avg_hip_angle', 0):.1f}°\n")
+                for phase_key, phase_name in phases:
+                    if phase_key in posture_analysis:
+                        get = posture_analysis[phase_key].get
+                        add(f"  {phase_name}:\n"
+                            f"    稳定性得分: {get('stability_score', 0):.3f}\n"
+                            f"    平均膝关节角度: {get('avg_knee_angle', 0):.1f}°\n"
+                            f"    平均髋关节角度: {get('avg_hip_angle', 0):.1f}°\n")
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(lines))
             
             return True
             
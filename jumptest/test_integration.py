@@ -5,6 +5,9 @@
 
 import sys
 import os
+import struct
+import tempfile
+import cv2
 import numpy as np
 
 # 添加src目录到路径
@@ -16,60 +19,132 @@ from jump_analyzer import JumpAnalyzer
 from visualizer import JumpVisualizer
 
 
-def create_mock_pose_data(num_frames=60):
-    """创建模拟姿态数据用于测试"""
-    pose_results = []
+def create_mock_pose_data(num_frames=60, seed=None):
+    """创建模拟姿态数据用于测试，每帧的 landmarks 为 (33, 4) float32 数组（x, y, z, visibility）"""
+    rng = np.random.default_rng(seed)
+    frame_idx = np.arange(num_frames, dtype=float)
     
-    for i in range(num_frames):
-        # 模拟身体中心Y坐标的变化（跳跃轨迹）
-        if i < 20:  # 准备阶段
-            center_y = 0.7 + i * 0.005
-        elif i < 40:  # 起跳阶段
-            center_y = 0.8 - (i - 20) * 0.02
-        else:  # 落地阶段
-            center_y = 0.4 + (i - 40) * 0.015
-        
-        center_x = 0.5
-        
-        # 创建模拟的landmark数据
-        landmarks = []
-        landmark_positions = {
-            0: (center_x, center_y - 0.15),  # nose
-            11: (center_x - 0.1, center_y - 0.05),  # left_shoulder
-            12: (center_x + 0.1, center_y - 0.05),  # right_shoulder
-            23: (center_x - 0.05, center_y + 0.05),  # left_hip
-            24: (center_x + 0.05, center_y + 0.05),  # right_hip
-            25: (center_x - 0.05, center_y + 0.15),  # left_knee
-            26: (center_x + 0.05, center_y + 0.15),  # right_knee
-            27: (center_x - 0.05, center_y + 0.25),  # left_ankle
-            28: (center_x + 0.05, center_y + 0.25),  # right_ankle
-        }
+    # 模拟身体中心Y坐标的变化（跳跃轨迹）：准备阶段、起跳阶段、落地阶段
+    center_y = np.piecewise(
+        frame_idx,
+        [frame_idx < 20, (frame_idx >= 20) & (frame_idx < 40), frame_idx >= 40],
+        [lambda i: 0.7 + i * 0.005, lambda i: 0.8 - (i - 20) * 0.02, lambda i: 0.4 + (i - 40) * 0.015]
+    )
+    center_x = 0.5
+    
+    # 主要关键点相对身体中心的位置
+    landmark_offsets = {
+        0: (0.0, -0.15),  # nose
+        11: (-0.1, -0.05),  # left_shoulder
+        12: (0.1, -0.05),  # right_shoulder
+        23: (-0.05, 0.05),  # left_hip
+        24: (0.05, 0.05),  # right_hip
+        25: (-0.05, 0.15),  # left_knee
+        26: (0.05, 0.15),  # right_knee
+        27: (-0.05, 0.25),  # left_ankle
+        28: (0.05, 0.25),  # right_ankle
+    }
+    key_indices = list(landmark_offsets)
+    
+    # 一次生成所有帧、所有关键点的噪声：主要关键点噪声较小，其余关键点散布在身体中心附近
+    noise = rng.normal(0, 0.05, (num_frames, 33, 2))
+    noise[:, key_indices] = rng.normal(0, 0.01, (num_frames, len(key_indices), 2))
+    
+    landmarks = np.zeros((num_frames, 33, 4), dtype=np.float32)
+    landmarks[:, :, 0] = center_x
+    landmarks[:, :, 1] = center_y[:, np.newaxis]
+    landmarks[:, key_indices, :2] += np.array(list(landmark_offsets.values()))
+    landmarks[:, :, :2] += noise
+    landmarks[:, :, 3] = 0.9
+    
+    return [{'landmarks': landmarks[i], 'frame_shape': (480, 640, 3)} for i in range(num_frames)]
+
+
+# 容器显示矩阵（tkhd）中顺时针旋转角度对应的矩阵前6项，定点数 1.0 = 0x10000
+_DISPLAY_MATRICES = {
+    90: (0, 0x10000, 0, -0x10000, 0, 0),
+    180: (-0x10000, 0, 0, 0, -0x10000, 0),
+    270: (0, -0x10000, 0, 0x10000, 0, 0),
+}
+
+
+def create_rotated_video(video_path, degrees, num_frames=10, width=320, height=240):
+    """
+    用PyAV写一段横屏测试视频，再改写 tkhd 中的显示矩阵，模拟手机竖屏拍摄时带旋转标记的视频
+    
+    画面左半白、右半黑、顶部一条红带，方向错误或被拉伸时与正确画面差异很大。
+    """
+    import av
+    
+    with av.open(video_path, 'w') as container:
+        stream = container.add_stream('mpeg4', rate=30)
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = 'yuv420p'
         
-        # 为所有33个关键点创建数据
-        for j in range(33):
-            if j in landmark_positions:
-                x, y = landmark_positions[j]
-                x += np.random.normal(0, 0.01)
-                y += np.random.normal(0, 0.01)
-            else:
-                x = center_x + np.random.normal(0, 0.05)
-                y = center_y + np.random.normal(0, 0.05)
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        image[:, :width // 2] = 255
+        image[:height // 4] = (255, 0, 0)
+        for _ in range(num_frames):
+            for packet in stream.encode(av.VideoFrame.from_ndarray(image, format='rgb24')):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
             
-            landmarks.append({
-                'x': x,
-                'y': y,
-                'z': 0.0,
-                'visibility': 0.9
-            })
-        
-        pose_result = {
-            'landmarks': landmarks,
-            'frame_shape': (480, 640, 3)
-        }
+    with open(video_path, 'r+b') as f:
+        data = f.read()
+        index = data.find(b'tkhd')
+        # tkhd: 版本(1) + 标志(3) + 时间/轨道/时长字段（版本1为32字节，版本0为20字节）+ 保留(8) + 层/音量等(8)
+        offset = index + 8 + (32 if data[index + 4] == 1 else 20) + 16
+        f.seek(offset)
+        f.write(struct.pack('>6i', *_DISPLAY_MATRICES[degrees]))
+
+
+def test_rotated_video():
+    """带旋转标记的视频：各种解码方式得到的帧应与OpenCV（会按显示矩阵旋转）的画面一致"""
+    print("9. 测试旋转视频解码...")
+    try:
+        import av  # noqa: F401
+    except ImportError:
+        print("   ⚠️  未安装PyAV，跳过")
+        return True
         
-        pose_results.append(pose_result)
-    
-    return pose_results
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for degrees in sorted(_DISPLAY_MATRICES):
+            video_path = os.path.join(tmp_dir, f'rotated_{degrees}.mp4')
+            create_rotated_video(video_path, degrees)
+            
+            cap = cv2.VideoCapture(video_path)
+            expected = []
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                expected.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            cap.release()
+            expected = np.asarray(expected, dtype=np.int16)
+            
+            with VideoProcessor(video_path) as processor:
+                keyframe_frames, keyframe_times = processor.extract_keyframe_samples(3)
+                results = {
+                    'extract_frames': (processor.extract_frames(), expected),
+                    'extract_sampled_frames': (processor.extract_sampled_frames(3), expected[::3]),
+                    'iter_sampled_frames': (np.asarray(list(processor.iter_sampled_frames(3))), expected[::3]),
+                    # 测试视频只有第一帧是关键帧
+                    'extract_keyframe_samples': (keyframe_frames, expected[:1]),
+                }
+                
+            for name, (frames, reference) in results.items():
+                if frames.shape != reference.shape:
+                    print(f"   ❌ 旋转{degrees}度 {name}：帧尺寸 {frames.shape}，应为 {reference.shape}")
+                    return False
+                diff = np.abs(frames - reference).mean()
+                if diff > 5:
+                    print(f"   ❌ 旋转{degrees}度 {name}：与OpenCV画面的平均差异 {diff:.1f}")
+                    return False
+                
+    print("   ✅ 旋转视频解码方向正确")
+    return True
 
 
 def test_modules():
@@ -153,7 +228,7 @@ def test_modules():
         import matplotlib
         matplotlib.use('Agg')  # 使用非交互式后端
         
-        visualizer.visualize_jump_analysis(analysis_result, save_path='outputs/test_analysis.png')
+        visualizer.visualize_jump_analysis(analysis_result, save_path='outputs/test_analysis.png', dpi=100)
         print("   ✅ 可视化图表生成成功")
     except Exception as e:
         print(f"   ❌ 可视化生成失败: {e}")
@@ -171,6 +246,9 @@ def test_modules():
         print(f"   ❌ 报告保存出错: {e}")
         return False
     
+    if not test_rotated_video():
+        return False
+    
     print("\n=== 集成测试完成 ===")
     print("✅ 所有核心功能测试通过")
     print("📁 输出文件保存在 outputs/ 目录")
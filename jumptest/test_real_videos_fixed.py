@@ -7,189 +7,201 @@
 import sys
 import os
 import json
-import base64
-from io import BytesIO
-import matplotlib
-matplotlib.use('Agg')  # 使用非交互式后端
-import matplotlib.pyplot as plt
-
-# 设置中文字体和编码
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'Helvetica', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+import string
+from concurrent.futures import ProcessPoolExecutor
 
 # 添加src目录到路径
 sys.path.append('src')
 
-from video_processor import VideoProcessor
-from pose_detector import PoseDetector
-from jump_analyzer import JumpAnalyzer
-from visualizer import JumpVisualizer
-
-
-def safe_format(value, format_str=":.1f"):
-    """安全的格式化函数，处理None值"""
-    if value is None:
-        return "N/A"
-    try:
-        return format(value, format_str)
-    except:
-        return "N/A"
-
 
-def generate_html_report(video_name, analysis_result, video_info, output_path):
-    """生成HTML报告"""
-    
-    # 创建可视化图表
-    visualizer = JumpVisualizer()
-    
-    # 生成分析图表
-    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-    fig.suptitle(f'{video_name} Jump Analysis Report', fontsize=16, fontweight='bold')
-    
-    # 绘制各个图表
-    visualizer._plot_body_center_trajectory(axes[0, 0], analysis_result)
-    visualizer._plot_joint_angles(axes[0, 1], analysis_result)
-    visualizer._plot_jump_phases(axes[0, 2], analysis_result)
-    visualizer._plot_strength_radar(axes[1, 0], analysis_result)
-    visualizer._plot_posture_analysis(axes[1, 1], analysis_result)
-    visualizer._plot_summary_metrics(axes[1, 2], analysis_result)
-    
-    plt.tight_layout()
-    
-    # 将图表转换为base64编码
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-    plt.close()
-    
-    # 准备数据
-    jump_metrics = analysis_result.get('jump_metrics', {})
-    strength_assessment = analysis_result.get('strength_assessment', {})
-    posture_analysis = analysis_result.get('posture_analysis', {})
-    jump_phases = analysis_result.get('jump_phases', {})
-    
-    # HTML模板
-    html_template = f"""
+# 报告的 <head>（含固定不变的CSS）在导入时只构建一次，生成报告时只替换视频名
+REPORT_HEAD_TEMPLATE = string.Template("""
     <!DOCTYPE html>
     <html lang="zh-CN">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{video_name} 跳跃动作分析报告</title>
+        <title>$video_name 跳跃动作分析报告</title>
         <style>
-            body {{
+            body {
                 font-family: 'Arial', 'Microsoft YaHei', sans-serif;
                 line-height: 1.6;
                 margin: 0;
                 padding: 20px;
                 background-color: #f5f5f5;
-            }}
-            .container {{
+            }
+            .container {
                 max-width: 1200px;
                 margin: 0 auto;
                 background-color: white;
                 padding: 30px;
                 border-radius: 10px;
                 box-shadow: 0 0 20px rgba(0,0,0,0.1);
-            }}
-            h1 {{
+            }
+            h1 {
                 color: #2c3e50;
                 text-align: center;
                 border-bottom: 3px solid #3498db;
                 padding-bottom: 10px;
-            }}
-            h2 {{
+            }
+            h2 {
                 color: #34495e;
                 border-left: 4px solid #3498db;
                 padding-left: 15px;
                 margin-top: 30px;
-            }}
-            .metrics-grid {{
+            }
+            .metrics-grid {
                 display: grid;
                 grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
                 gap: 20px;
                 margin: 20px 0;
-            }}
-            .metric-card {{
+            }
+            .metric-card {
                 background: #ecf0f1;
                 padding: 20px;
                 border-radius: 8px;
                 border-left: 4px solid #3498db;
-            }}
-            .metric-value {{
+            }
+            .metric-value {
                 font-size: 24px;
                 font-weight: bold;
                 color: #2c3e50;
-            }}
-            .metric-label {{
+            }
+            .metric-label {
                 color: #7f8c8d;
                 font-size: 14px;
-            }}
-            .chart-container {{
+            }
+            .chart-container {
                 text-align: center;
                 margin: 30px 0;
-            }}
-            .chart-container img {{
+            }
+            .chart-container img {
                 max-width: 100%;
                 height: auto;
                 border-radius: 8px;
                 box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-            }}
-            .score-bar {{
+            }
+            .score-bar {
                 background-color: #ecf0f1;
                 height: 20px;
                 border-radius: 10px;
                 margin: 10px 0;
                 overflow: hidden;
-            }}
-            .score-fill {{
+            }
+            .score-fill {
                 height: 100%;
                 background: linear-gradient(90deg, #e74c3c, #f39c12, #f1c40f, #2ecc71);
                 border-radius: 10px;
                 transition: width 0.3s ease;
-            }}
-            .video-info {{
+            }
+            .video-info {
                 background: #3498db;
                 color: white;
                 padding: 15px;
                 border-radius: 8px;
                 margin-bottom: 20px;
-            }}
-            .phase-timeline {{
+            }
+            .phase-timeline {
                 display: flex;
                 margin: 20px 0;
                 height: 40px;
                 border-radius: 20px;
                 overflow: hidden;
                 border: 2px solid #bdc3c7;
-            }}
-            .phase {{
+            }
+            .phase {
                 display: flex;
                 align-items: center;
                 justify-content: center;
                 color: white;
                 font-weight: bold;
                 font-size: 12px;
-            }}
-            .phase-prep {{
+            }
+            .phase-prep {
                 background-color: #3498db;
-            }}
-            .phase-takeoff {{
+            }
+            .phase-takeoff {
                 background-color: #e74c3c;
-            }}
-            .phase-landing {{
+            }
+            .phase-landing {
                 background-color: #27ae60;
-            }}
-            .error-message {{
+            }
+            .error-message {
                 background-color: #e74c3c;
                 color: white;
                 padding: 15px;
                 border-radius: 8px;
                 margin: 10px 0;
-            }}
+            }
         </style>
-    </head>
+    </head>""")
+
+
+def _import_pyplot():
+    """首次绘图时才导入 matplotlib（字体管理等初始化较慢），同时设置非交互式后端和中文字体"""
+    import matplotlib
+    matplotlib.use('Agg')  # 使用非交互式后端
+    import matplotlib.pyplot as plt
+    # 设置中文字体和编码
+    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'Helvetica', 'DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+
+def safe_format(value, format_str=":.1f"):
+    """安全的格式化函数，处理None值"""
+    if value is None:
+        return "N/A"
+    try:
+        return format(value, format_str)
+    except:
+        return "N/A"
+
+
+def generate_html_report(video_name, analysis_result, video_info, output_path, fig=None, axes=None):
+    """生成HTML报告（传入 fig/axes 时复用已有的 2x3 图表，不再每次新建）"""
+    
+    # 绘图和报告模块只在真正生成报告时导入
+    plt = _import_pyplot()
+    from visualizer import JumpVisualizer, figure_to_jpeg, html_jpeg_img, phase_durations, write_html
+    
+    # 创建可视化图表
+    visualizer = JumpVisualizer()
+    
+    # 生成分析图表，复用的图表先清空上一份报告的子图
+    owns_figure = fig is None
+    if owns_figure:
+        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    else:
+        for ax in axes.flat:
+            ax.cla()
+        # 恢复默认边距，使 tight_layout 的结果与新建图表时一致
+        fig.subplots_adjust(**{key: plt.rcParams[f'figure.subplot.{key}']
+                               for key in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    fig.suptitle(f'{video_name} Jump Analysis Report', fontsize=16, fontweight='bold')
+    
+    # 绘制各个图表
+    visualizer._plot_body_center_trajectory(axes[0, 0], analysis_result)
+    visualizer._plot_joint_angles(axes[0, 1], analysis_result)
+    visualizer._plot_jump_phases(axes[0, 2], analysis_result)
+    visualizer._plot_strength_radar(axes[1, 0], analysis_result)
+    visualizer._plot_posture_analysis(axes[1, 1], analysis_result)
+    visualizer._plot_summary_metrics(axes[1, 2], analysis_result)
+    
+    fig.tight_layout()
+    
+    # 渲染为JPEG，写HTML时再base64编码
+    chart_jpeg = figure_to_jpeg(fig, close=owns_figure)
+    
+    # 准备数据
+    jump_metrics = analysis_result.get('jump_metrics', {})
+    strength_assessment = analysis_result.get('strength_assessment', {})
+    posture_analysis = analysis_result.get('posture_analysis', {})
+    jump_phases = analysis_result.get('jump_phases', {})
+    
+    # HTML模板
+    # 按片段收集HTML，最后一次性输出，避免反复拼接越来越长的字符串
+    html_parts = [REPORT_HEAD_TEMPLATE.substitute(video_name=video_name), f"""
     <body>
         <div class="container">
             <h1>{video_name} 跳跃动作分析报告</h1>
@@ -202,21 +214,19 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
                 <p>⏱️ 时长: {video_info.get('duration', 0):.2f} 秒</p>
                 <p>🎞️ 总帧数: {video_info.get('total_frames', 'N/A')} 帧</p>
             </div>
-    """
+    """]
     
     # 添加跳跃阶段信息
     if 'error' not in jump_phases:
-        prep_duration = jump_phases.get('preparation', {}).get('end_frame', 0) - jump_phases.get('preparation', {}).get('start_frame', 0)
-        takeoff_duration = jump_phases.get('takeoff', {}).get('end_frame', 0) - jump_phases.get('takeoff', {}).get('start_frame', 0)
-        landing_duration = jump_phases.get('landing', {}).get('end_frame', 0) - jump_phases.get('landing', {}).get('start_frame', 0)
-        total_frames = prep_duration + takeoff_duration + landing_duration
+        # 三个阶段的帧数和宽度占比一次算出
+        durations = phase_durations(jump_phases)
+        total_frames = durations.sum()
         
         if total_frames > 0:
-            prep_width = (prep_duration / total_frames) * 100
-            takeoff_width = (takeoff_duration / total_frames) * 100
-            landing_width = (landing_duration / total_frames) * 100
+            prep_duration, takeoff_duration, landing_duration = durations
+            prep_width, takeoff_width, landing_width = durations / total_frames * 100
             
-            html_template += f"""
+            html_parts.append(f"""
             <h2>🎯 跳跃阶段划分</h2>
             <div class="phase-timeline">
                 <div class="phase phase-prep" style="width: {prep_width}%">
@@ -229,11 +239,11 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
                     落地阶段<br>{landing_duration} 帧
                 </div>
             </div>
-            """
+            """)
     
     # 添加跳跃指标
     if 'error' not in jump_metrics:
-        html_template += f"""
+        html_parts.append(f"""
             <h2>📊 跳跃指标</h2>
             <div class="metrics-grid">
                 <div class="metric-card">
@@ -257,14 +267,14 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
                     <div class="metric-label">总时间 (秒)</div>
                 </div>
             </div>
-        """
+        """)
     else:
-        html_template += f"""
+        html_parts.append(f"""
             <h2>📊 跳跃指标</h2>
             <div class="error-message">
                 ❌ 跳跃指标计算失败: {jump_metrics.get('error', '未知错误')}
             </div>
-        """
+        """)
     
     # 添加力量评估
     if 'error' not in strength_assessment:
@@ -273,7 +283,7 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
         core_strength = strength_assessment.get('core_strength', 0)
         coordination = strength_assessment.get('coordination', 0)
         
-        html_template += f"""
+        html_parts.append(f"""
             <h2>💪 力量评估</h2>
             <div class="metrics-grid">
                 <div class="metric-card">
@@ -305,21 +315,21 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
                     </div>
                 </div>
             </div>
-        """
+        """)
     else:
-        html_template += f"""
+        html_parts.append(f"""
             <h2>💪 力量评估</h2>
             <div class="error-message">
                 ❌ 力量评估失败: {strength_assessment.get('error', '未知错误')}
             </div>
-        """
+        """)
     
     # 添加姿态分析
     if 'error' not in posture_analysis:
-        html_template += f"""
+        html_parts.append(f"""
             <h2>🤸 姿态分析</h2>
             <div class="metrics-grid">
-        """
+        """)
         
         phases = [
             ('preparation_posture', '准备阶段'),
@@ -338,7 +348,7 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
                 knee_angle_str = f"{knee_angle:.1f}°" if knee_angle is not None else "N/A"
                 hip_angle_str = f"{hip_angle:.1f}°" if hip_angle is not None else "N/A"
                 
-                html_template += f"""
+                html_parts.append(f"""
                 <div class="metric-card">
                     <h4>{phase_name}</h4>
                     <p><strong>稳定性:</strong> {stability:.3f}</p>
@@ -348,27 +358,29 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
                     <p><strong>平均膝关节角度:</strong> {knee_angle_str}</p>
                     <p><strong>平均髋关节角度:</strong> {hip_angle_str}</p>
                 </div>
-                """
+                """)
         
-        html_template += "</div>"
+        html_parts.append("</div>")
     else:
-        html_template += f"""
+        html_parts.append(f"""
             <h2>🤸 姿态分析</h2>
             <div class="error-message">
                 ❌ 姿态分析失败: {posture_analysis.get('error', '未知错误')}
             </div>
-        """
+        """)
     
     # 添加可视化图表
-    html_template += f"""
+    html_parts.append(f"""
             <h2>📈 分析图表</h2>
             <div class="chart-container">
-                <img src="data:image/png;base64,{image_base64}" alt="跳跃分析图表">
+                """)
+    html_parts.extend(html_jpeg_img(chart_jpeg, '跳跃分析图表'))
+    html_parts.append(f"""
             </div>
             
             <h2>📝 分析建议</h2>
             <div class="metric-card">
-    """
+    """)
     
     # 添加基于分析结果的建议
     if 'error' not in strength_assessment:
@@ -399,15 +411,15 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
             suggestions.append("🔸 各项指标表现良好，继续保持当前训练强度")
         
         for suggestion in suggestions:
-            html_template += f"<p>{suggestion}</p>"
+            html_parts.append(f"<p>{suggestion}</p>")
     else:
-        html_template += "<p>🔸 由于分析数据不足，无法提供具体建议。建议使用更清晰的跳跃视频重新分析。</p>"
+        html_parts.append("<p>🔸 由于分析数据不足，无法提供具体建议。建议使用更清晰的跳跃视频重新分析。</p>")
     
     # 获取当前时间
     import datetime
     current_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    html_template += f"""
+    html_parts.append(f"""
             </div>
             
             <div style="text-align: center; margin-top: 40px; color: #7f8c8d; font-size: 14px;">
@@ -417,17 +429,21 @@ def generate_html_report(video_name, analysis_result, video_info, output_path):
         </div>
     </body>
     </html>
-    """
+    """)
     
     # 保存HTML文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_template)
+    write_html(output_path, html_parts)
     
     return True
 
 
 def analyze_video(video_path):
     """分析单个视频"""
+    # 视频、姿态检测和分析模块（含mediapipe）只在真正分析视频时导入
+    from video_processor import VideoProcessor
+    from pose_detector import PoseDetector
+    from jump_analyzer import JumpAnalyzer
+    
     print(f"开始分析视频: {video_path}")
     
     # 1. 加载视频
@@ -449,31 +465,25 @@ def analyze_video(video_path):
     
     print(f"   提取帧: 从{total_frames}帧中选择{len(selected_frames)}帧进行分析")
     
-    frames = []
-    for i in selected_frames:
-        processor.cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-        ret, frame = processor.cap.read()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(frame_rgb)
-    
-    print(f"   成功提取 {len(frames)} 帧")
-    
-    # 3. 姿态检测
+    # 3. 姿态检测：后台线程顺序解码采样帧，当前线程逐帧检测并把结果交给分析器累积，不保留姿态结果列表
+    # 帧先缩小到长边640像素：关键点是归一化坐标，不受缩放影响
     print("   进行姿态检测...")
     detector = PoseDetector()
-    pose_results = detector.detect_pose_sequence(frames)
+    analyzer = JumpAnalyzer(fps=fps / frame_step)  # 调整帧率
+    for pose_result in detector.iter_pose_stream(processor.iter_sampled_frames(frame_step, target_size=processor.scaled_size())):
+        analyzer.update(pose_result)
     
-    valid_poses = sum(1 for result in pose_results if result is not None)
-    print(f"   检测到有效姿态: {valid_poses}/{len(pose_results)} 帧")
+    print(f"   成功提取 {analyzer.frame_count} 帧")
+    
+    valid_poses = analyzer.valid_frames
+    print(f"   检测到有效姿态: {valid_poses}/{analyzer.frame_count} 帧")
     
     if valid_poses < 5:
         print("   ⚠️ 有效姿态数量太少，可能影响分析结果")
     
     # 4. 跳跃分析
     print("   进行跳跃分析...")
-    analyzer = JumpAnalyzer(fps=fps / frame_step)  # 调整帧率
-    analysis_result = analyzer.analyze_jump_sequence(pose_results)
+    analysis_result = analyzer.finalize()
     
     processor.release()
     
@@ -490,6 +500,7 @@ def main():
     # 测试视频列表
     test_videos = ['M1.mp4', 'M2.mp4']
     
+    video_paths = {}
     for video_name in test_videos:
         video_path = os.path.join('test_videos', video_name)
         
@@ -497,45 +508,64 @@ def main():
             print(f"❌ 视频文件不存在: {video_path}")
             continue
         
-        print(f"\n{'='*50}")
-        print(f"分析视频: {video_name}")
-        print(f"{'='*50}")
+        video_paths[video_name] = video_path
+    
+    if not video_paths:
+        print("❌ 没有可分析的视频")
+        return
+    
+    # 各视频互不依赖，在独立进程中并行分析（每个进程各自创建检测器）；
+    # 报告仍在主进程中按顺序生成，共用一个图表，全部完成后再关闭
+    with ProcessPoolExecutor(max_workers=max(1, len(video_paths))) as executor:
+        futures = {video_name: executor.submit(analyze_video, video_path)
+                   for video_name, video_path in video_paths.items()}
         
-        try:
-            # 分析视频
-            analysis_result, video_info = analyze_video(video_path)
-            
-            if analysis_result is None:
-                print(f"❌ 视频 {video_name} 分析失败")
-                continue
-            
-            # 生成HTML报告
-            html_output_path = os.path.join('outputs', f'{video_name}_analysis_report.html')
-            
-            print(f"生成HTML报告: {html_output_path}")
-            
-            success = generate_html_report(video_name, analysis_result, video_info, html_output_path)
+        plt = _import_pyplot()
+        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+        
+        for video_name, future in futures.items():
+            print(f"\n{'='*50}")
+            print(f"分析视频: {video_name}")
+            print(f"{'='*50}")
             
-            if success:
-                print(f"✅ {video_name} 分析完成，报告已保存")
+            try:
+                # 分析视频
+                analysis_result, video_info = future.result()
+                
+                if analysis_result is None:
+                    print(f"❌ 视频 {video_name} 分析失败")
+                    continue
                 
-                # 显示简要结果
-                jump_metrics = analysis_result.get('jump_metrics', {})
-                strength_assessment = analysis_result.get('strength_assessment', {})
+                # 生成HTML报告
+                html_output_path = os.path.join('outputs', f'{video_name}_analysis_report.html')
                 
-                if 'error' not in jump_metrics:
-                    print(f"   跳跃高度: {jump_metrics.get('jump_height_pixels', 0):.1f} 像素")
-                    print(f"   起跳时间: {jump_metrics.get('takeoff_duration', 0):.3f} 秒")
+                print(f"生成HTML报告: {html_output_path}")
                 
-                if 'error' not in strength_assessment:
-                    print(f"   综合得分: {strength_assessment.get('overall_score', 0):.3f}")
-            else:
-                print(f"❌ {video_name} 报告生成失败")
+                success = generate_html_report(video_name, analysis_result, video_info, html_output_path,
+                                               fig=fig, axes=axes)
                 
-        except Exception as e:
-            print(f"❌ 分析视频 {video_name} 时发生错误: {e}")
-            import traceback
-            traceback.print_exc()
+                if success:
+                    print(f"✅ {video_name} 分析完成，报告已保存")
+                    
+                    # 显示简要结果
+                    jump_metrics = analysis_result.get('jump_metrics', {})
+                    strength_assessment = analysis_result.get('strength_assessment', {})
+                    
+                    if 'error' not in jump_metrics:
+                        print(f"   跳跃高度: {jump_metrics.get('jump_height_pixels', 0):.1f} 像素")
+                        print(f"   起跳时间: {jump_metrics.get('takeoff_duration', 0):.3f} 秒")
+                    
+                    if 'error' not in strength_assessment:
+                        print(f"   综合得分: {strength_assessment.get('overall_score', 0):.3f}")
+                else:
+                    print(f"❌ {video_name} 报告生成失败")
+                    
+            except Exception as e:
+                print(f"❌ 分析视频 {video_name} 时发生错误: {e}")
+                import traceback
+                traceback.print_exc()
+        
+        plt.close(fig)
     
     print(f"\n{'='*50}")
     print("🎉 所有视频分析完成！")
@@ -544,8 +574,4 @@ def main():
 
 
 if __name__ == "__main__":
-    # 导入必要的库
-    import cv2
-    import datetime
-    
     main()
\ No newline at end of file
@@ -3,6 +3,7 @@ from flask_cors import CORS
 import os
 import cv2
 import json
+import threading
 from pose_detector import RunningPoseDetector
 from gait_analyzer import GaitAnalyzer
 import matplotlib.pyplot as plt
@@ -11,10 +12,13 @@ matplotlib.use('Agg')  # 设置为非交互式后端
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
-import numpy as np
-import base64
 from io import BytesIO
 
+# 所有图表复用同一个Figure和输出缓冲区，不再为每个图表重新创建；Flask在多个线程中处理请求，绘图时加锁
+_CHART_LOCK = threading.Lock()
+_CHART_FIG, _CHART_AX = plt.subplots(figsize=(10, 6))
+_CHART_BUFFER = BytesIO()
+
 app = Flask(__name__)
 CORS(app)
 
@@ -26,9 +30,15 @@ os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['RESULTS_FOLDER'] = RESULTS_FOLDER
+# 上传文件按客户端文件名保存，重新上传同名视频会覆盖旧文件，因此不设缓存时长，
+# 浏览器每次都用ETag向服务器确认，内容未变时只返回304
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+
+# 保存上传视频时每次读写的块大小，大块写入减少系统调用次数
+UPLOAD_BUFFER_SIZE = 1 << 20
 
-# 初始化分析器
-pose_detector = RunningPoseDetector()
+# 初始化分析器：每3帧完整检测一次姿态，中间帧用光流跟踪关键点
+pose_detector = RunningPoseDetector(detect_interval=3)
 gait_analyzer = GaitAnalyzer()
 
 @app.route('/')
@@ -47,7 +57,7 @@ def upload_video():
     if file:
         filename = file.filename
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        file.save(filepath, buffer_size=UPLOAD_BUFFER_SIZE)
         
         # 分析视频
         try:
@@ -58,16 +68,12 @@ def upload_video():
 
 def analyze_video(video_path, filename):
     """分析视频文件"""
-    # 检测姿态
-    frame_data = pose_detector.process_video(video_path)
+    # 逐帧检测姿态并直接交给分析器，一次完成步态和姿态分析
+    frame_count, gait_data, form_data = gait_analyzer.analyze_stream(pose_detector.iter_video(video_path))
     
-    if not frame_data:
+    if not frame_count:
         return {'error': '无法检测到人体姿态'}
     
-    # 分析步态
-    gait_data = gait_analyzer.analyze_gait_cycle(frame_data)
-    form_data = gait_analyzer.analyze_running_form(frame_data)
-    
     # 生成建议
     recommendations = gait_analyzer.generate_recommendations(gait_data, form_data)
     
@@ -82,61 +88,57 @@ def analyze_video(video_path, filename):
             'total_steps': gait_data['total_steps']
         },
         'form_analysis': {
-            'avg_knee_angle': round(np.mean(form_data['knee_angles']), 1) if form_data['knee_angles'] else 0,
-            'avg_forward_lean': round(np.mean(form_data['forward_lean']), 1) if form_data['forward_lean'] else 0
+            'avg_knee_angle': round(form_data['stats']['knee_angles']['mean'], 1),
+            'avg_forward_lean': round(form_data['stats']['forward_lean']['mean'], 1)
         },
         'recommendations': recommendations,
         'charts': charts
     }
 
+def _chart_svg():
+    """把共享Figure保存为SVG文本，输出缓冲区清空后复用"""
+    _CHART_BUFFER.seek(0)
+    _CHART_BUFFER.truncate()
+    _CHART_FIG.savefig(_CHART_BUFFER, format='svg', bbox_inches='tight')
+    return _CHART_BUFFER.getvalue().decode('utf-8')
+
 def generate_charts(gait_data, form_data):
     """生成分析图表"""
     charts = {}
+    ax = _CHART_AX
     
-    # 步频分析图
-    if gait_data['left_foot_strikes'] and gait_data['right_foot_strikes']:
-        plt.figure(figsize=(10, 6))
-        plt.plot(gait_data['left_foot_strikes'], [1] * len(gait_data['left_foot_strikes']), 'bo', label='Left Foot Strike')
-        plt.plot(gait_data['right_foot_strikes'], [2] * len(gait_data['right_foot_strikes']), 'ro', label='Right Foot Strike')
-        plt.xlabel('Time (seconds)')
-        plt.ylabel('Foot')
-        plt.title('Gait Cycle Analysis')
-        plt.legend()
-        plt.grid(True)
-        plt.yticks([1, 2], ['Left', 'Right'])
-        
-        # 保存图表为base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        chart_data = buffer.getvalue()
-        buffer.close()
-        plt.close()
-        
-        charts['gait_cycle'] = base64.b64encode(chart_data).decode()
-    
-    # 膝关节角度变化图
-    if form_data['knee_angles']:
-        plt.figure(figsize=(10, 6))
-        plt.plot(form_data['knee_angles'], 'b-', linewidth=2)
-        plt.xlabel('Frame Number')
-        plt.ylabel('Knee Angle (degrees)')
-        plt.title('Knee Angle Changes')
-        plt.grid(True, alpha=0.3)
-        
-        # 添加理想范围
-        plt.axhline(y=140, color='r', linestyle='--', alpha=0.7, label='Min Recommended Angle')
-        plt.axhline(y=170, color='r', linestyle='--', alpha=0.7, label='Max Recommended Angle')
-        plt.legend()
-        
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        chart_data = buffer.getvalue()
-        buffer.close()
-        plt.close()
+    with _CHART_LOCK:
+        # 步频分析图
+        if gait_data['left_foot_strikes'] and gait_data['right_foot_strikes']:
+            ax.clear()
+            ax.plot(gait_data['left_foot_strikes'], [1] * len(gait_data['left_foot_strikes']), 'bo', label='Left Foot Strike')
+            ax.plot(gait_data['right_foot_strikes'], [2] * len(gait_data['right_foot_strikes']), 'ro', label='Right Foot Strike')
+            ax.set_xlabel('Time (seconds)')
+            ax.set_ylabel('Foot')
+            ax.set_title('Gait Cycle Analysis')
+            ax.legend()
+            ax.grid(True)
+            ax.set_yticks([1, 2], ['Left', 'Right'])
+            
+            # 保存为SVG文本，前端直接插入页面，不再经过PNG光栅化和base64编码
+            charts['gait_cycle'] = _chart_svg()
         
-        charts['knee_angles'] = base64.b64encode(chart_data).decode()
+        # 膝关节角度变化图：直接把角度数组交给matplotlib
+        knee_angles = form_data['knee_angles']
+        if knee_angles.size:
+            ax.clear()
+            ax.plot(knee_angles, 'b-', linewidth=2)
+            ax.set_xlabel('Frame Number')
+            ax.set_ylabel('Knee Angle (degrees)')
+            ax.set_title('Knee Angle Changes')
+            ax.grid(True, alpha=0.3)
+            
+            # 添加理想范围
+            ax.axhline(y=140, color='r', linestyle='--', alpha=0.7, label='Min Recommended Angle')
+            ax.axhline(y=170, color='r', linestyle='--', alpha=0.7, label='Max Recommended Angle')
+            ax.legend()
+            
+            charts['knee_angles'] = _chart_svg()
     
     return charts
 
@@ -1,173 +1,248 @@
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Tuple
-from scipy.signal import find_peaks
-import matplotlib.pyplot as plt
+from typing import List, Dict, Tuple, Iterable, Optional
+from scipy.signal import find_peaks, savgol_filter
+from gait_numerics import NUMBA_AVAILABLE, MIN_NORM, joint_angles, forward_lean
+
+# MediaPipe Pose 关键点数量
+NUM_LANDMARKS = 33
+
 
 class GaitAnalyzer:
+    # 步态分析用到的关键点名称及其MediaPipe索引，只在类定义时构建一次
+    KEY_POINT_NAMES = ('left_ankle', 'right_ankle', 'left_knee', 'right_knee',
+                       'left_hip', 'right_hip', 'left_shoulder', 'right_shoulder')
+    KEY_POINT_IDS = np.array([27, 28, 25, 26, 23, 24, 11, 12])
+    _KEY_POINTS = tuple(zip(KEY_POINT_NAMES, KEY_POINT_IDS.tolist()))
+    
     def __init__(self):
         self.foot_strike_threshold = 0.02  # 脚部着地检测阈值
         self.min_step_duration = 0.3  # 最小步长持续时间(秒)
+        self.smoothing_window = 0.7  # 脚踝轨迹Savitzky-Golay平滑窗口(秒)
+        self.outlier_zscore = 3.0  # 脚踝位置z分数超过该值视为异常点
+        self.strike_prominence = 0.01  # 着地峰值的最小突出度（归一化坐标）
         
-    def analyze_gait_cycle(self, frame_data: List[Dict]) -> Dict:
-        """分析步态周期"""
-        timestamps = [frame['timestamp'] for frame in frame_data]
+    def analyze_stream(self, frames: Iterable[Dict]) -> Tuple[int, Optional[Dict], Optional[Dict]]:
+        """
+        边接收逐帧姿态数据边写入预分配数组，一次完成步态周期和跑步姿态分析
         
-        # 提取左右脚的垂直位置
-        left_foot_y = []
-        right_foot_y = []
+        Args:
+            frames: 逐帧姿态数据（如 RunningPoseDetector.iter_video 的产出），只遍历一次
+            
+        Returns:
+            (帧数, 步态数据, 姿态数据)，没有任何帧时后两项为None
+        """
+        capacity = 256
+        timestamps = np.empty(capacity, dtype=np.float64)
+        landmarks = np.full((capacity, NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+        count = 0
         
-        for frame in frame_data:
-            landmarks = frame['landmarks']
-            key_points = self._extract_key_points(landmarks)
+        for frame in frames:
+            if count == capacity:
+                # 容量不足时按倍数扩容，均摊后每帧只复制常数次
+                capacity *= 2
+                timestamps = np.concatenate([timestamps, np.empty(count, dtype=np.float64)])
+                landmarks = np.concatenate([landmarks, np.full((count, NUM_LANDMARKS, 4), np.nan, dtype=np.float32)])
+            timestamps[count] = frame['timestamp']
+            self._fill_landmarks(landmarks[count], frame)
+            count += 1
+            
+        if count == 0:
+            return 0, None, None
             
-            left_foot_y.append(key_points.get('left_ankle', {}).get('y', 0))
-            right_foot_y.append(key_points.get('right_ankle', {}).get('y', 0))
+        landmarks = landmarks[:count]
+        return count, self._gait_from_arrays(timestamps[:count], landmarks), self._form_from_array(landmarks)
+    
+    def analyze_gait_cycle(self, frame_data: List[Dict]) -> Dict:
+        """分析步态周期"""
+        timestamps = np.fromiter((frame['timestamp'] for frame in frame_data), dtype=np.float64, count=len(frame_data))
+        return self._gait_from_arrays(timestamps, self._landmark_array(frame_data))
+    
+    def _gait_from_arrays(self, timestamps: np.ndarray, landmarks: np.ndarray) -> Dict:
+        """根据时间戳 (N,) 和关键点数组 (N, 33, 4) 分析步态周期"""
+        # 提取左右脚踝的垂直位置序列（缺失的关键点记为0）和髋部中心的水平位置序列
+        left_foot_y = np.nan_to_num(landmarks[:, 27, 1])
+        right_foot_y = np.nan_to_num(landmarks[:, 28, 1])
+        hip_center_x = np.add(landmarks[:, 23, 0], landmarks[:, 24, 0], dtype=np.float64) / 2
         
         # 检测脚部着地时刻
-        left_strikes = self._detect_foot_strikes(left_foot_y, timestamps)
-        right_strikes = self._detect_foot_strikes(right_foot_y, timestamps)
+        left_strikes, left_prominences = self._detect_foot_strikes(left_foot_y, timestamps)
+        right_strikes, right_prominences = self._detect_foot_strikes(right_foot_y, timestamps)
         
         # 计算步频和步幅
         cadence = self._calculate_cadence(left_strikes, right_strikes)
-        stride_length = self._calculate_stride_length(frame_data)
+        stride_length = self._calculate_stride_length(hip_center_x)
         
         return {
             'cadence': cadence,
             'stride_length': stride_length,
             'left_foot_strikes': left_strikes,
             'right_foot_strikes': right_strikes,
+            'left_strike_prominences': left_prominences,
+            'right_strike_prominences': right_prominences,
             'total_steps': len(left_strikes) + len(right_strikes)
         }
     
     def _extract_key_points(self, landmarks: List[Dict]) -> Dict:
-        """提取关键身体部位的坐标"""
-        key_points = {}
-        
-        landmark_indices = {
-            'left_ankle': 27,
-            'right_ankle': 28,
-            'left_knee': 25,
-            'right_knee': 26,
-            'left_hip': 23,
-            'right_hip': 24,
-            'left_shoulder': 11,
-            'right_shoulder': 12
-        }
-        
-        for name, idx in landmark_indices.items():
-            if idx < len(landmarks):
-                key_points[name] = {
-                    'x': landmarks[idx]['x'],
-                    'y': landmarks[idx]['y'],
-                    'z': landmarks[idx]['z']
-                }
+        """
+        提取关键身体部位的坐标（兼容旧接口，分析流程直接对 _landmark_array 的结果切片）
         
-        return key_points
+        landmarks 为 (33, 4) 关键点数组时直接返回按 KEY_POINT_NAMES 顺序排列的 (K, 3) 坐标数组
+        """
+        if isinstance(landmarks, np.ndarray):
+            return landmarks[self.KEY_POINT_IDS, :3]
+            
+        count = len(landmarks)
+        return {name: {'x': landmarks[idx]['x'], 'y': landmarks[idx]['y'], 'z': landmarks[idx]['z']}
+                for name, idx in self._KEY_POINTS if idx < count}
+    
+    def _landmark_array(self, frame_data: List[Dict]) -> np.ndarray:
+        """把各帧关键点堆叠为 (N, 33, 4) 的 float32 数组（x, y, z, visibility），缺失的关键点为NaN"""
+        array = np.full((len(frame_data), NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+        for i, frame in enumerate(frame_data):
+            self._fill_landmarks(array[i], frame)
+        return array
     
-    def _detect_foot_strikes(self, foot_y: List[float], timestamps: List[float]) -> List[float]:
-        """检测脚部着地时刻"""
-        foot_y = np.array(foot_y)
+    def _fill_landmarks(self, row: np.ndarray, frame: Dict) -> None:
+        """把一帧的关键点写入 (33, 4) 的数组行，row 需预先填充NaN"""
+        points = frame.get('array')
+        if points is None:
+            # 没有数组的旧格式数据从关键点字典转换
+            points = [[lm['x'], lm['y'], lm['z'], lm['visibility']] for lm in frame['landmarks']]
+        if len(points):
+            row[:len(points)] = points
+    
+    def _detect_foot_strikes(self, foot_y: np.ndarray, timestamps: np.ndarray) -> Tuple[List[float], List[float]]:
+        """
+        检测脚部着地时刻：剔除异常点并做Savitzky-Golay平滑后，按最小步长间隔和突出度寻找峰值
+        
+        Returns:
+            (着地时刻列表, 对应峰值的突出度列表)
+        """
+        if len(foot_y) == 0:
+            return [], []
+            
+        # 按实际帧间隔估算帧率，时间戳不足时按30fps处理
+        fps = 30.0
+        if len(timestamps) > 1:
+            frame_interval = np.median(np.diff(timestamps))
+            if frame_interval > 0:
+                fps = 1.0 / frame_interval
+        
+        # z分数过大的点（检测失败、关键点缺失记为0等）替换为均值
+        foot_y = np.asarray(foot_y, dtype=np.float64)
+        std = foot_y.std()
+        if std > 0:
+            foot_y = np.where(np.abs(foot_y - foot_y.mean()) > self.outlier_zscore * std, foot_y.mean(), foot_y)
+        
+        # 窗口长度取奇数，且不超过序列长度
+        window = min(int(self.smoothing_window * fps) | 1, len(foot_y) - (1 - len(foot_y) % 2))
+        if window > 2:
+            foot_y = savgol_filter(foot_y, window_length=window, polyorder=2)
         
         # 找到局部最大值（脚部最低点，因为y坐标系统）
-        peaks, _ = find_peaks(foot_y, distance=int(self.min_step_duration * 30))  # 假设30fps
+        peaks, properties = find_peaks(foot_y, distance=max(1, int(self.min_step_duration * fps)),
+                                       prominence=self.strike_prominence)
         
-        strike_times = [timestamps[i] for i in peaks]
-        return strike_times
+        strike_times = timestamps[peaks].tolist()
+        return strike_times, properties['prominences'].tolist()
     
     def _calculate_cadence(self, left_strikes: List[float], right_strikes: List[float]) -> float:
         """计算步频 (步数/分钟)"""
         if not left_strikes and not right_strikes:
             return 0
         
-        all_strikes = sorted(left_strikes + right_strikes)
-        if len(all_strikes) < 2:
+        total_steps = len(left_strikes) + len(right_strikes)
+        if total_steps < 2:
             return 0
         
-        total_time = all_strikes[-1] - all_strikes[0]
-        total_steps = len(all_strikes)
+        # 两侧着地时刻各自已按时间排序，总时长只取决于两侧的首尾，不需要合并排序
+        strikes = [side for side in (left_strikes, right_strikes) if side]
+        total_time = max(side[-1] for side in strikes) - min(side[0] for side in strikes)
         
         # 步频 = 步数/分钟
         cadence = (total_steps / total_time) * 60
         return cadence
     
-    def _calculate_stride_length(self, frame_data: List[Dict]) -> float:
-        """计算步幅（基于身体移动距离的估算）"""
-        if len(frame_data) < 2:
-            return 0
-        
-        # 使用髋部中心点来估算前进距离
-        hip_positions = []
+    def _calculate_stride_length(self, hip_center_x: np.ndarray) -> float:
+        """计算步幅（基于身体移动距离的估算），hip_center_x 为每帧髋部中心的水平坐标，缺失为NaN"""
+        # 使用髋部中心点来估算前进距离，只需要第一帧和最后一帧有髋部关键点的数据
+        hip_x = hip_center_x[~np.isnan(hip_center_x)]
         
-        for frame in frame_data:
-            landmarks = frame['landmarks']
-            key_points = self._extract_key_points(landmarks)
-            
-            left_hip = key_points.get('left_hip', {})
-            right_hip = key_points.get('right_hip', {})
-            
-            if left_hip and right_hip:
-                center_x = (left_hip['x'] + right_hip['x']) / 2
-                hip_positions.append(center_x)
-        
-        if len(hip_positions) < 2:
+        if len(hip_x) < 2:
             return 0
         
         # 计算总的水平移动距离
-        total_distance = abs(hip_positions[-1] - hip_positions[0])
+        total_distance = abs(float(hip_x[-1]) - float(hip_x[0]))
         return total_distance
     
     def analyze_running_form(self, frame_data: List[Dict]) -> Dict:
-        """分析跑步姿态"""
-        form_metrics = {
-            'knee_angles': [],
-            'hip_angles': [],
-            'ankle_angles': [],
-            'forward_lean': [],
-            'arm_swing': []
-        }
+        """分析跑步姿态，各项指标以 float32 数组返回，绘图和统计直接使用数组"""
+        return self._form_from_array(self._landmark_array(frame_data))
+    
+    def _form_from_array(self, landmarks: np.ndarray) -> Dict:
+        """根据关键点数组 (N, 33, 4) 分析跑步姿态"""
+        # 计算膝关节角度（左髋-左膝-左踝），只统计三个关键点都存在的帧
+        has_knee = ~np.isnan(landmarks[:, [23, 25, 27], 0]).any(axis=1)
+        # 计算身体前倾角度（左肩-左髋）
+        has_lean = ~np.isnan(landmarks[:, [11, 23], 0]).any(axis=1)
         
-        for frame in frame_data:
-            landmarks = frame['landmarks']
-            key_points = self._extract_key_points(landmarks)
-            
-            # 计算膝关节角度
-            if all(k in key_points for k in ['left_hip', 'left_knee', 'left_ankle']):
-                knee_angle = self._calculate_angle(
-                    key_points['left_hip'],
-                    key_points['left_knee'],
-                    key_points['left_ankle']
-                )
-                form_metrics['knee_angles'].append(knee_angle)
-            
-            # 计算身体前倾角度
-            if all(k in key_points for k in ['left_shoulder', 'left_hip']):
-                lean_angle = self._calculate_forward_lean(
-                    key_points['left_shoulder'],
-                    key_points['left_hip']
-                )
-                form_metrics['forward_lean'].append(lean_angle)
-        
-        return form_metrics
+        if NUMBA_AVAILABLE:
+            # 编译后的内核按帧并行一次算完所有帧，再筛选关键点齐全的帧
+            knee_angles = joint_angles(landmarks, 23, 25, 27)[has_knee]
+            lean_angles = forward_lean(landmarks, 11, 23)[has_lean]
+        else:
+            knee_points = landmarks[has_knee]
+            knee_angles = self._batch_angle(knee_points[:, 23, :2], knee_points[:, 25, :2], knee_points[:, 27, :2])
+            lean_points = landmarks[has_lean]
+            lean_angles = self._batch_forward_lean(lean_points[:, 11, :2], lean_points[:, 23, :2])
+        
+        # 关键点重合的退化帧角度为NaN，不计入结果和统计
+        knee_angles = knee_angles[~np.isnan(knee_angles)].astype(np.float32)
+        lean_angles = lean_angles[~np.isnan(lean_angles)].astype(np.float32)
+        
+        return {
+            'knee_angles': knee_angles,
+            'hip_angles': np.empty(0, dtype=np.float32),
+            'ankle_angles': np.empty(0, dtype=np.float32),
+            'forward_lean': lean_angles,
+            'arm_swing': np.empty(0, dtype=np.float32),
+            # 均值和范围只算一次，建议生成和结果输出直接读取
+            'stats': {
+                'knee_angles': self._angle_stats(knee_angles),
+                'forward_lean': self._angle_stats(lean_angles)
+            }
+        }
     
-    def _calculate_angle(self, p1: Dict, p2: Dict, p3: Dict) -> float:
-        """计算三点之间的角度"""
-        v1 = np.array([p1['x'] - p2['x'], p1['y'] - p2['y']])
-        v2 = np.array([p3['x'] - p2['x'], p3['y'] - p2['y']])
-        
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
-        return np.degrees(angle)
+    def _angle_stats(self, values: np.ndarray) -> Dict:
+        """计算角度序列的均值、最小值、最大值和有效值数量（忽略NaN），没有有效值时均为0"""
+        values = np.asarray(values, dtype=np.float32)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return {'mean': 0.0, 'min': 0.0, 'max': 0.0, 'count': 0}
+        return {
+            'mean': float(values.mean()),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'count': int(values.size)
+        }
     
-    def _calculate_forward_lean(self, shoulder: Dict, hip: Dict) -> float:
-        """计算身体前倾角度"""
-        # 计算肩膀到髋部的向量与垂直线的夹角
-        vertical_vector = np.array([0, 1])
-        body_vector = np.array([hip['x'] - shoulder['x'], hip['y'] - shoulder['y']])
-        
-        cos_angle = np.dot(vertical_vector, body_vector) / (np.linalg.norm(vertical_vector) * np.linalg.norm(body_vector))
-        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
-        return np.degrees(angle)
+    def _batch_angle(self, p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> np.ndarray:
+        """逐行计算 (N, 2) 坐标数组中以 p2 为顶点的三点夹角（度，按float64计算），关键点重合时为NaN"""
+        v1 = np.subtract(p1, p2, dtype=np.float64)
+        v2 = np.subtract(p3, p2, dtype=np.float64)
+        norm = np.hypot(v1[:, 0], v1[:, 1]) * np.hypot(v2[:, 0], v2[:, 1])
+        valid = norm > MIN_NORM
+        cos_angle = np.where(valid, (v1[:, 0] * v2[:, 0] + v1[:, 1] * v2[:, 1]) / np.maximum(norm, MIN_NORM), np.nan)
+        return np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+    
+    def _batch_forward_lean(self, shoulder: np.ndarray, hip: np.ndarray) -> np.ndarray:
+        """逐行计算肩膀到髋部的向量与垂直线的夹角（度），(N, 2) 坐标数组输入，关键点重合时为NaN"""
+        # 垂直向量为 (0, 1)，点积即为向量的y分量
+        body = np.subtract(hip, shoulder, dtype=np.float64)
+        norm = np.hypot(body[:, 0], body[:, 1])
+        valid = norm > MIN_NORM
+        cos_angle = np.where(valid, body[:, 1] / np.maximum(norm, MIN_NORM), np.nan)
+        return np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
     
     def generate_recommendations(self, gait_data: Dict, form_data: Dict) -> List[str]:
         """生成跑步建议"""
@@ -180,19 +255,21 @@ class GaitAnalyzer:
         elif cadence > 200:
             recommendations.append("步频过高，建议适当降低步频，保持在160-180步/分钟范围内")
         
+        # 没有预先计算的统计量时（如外部传入的数据）按角度序列计算
+        stats = form_data.get('stats') or {name: self._angle_stats(form_data.get(name, ()))
+                                           for name in ('knee_angles', 'forward_lean')}
+        
         # 膝关节角度建议
-        knee_angles = form_data.get('knee_angles', [])
-        if knee_angles:
-            avg_knee_angle = np.mean(knee_angles)
+        if stats['knee_angles']['count']:
+            avg_knee_angle = stats['knee_angles']['mean']
             if avg_knee_angle < 140:
                 recommendations.append("膝关节弯曲过度，建议保持更自然的步态")
             elif avg_knee_angle > 170:
                 recommendations.append("膝关节过于僵直，建议适当增加膝关节弯曲")
         
         # 身体前倾建议
-        forward_lean = form_data.get('forward_lean', [])
-        if forward_lean:
-            avg_lean = np.mean(forward_lean)
+        if stats['forward_lean']['count']:
+            avg_lean = stats['forward_lean']['mean']
             if avg_lean > 15:
                 recommendations.append("身体前倾过度，建议保持更直立的姿态")
             elif avg_lean < 5:
@@ -0,0 +1,79 @@
+"""
+步态分析中逐帧的角度计算内核
+
+安装了Numba时编译为按帧并行、释放GIL的本地代码；未安装时 NUMBA_AVAILABLE 为False，
+GaitAnalyzer 改用NumPy向量化计算。
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba 为可选依赖，缺失时退回普通Python函数
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Numba不可用时的占位装饰器，原样返回函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# 缺失的关键点为NaN，因此不启用 nnan/ninf 假设，只允许重排和近似计算
+FASTMATH_FLAGS = {'reassoc', 'contract', 'arcp'}
+
+# 向量长度（夹角时为两向量长度之积）不超过该值视为关键点重合，角度记为NaN
+MIN_NORM = 1e-8
+
+
+@njit(cache=True, parallel=True, nogil=True, fastmath=FASTMATH_FLAGS)
+def joint_angles(landmarks: np.ndarray, first: int, vertex: int, last: int) -> np.ndarray:
+    """计算每帧以 vertex 关键点为顶点的三点夹角（度），landmarks 为 (N, 33, 4) 数组，缺失或关键点重合时为NaN"""
+    count = landmarks.shape[0]
+    angles = np.empty(count, dtype=np.float64)
+    for i in prange(count):
+        bx = np.float64(landmarks[i, vertex, 0])
+        by = np.float64(landmarks[i, vertex, 1])
+        v1x = landmarks[i, first, 0] - bx
+        v1y = landmarks[i, first, 1] - by
+        v2x = landmarks[i, last, 0] - bx
+        v2y = landmarks[i, last, 1] - by
+
+        norm = math.hypot(v1x, v1y) * math.hypot(v2x, v2y)
+        cos_angle = (v1x * v2x + v1y * v2y) / norm if norm > MIN_NORM else np.nan
+        if math.isnan(cos_angle):
+            angles[i] = np.nan
+        else:
+            angles[i] = math.degrees(math.acos(min(1.0, max(-1.0, cos_angle))))
+    return angles
+
+
+@njit(cache=True, parallel=True, nogil=True, fastmath=FASTMATH_FLAGS)
+def forward_lean(landmarks: np.ndarray, shoulder: int, hip: int) -> np.ndarray:
+    """计算每帧肩膀到髋部的向量与垂直线的夹角（度），landmarks 为 (N, 33, 4) 数组，缺失或关键点重合时为NaN"""
+    count = landmarks.shape[0]
+    angles = np.empty(count, dtype=np.float64)
+    for i in prange(count):
+        dx = np.float64(landmarks[i, hip, 0]) - landmarks[i, shoulder, 0]
+        dy = np.float64(landmarks[i, hip, 1]) - landmarks[i, shoulder, 1]
+
+        norm = math.hypot(dx, dy)
+        cos_angle = dy / norm if norm > MIN_NORM else np.nan
+        if math.isnan(cos_angle):
+            angles[i] = np.nan
+        else:
+            angles[i] = math.degrees(math.acos(min(1.0, max(-1.0, cos_angle))))
+    return angles
+
+
+def _warm_up():
+    """用小数组调用一次各函数，提前触发JIT编译（或加载磁盘缓存）"""
+    landmarks = np.zeros((2, 33, 4), dtype=np.float32)
+    joint_angles(landmarks, 23, 25, 27)
+    forward_lean(landmarks, 11, 23)
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
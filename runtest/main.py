@@ -6,64 +6,160 @@
 
 import sys
 import os
+import glob
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pose_detector import RunningPoseDetector
 from gait_analyzer import GaitAnalyzer
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时退回标准库 json
+    orjson = None
+
+# 当前进程复用的姿态检测器，批量分析时每个工作进程在首次使用时各自创建
+_POSE_DETECTOR = None
+
+def _get_pose_detector(use_cache, cache_dir):
+    """返回当前进程共享的姿态检测器，首次调用时创建"""
+    global _POSE_DETECTOR
+    if _POSE_DETECTOR is None:
+        _POSE_DETECTOR = RunningPoseDetector(use_cache=use_cache, cache_dir=cache_dir)
+    return _POSE_DETECTOR
+
+def _analyze_video(pose_detector, video_path):
+    """分析单个视频，返回 (结果, 步态数据, 姿态数据)；检测不到人体姿态时返回 None"""
+    gait_analyzer = GaitAnalyzer()
+    
+    # 逐帧检测姿态并直接交给分析器，一次完成步态和姿态分析
+    frame_count, gait_data, form_data = gait_analyzer.analyze_stream(pose_detector.iter_video(video_path))
+    
+    if not frame_count:
+        return None
+    
+    print(f"成功检测到 {frame_count} 帧数据")
+    
+    # 生成建议
+    recommendations = gait_analyzer.generate_recommendations(gait_data, form_data)
+    
+    # 准备结果（角度统计量在分析时已一次算好）
+    knee_stats = form_data['stats']['knee_angles']
+    lean_stats = form_data['stats']['forward_lean']
+    result = {
+        'video_path': video_path,
+        'gait_metrics': {
+            'cadence': round(gait_data['cadence'], 1),
+            'stride_length': round(gait_data['stride_length'], 3),
+            'total_steps': gait_data['total_steps']
+        },
+        'form_analysis': {
+            'avg_knee_angle': round(knee_stats['mean'], 1),
+            'avg_forward_lean': round(lean_stats['mean'], 1)
+        },
+        'recommendations': recommendations
+    }
+    return result, gait_data, form_data
+
+def _save_result(result, output_path):
+    """把分析结果写成JSON文件"""
+    if orjson is not None:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+def _analyze_one(video_path, output_path, use_cache, cache_dir):
+    """批量分析中单个视频的任务：分析并写出JSON，返回错误信息，成功时为 None"""
+    try:
+        analysis = _analyze_video(_get_pose_detector(use_cache, cache_dir), video_path)
+        if analysis is None:
+            return "无法检测到人体姿态"
+        _save_result(analysis[0], output_path)
+        return None
+    except Exception as e:
+        return str(e)
+
+def batch_main(pattern, workers, output_dir=None, use_cache=True, cache_dir=None):
+    """并行分析与 pattern 匹配的所有视频，每个视频输出一个 <视频名>_result.json"""
+    video_paths = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+    if not video_paths:
+        print(f"错误：没有与 {pattern} 匹配的视频文件")
+        sys.exit(1)
+    
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    output_paths = [
+        os.path.join(output_dir or os.path.dirname(path), os.path.splitext(os.path.basename(path))[0] + '_result.json')
+        for path in video_paths
+    ]
+    
+    # 各视频互不依赖，每个工作进程各自创建检测器（MediaPipe图有内部状态，不能跨进程共享）；
+    # 使用spawn启动工作进程：Numba并行内核加载后的TBB线程池不能安全地fork，否则主进程退出时会卡住
+    max_workers = max(1, min(workers, len(video_paths)))
+    print(f"正在分析 {len(video_paths)} 个视频（{max_workers} 个进程）...")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        errors = list(executor.map(_analyze_one, video_paths, output_paths,
+                                   repeat(use_cache), repeat(cache_dir)))
+    
+    failed = 0
+    for video_path, output_path, error in zip(video_paths, output_paths, errors):
+        if error is None:
+            print(f"✅ {video_path} -> {output_path}")
+        else:
+            failed += 1
+            print(f"❌ {video_path}: {error}")
+    
+    print(f"\n完成: {len(video_paths) - failed}/{len(video_paths)} 个视频分析成功")
+    if failed:
+        sys.exit(1)
+
 def main():
     parser = argparse.ArgumentParser(description='跑步姿态分析系统')
-    parser.add_argument('video_path', help='视频文件路径')
-    parser.add_argument('--output', '-o', help='结果输出文件路径（可选）')
+    parser.add_argument('video_path', nargs='?', help='视频文件路径')
+    parser.add_argument('--output', '-o', help='结果输出文件路径（可选）；批量模式下为结果输出目录，默认与视频同目录')
+    parser.add_argument('--batch', metavar='GLOB', help='批量分析与通配符匹配的所有视频，如 "videos/*.mp4"')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='批量模式的并行进程数（默认CPU核数）')
     parser.add_argument('--verbose', '-v', action='store_true', help='详细输出')
+    parser.add_argument('--cache-dir', help='姿态数据缓存目录（默认为视频所在目录下的 .pose_cache）')
+    parser.add_argument('--no-cache', action='store_true', help='不读取也不保存姿态数据缓存')
     
     args = parser.parse_args()
+    use_cache = not args.no_cache
+    
+    if args.batch:
+        batch_main(args.batch, args.workers, args.output, use_cache, args.cache_dir)
+        return
+    
+    if not args.video_path:
+        parser.error("需要提供视频文件路径或 --batch")
     
     if not os.path.exists(args.video_path):
         print(f"错误：视频文件 {args.video_path} 不存在")
         sys.exit(1)
     
     print("正在初始化姿态检测器...")
-    pose_detector = RunningPoseDetector()
-    gait_analyzer = GaitAnalyzer()
+    pose_detector = _get_pose_detector(use_cache, args.cache_dir)
     
     print("正在分析视频...")
     try:
-        # 检测姿态
-        frame_data = pose_detector.process_video(args.video_path)
+        analysis = _analyze_video(pose_detector, args.video_path)
         
-        if not frame_data:
+        if analysis is None:
             print("错误：无法检测到人体姿态")
             sys.exit(1)
         
-        print(f"成功检测到 {len(frame_data)} 帧数据")
-        
-        # 分析步态
-        gait_data = gait_analyzer.analyze_gait_cycle(frame_data)
-        form_data = gait_analyzer.analyze_running_form(frame_data)
-        
-        # 生成建议
-        recommendations = gait_analyzer.generate_recommendations(gait_data, form_data)
-        
-        # 准备结果
-        result = {
-            'video_path': args.video_path,
-            'gait_metrics': {
-                'cadence': round(gait_data['cadence'], 1),
-                'stride_length': round(gait_data['stride_length'], 3),
-                'total_steps': gait_data['total_steps']
-            },
-            'form_analysis': {
-                'avg_knee_angle': round(sum(form_data['knee_angles']) / len(form_data['knee_angles']), 1) if form_data['knee_angles'] else 0,
-                'avg_forward_lean': round(sum(form_data['forward_lean']) / len(form_data['forward_lean']), 1) if form_data['forward_lean'] else 0
-            },
-            'recommendations': recommendations
-        }
+        result, gait_data, form_data = analysis
+        recommendations = result['recommendations']
+        knee_stats = form_data['stats']['knee_angles']
+        lean_stats = form_data['stats']['forward_lean']
         
         # 输出结果
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            _save_result(result, args.output)
             print(f"结果已保存到 {args.output}")
         
         # 控制台输出
@@ -84,8 +180,8 @@ def main():
             print(f"\n详细数据:")
             print(f"检测到的左脚着地次数: {len(gait_data['left_foot_strikes'])}")
             print(f"检测到的右脚着地次数: {len(gait_data['right_foot_strikes'])}")
-            print(f"膝关节角度变化范围: {min(form_data['knee_angles']) if form_data['knee_angles'] else 0:.1f} - {max(form_data['knee_angles']) if form_data['knee_angles'] else 0:.1f} 度")
-            print(f"身体前倾角度变化范围: {min(form_data['forward_lean']) if form_data['forward_lean'] else 0:.1f} - {max(form_data['forward_lean']) if form_data['forward_lean'] else 0:.1f} 度")
+            print(f"膝关节角度变化范围: {knee_stats['min']:.1f} - {knee_stats['max']:.1f} 度")
+            print(f"身体前倾角度变化范围: {lean_stats['min']:.1f} - {lean_stats['max']:.1f} 度")
         
     except Exception as e:
         print(f"分析过程中出错: {e}")
@@ -1,98 +1,327 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterator
 import math
+import os
+import hashlib
+import queue
+import threading
 
 class RunningPoseDetector:
-    def __init__(self):
+    # 关键身体部位名称及其MediaPipe关键点索引，只在类定义时构建一次
+    KEY_POINT_NAMES = ('nose', 'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+                       'left_wrist', 'right_wrist', 'left_hip', 'right_hip', 'left_knee', 'right_knee',
+                       'left_ankle', 'right_ankle', 'left_heel', 'right_heel',
+                       'left_foot_index', 'right_foot_index')
+    KEY_POINT_IDS = np.array([0, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32])
+    _KEY_POINTS = tuple(zip(KEY_POINT_NAMES, KEY_POINT_IDS.tolist()))
+    
+    def __init__(self, detect_interval: int = 1, max_side: int = 640, motion_threshold: float = 3.0,
+                 model_complexity: int = 1, min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.5, use_cache: bool = False,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            detect_interval: 每隔多少帧运行一次完整的姿态检测，中间帧用光流跟踪上一帧的关键点（1表示逐帧检测）
+            max_side: process_video 先把帧缩小到长边不超过该像素数再检测（关键点为归一化坐标，不受缩放影响）
+            motion_threshold: 两次检测之间，躯干区域（1/4分辨率灰度图）与上一帧的平均绝对差低于该值时直接复用上一帧的关键点
+            model_complexity: MediaPipe模型复杂度 (0, 1, 2)，1的速度约为2的2~3倍，步态分析所需的关键点精度相当
+            min_detection_confidence: 最小检测置信度
+            min_tracking_confidence: 最小跟踪置信度
+            use_cache: 是否缓存姿态数据，同一视频用相同参数再次分析时直接读取缓存
+            cache_dir: 缓存目录，None表示保存在视频所在目录下的 .pose_cache 中
+        """
         self.mp_pose = mp.solutions.pose
         self.pose = self.mp_pose.Pose(
             static_image_mode=False,
-            model_complexity=2,
+            model_complexity=model_complexity,
             enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
         )
         self.mp_drawing = mp.solutions.drawing_utils
+        self.model_complexity = model_complexity
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.detect_interval = max(1, detect_interval)
+        self.max_side = max_side
+        self.motion_threshold = motion_threshold
+        # 检测前BGR转RGB的复用缓冲区（MediaPipe会复制输入，缓冲区可以逐帧覆盖）
+        self._scratch_rgb = None
+        # 金字塔LK光流参数，用于在两次检测之间跟踪关键点
+        self.lk_params = dict(winSize=(21, 21), maxLevel=3,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01))
         
     def detect_pose(self, image: np.ndarray) -> Optional[Dict]:
         """检测单帧图像中的姿态关键点"""
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        if self._scratch_rgb is None or self._scratch_rgb.shape != image.shape:
+            self._scratch_rgb = np.empty(image.shape, dtype=np.uint8)
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._scratch_rgb)
         results = self.pose.process(image_rgb)
         
         if results.pose_landmarks:
-            landmarks = []
-            for landmark in results.pose_landmarks.landmark:
-                landmarks.append({
-                    'x': landmark.x,
-                    'y': landmark.y,
-                    'z': landmark.z,
-                    'visibility': landmark.visibility
-                })
+            # MediaPipe的坐标本身是float32，存为 (33, 4) 数组不损失精度，步态分析直接堆叠各帧数组
+            array = np.array([[landmark.x, landmark.y, landmark.z, landmark.visibility]
+                              for landmark in results.pose_landmarks.landmark], dtype=np.float32)
             return {
-                'landmarks': landmarks,
+                'landmarks': self._landmark_dicts(array),
+                'array': array,
                 'pose_landmarks': results.pose_landmarks
             }
         return None
     
+    def _landmark_dicts(self, array: np.ndarray) -> List[Dict]:
+        """把 (33, 4) 关键点数组转换为兼容旧接口的字典列表"""
+        return [{'x': x, 'y': y, 'z': z, 'visibility': visibility}
+                for x, y, z, visibility in array.tolist()]
+    
+    def track_pose(self, prev_gray: np.ndarray, gray: np.ndarray, pose_data: Dict) -> Dict:
+        """用光流把上一帧的关键点移动到当前帧，跟踪失败的点保持原位置；大部分点跟踪失败时返回None"""
+        height, width = gray.shape[:2]
+        scale = np.array([width, height], dtype=np.float32)
+        array = pose_data['array'].copy()
+        points = array[:, :2] * scale
+        
+        new_points, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points.reshape(-1, 1, 2),
+                                                         None, **self.lk_params)
+        if new_points is None:
+            return None
+            
+        # 超过一半的关键点跟丢（快速运动或模糊），返回None由调用方重新完整检测
+        tracked = status.reshape(-1) == 1
+        if tracked.sum() * 2 < len(tracked):
+            return None
+        points[tracked] = new_points.reshape(-1, 2)[tracked]
+        array[:, :2] = points / scale
+        
+        return {
+            'landmarks': self._landmark_dicts(array),
+            'array': array,
+            'pose_landmarks': None  # 跟踪得到的帧没有MediaPipe原始结果
+        }
+    
+    def _torso_motion(self, prev_small: np.ndarray, small: np.ndarray, pose_data: Dict) -> float:
+        """计算上一帧肩部和髋部包围框（外扩10%）内两张小灰度图的平均绝对差"""
+        height, width = small.shape[:2]
+        torso = pose_data['array'][[11, 12, 23, 24], :2]
+        x_min, y_min = torso.min(axis=0)
+        x_max, y_max = torso.max(axis=0)
+        pad_x, pad_y = 0.1 * (x_max - x_min), 0.1 * (y_max - y_min)
+        
+        x0 = int(np.clip((x_min - pad_x) * width, 0, width - 1))
+        x1 = int(np.clip((x_max + pad_x) * width, x0 + 1, width))
+        y0 = int(np.clip((y_min - pad_y) * height, 0, height - 1))
+        y1 = int(np.clip((y_max + pad_y) * height, y0 + 1, height))
+        
+        return float(cv2.absdiff(prev_small[y0:y1, x0:x1], small[y0:y1, x0:x1]).mean())
+    
     def process_video(self, video_path: str) -> List[Dict]:
         """处理视频文件，提取所有帧的姿态数据"""
+        return list(self.iter_video(video_path))
+    
+    def iter_video(self, video_path: str, prefetch: int = 4) -> Iterator[Dict]:
+        """
+        逐帧产出检测到的姿态数据，调用方边检测边分析，不必先保存整段视频的结果
+        
+        启用 use_cache 时，完整检测一遍后把关键点数组保存为 .npz，之后同一视频直接读取缓存，不再运行MediaPipe。
+        
+        Args:
+            video_path: 视频路径
+            prefetch: 后台解码线程最多领先姿态检测的帧数
+        """
+        if not self.use_cache:
+            yield from self._detect_video(video_path, prefetch)
+            return
+            
+        cache_path = self._cache_path(video_path)
+        cached = self._load_cache(cache_path)
+        if cached is not None:
+            print(f"使用缓存的姿态数据: {video_path}")
+            yield from cached
+            return
+            
+        arrays, frame_numbers, timestamps = [], [], []
+        for pose_data in self._detect_video(video_path, prefetch):
+            arrays.append(pose_data['array'])
+            frame_numbers.append(pose_data['frame_number'])
+            timestamps.append(pose_data['timestamp'])
+            yield pose_data
+            
+        # 只有完整遍历视频后才写缓存，调用方提前停止时不保存不完整的结果
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            landmarks = np.stack(arrays) if arrays else np.empty((0, 33, 4), dtype=np.float32)
+            np.savez_compressed(cache_path, landmarks=landmarks,
+                                frame_numbers=np.asarray(frame_numbers, dtype=np.int64),
+                                timestamps=np.asarray(timestamps, dtype=np.float64))
+        except Exception as e:
+            print(f"保存姿态缓存失败: {e}")
+    
+    def _cache_path(self, video_path: str) -> str:
+        """根据视频路径、大小、修改时间和检测参数生成缓存文件路径，任何一项变化都会使用新的缓存"""
+        stat = os.stat(video_path)
+        params = (os.path.abspath(video_path), stat.st_size, int(stat.st_mtime),
+                  self.model_complexity, self.min_detection_confidence, self.min_tracking_confidence,
+                  self.detect_interval, self.max_side, self.motion_threshold)
+        key = hashlib.sha1(repr(params).encode()).hexdigest()
+        cache_dir = self.cache_dir or os.path.join(os.path.dirname(os.path.abspath(video_path)), '.pose_cache')
+        return os.path.join(cache_dir, f"{key}.npz")
+    
+    def _load_cache(self, cache_path: str) -> Optional[List[Dict]]:
+        """读取缓存的姿态数据，缓存不存在或读取失败时返回None"""
+        if not os.path.exists(cache_path):
+            return None
+            
+        try:
+            with np.load(cache_path) as data:
+                landmarks = data['landmarks']
+                frame_numbers = data['frame_numbers']
+                timestamps = data['timestamps']
+        except Exception as e:
+            print(f"读取姿态缓存失败，重新检测: {e}")
+            return None
+            
+        return [{
+            'landmarks': self._landmark_dicts(array),
+            'array': array,
+            'pose_landmarks': None,  # 缓存中不保存MediaPipe原始结果
+            'frame_number': frame_number,
+            'timestamp': timestamp
+        } for array, frame_number, timestamp in zip(landmarks, frame_numbers.tolist(), timestamps.tolist())]
+    
+    def _detect_video(self, video_path: str, prefetch: int) -> Iterator[Dict]:
+        """逐帧检测（或跟踪、复用）姿态，iter_video 的实际检测流程"""
         cap = cv2.VideoCapture(video_path)
-        frame_data = []
         frame_count = 0
+        # 帧率只读取一次，缺少帧率信息时按30FPS计算时间戳，避免除以0
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        inv_fps = 1.0 / fps if fps > 0 else 1.0 / 30.0
+        
+        # 模型输入分辨率远小于1080p，读帧后立即缩小，后续颜色转换、检测和光流都只处理小帧
+        width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        scale = min(1.0, self.max_side / max(width, height, 1))
+        target_size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
         
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
+        # 上一帧的姿态、灰度图和1/4分辨率灰度图，用于在两次检测之间复用关键点或做光流跟踪
+        last_pose = None
+        prev_gray = None
+        prev_small = None
+        detected = tracked = reused = 0
+        
+        try:
+            for frame, gray, small in self._iter_frames(cap, scale, target_size, prefetch):
+                pose_data = None
+                if frame_count % self.detect_interval != 0 and last_pose is not None:
+                    if self._torso_motion(prev_small, small, last_pose) < self.motion_threshold:
+                        # 躯干区域几乎没有变化，直接复用上一帧的关键点
+                        pose_data = {key: last_pose[key] for key in ('landmarks', 'array', 'pose_landmarks')}
+                        reused += 1
+                    else:
+                        pose_data = self.track_pose(prev_gray, gray, last_pose)
+                        tracked += pose_data is not None
+                if pose_data is None:
+                    pose_data = self.detect_pose(frame)
+                    detected += 1
+                last_pose = pose_data
+                prev_gray = gray
+                prev_small = small
+                
+                if pose_data:
+                    pose_data['frame_number'] = frame_count
+                    pose_data['timestamp'] = frame_count * inv_fps
+                    yield pose_data
                 
-            pose_data = self.detect_pose(frame)
-            if pose_data:
-                pose_data['frame_number'] = frame_count
-                pose_data['timestamp'] = frame_count / cap.get(cv2.CAP_PROP_FPS)
-                frame_data.append(pose_data)
+                frame_count += 1
+                
+            if self.detect_interval > 1 and frame_count:
+                print(f"姿态检测 {detected} 帧，光流跟踪 {tracked} 帧，复用上一帧关键点 {reused} 帧"
+                      f"（跳过完整检测 {(tracked + reused) / frame_count:.1%}）")
+        finally:
+            cap.release()
+    
+    def _iter_frames(self, cap: cv2.VideoCapture, scale: float, target_size: Tuple[int, int],
+                     prefetch: int) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]]:
+        """
+        后台线程读帧、缩小并生成灰度图，通过容量为 prefetch 的有界队列交给调用方，解码与姿态检测重叠执行
+        
+        Yields:
+            (BGR帧, 灰度图, 1/4分辨率灰度图)，detect_interval 为1时后两项为None
+        """
+        frame_queue = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        errors = []
+        
+        # 帧缓冲区轮流复用：队列中最多 prefetch 帧，加上调用方正在处理和解码线程正在写入的各1帧
+        buffers = [None] * (prefetch + 2)
+        
+        def put(item) -> bool:
+            # 调用方提前停止迭代时不再阻塞在满队列上
+            while not stop.is_set():
+                try:
+                    frame_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+            
+        def read_worker():
+            try:
+                raw = None
+                index = 0
+                while cap.isOpened():
+                    if scale < 1.0:
+                        ret, raw = cap.read(raw)
+                        if not ret:
+                            break
+                        frame = cv2.resize(raw, target_size, dst=buffers[index], interpolation=cv2.INTER_AREA)
+                    else:
+                        ret, frame = cap.read(buffers[index])
+                        if not ret:
+                            break
+                    buffers[index] = frame
+                    index = (index + 1) % len(buffers)
+                    
+                    gray = small = None
+                    if self.detect_interval > 1:
+                        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                        small = cv2.resize(gray, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+                    if not put((frame, gray, small)):
+                        return
+            except Exception as e:
+                errors.append(e)
+            put(None)
             
-            frame_count += 1
+        reader = threading.Thread(target=read_worker, daemon=True)
+        reader.start()
+        try:
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            stop.set()
+            reader.join()
             
-        cap.release()
-        return frame_data
+        if errors:
+            raise errors[0]
     
     def extract_key_points(self, landmarks: List[Dict]) -> Dict:
-        """提取关键身体部位的坐标"""
-        key_points = {}
-        
-        # MediaPipe关键点索引
-        landmark_indices = {
-            'nose': 0,
-            'left_shoulder': 11,
-            'right_shoulder': 12,
-            'left_elbow': 13,
-            'right_elbow': 14,
-            'left_wrist': 15,
-            'right_wrist': 16,
-            'left_hip': 23,
-            'right_hip': 24,
-            'left_knee': 25,
-            'right_knee': 26,
-            'left_ankle': 27,
-            'right_ankle': 28,
-            'left_heel': 29,
-            'right_heel': 30,
-            'left_foot_index': 31,
-            'right_foot_index': 32
-        }
-        
-        for name, idx in landmark_indices.items():
-            if idx < len(landmarks):
-                key_points[name] = {
-                    'x': landmarks[idx]['x'],
-                    'y': landmarks[idx]['y'],
-                    'z': landmarks[idx]['z']
-                }
+        """
+        提取关键身体部位的坐标
         
-        return key_points
+        landmarks 为 (33, 4) 关键点数组时直接返回按 KEY_POINT_NAMES 顺序排列的 (K, 3) 坐标数组
+        """
+        if isinstance(landmarks, np.ndarray):
+            return landmarks[self.KEY_POINT_IDS, :3]
+            
+        count = len(landmarks)
+        return {name: {'x': landmarks[idx]['x'], 'y': landmarks[idx]['y'], 'z': landmarks[idx]['z']}
+                for name, idx in self._KEY_POINTS if idx < count}
     
     def calculate_angle(self, p1: Dict, p2: Dict, p3: Dict) -> float:
         """计算三点之间的角度"""
@@ -105,4 +334,8 @@ class RunningPoseDetector:
     
     def calculate_distance(self, p1: Dict, p2: Dict) -> float:
         """计算两点之间的距离"""
-        return math.sqrt((p1['x'] - p2['x'])**2 + (p1['y'] - p2['y'])**2)
\ No newline at end of file
+        return math.hypot(p1['x'] - p2['x'], p1['y'] - p2['y'])
+    
+    def calculate_distances_batch(self, points1: np.ndarray, points2: np.ndarray) -> np.ndarray:
+        """逐行计算两组 (N, 2) 坐标之间的距离，可直接用于关键点数组的切片（如 array[:, 23, :2]）"""
+        return np.hypot(points1[:, 0] - points2[:, 0], points1[:, 1] - points2[:, 1])
\ No newline at end of file